@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+레코드 저장소 메모리 벤치마크 (dict 목록 vs RecordStore)
+Benchmark the memory of a render batch held as dicts versus the columnar RecordStore
+
+Synthetic 착공신고서 records carry the template's fields with realistic
+repetition (dates, counts, amounts and 지자체장 repeat; names, addresses
+and numbers are unique) plus the extra columns a business_info row has.
+tracemalloc measures the bytes held by each container once it is built:
+
+    dict (all)       list of dicts as a row source returns them
+    dict (template)  list of dicts trimmed to the template's fields
+    store            RecordStore.for_template(...)
+
+Every container runs in a fresh child process. A few documents are
+rendered from both a dict and a store row and compared byte for byte.
+
+    python benchmarks/bench_records.py                    # 10k and 100k records
+    python benchmarks/bench_records.py --sizes 1000,10000,100000 --json records.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from create_minimal_template import write_minimal_docx  # noqa: E402
+from docx_template import compile_template, find_placeholders, render_bytes  # noqa: E402
+from record_store import RecordStore  # noqa: E402
+from template_spec import CONSTRUCTION_REPORT, compile_document_xml  # noqa: E402
+
+DEFAULT_SIZES = (10000, 100000)
+RENDER_CHECKS = 20
+NAME_FIELD = '사업장명'
+
+REGIONS = ['서울특별시', '부산광역시', '대구광역시', '경기도', '경상북도', '충청남도', '전라남도', '강원도']
+TOWNS = ['중구', '북구', '고령군', '수원시', '포항시', '천안시', '순천시', '춘천시', '김해시', '안동시',
+         '구미시', '경주시', '청주시', '전주시', '목포시', '여수시', '원주시', '강릉시', '제주시', '창원시']
+FACILITIES = ['여과집진시설', '흡착에 의한 시설', '세정집진시설', '원심력집진시설', '전기집진시설']
+MANUFACTURERS = ['에코센스', '크린어스', '가이아씨앤에스', '이브이에스']
+
+
+def synthetic_record(rng, index):
+    """One 착공신고서 record shaped like record_source output"""
+    approved = f'2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}'
+    town = rng.choice(TOWNS)
+    price = rng.choice((3_850_000, 4_620_000, 5_390_000, 6_160_000))
+    subsidy = price * 9 // 10
+    record = {
+        '사업장명': f'(주){town}산업{index}' + (' & 상사' if index % 10 == 0 else ''),
+        '주소': f'{rng.choice(REGIONS)} {town} 산단로 {rng.randint(1, 999)}-{index % 97}',
+        '회사연락처': f'0{rng.randint(2, 64)}-{rng.randint(200, 999)}-{index % 10000:04d}',
+        '팩스번호': f'0{rng.randint(2, 64)}-{rng.randint(200, 999)}-{(index * 7) % 10000:04d}',
+        '사업자등록번호': f'{100 + index % 900}-{index % 100:02d}-{index % 100000:05d}',
+        '보조금 승인일': approved,
+        '보조금 승인일+3개월': approved,
+        '환경부고시가': f'{price:,}',
+        '보조금 승인액': f'{subsidy:,}',
+        '자부담': f'{price - subsidy:,}',
+        '입금액': f'{(price - subsidy) * 11 // 10:,}',
+        '게이트웨이': '1',
+        'VPN': rng.choice(('유선', '무선')),
+        '배출CT': str(rng.randint(1, 4)),
+        '방지CT': str(rng.randint(0, 4)),
+        '차압계': str(rng.randint(0, 2)),
+        '온도계': str(rng.randint(0, 2)),
+        'PH계': str(rng.randint(0, 1)),
+        '방지시설명': rng.choice(FACILITIES),
+        'year': '2025',
+        'month': str(rng.randint(1, 12)),
+        'day': str(rng.randint(1, 28)),
+        '대표자성명': rng.choice('김이박최정강조윤장임') + rng.choice(('민준', '서연', '도윤', '지우', '하준')),
+        '지자체장': f'{town}청장',
+    }
+    if index % 5 == 0:
+        record['배출구'] = [{'배출구번호': number, '방지시설명': rng.choice(FACILITIES)}
+                          for number in range(1, rng.randint(2, 4))]
+    # Columns of a business_info row that the template does not use
+    record.update({
+        'id': index,
+        'business_management_code': f'BM{index:08d}',
+        'manager_name': rng.choice(('홍길동', '김담당', '이주임')),
+        'manager_contact': f'010-{rng.randint(1000, 9999)}-{index % 10000:04d}',
+        'manufacturer': rng.choice(MANUFACTURERS),
+        'sales_office': rng.choice(REGIONS),
+        'installation_team': rng.choice(('1팀', '2팀', '3팀')),
+        'created_at': f'2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T09:00:00',
+        'updated_at': f'2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T18:00:00',
+        'is_deleted': False,
+        'memo': '',
+    })
+    return record
+
+
+def synthetic_records(count, seed=0):
+    rng = random.Random(seed)
+    for index in range(1, count + 1):
+        yield synthetic_record(rng, index)
+
+
+def template_fields():
+    return [*find_placeholders(compile_document_xml(CONSTRUCTION_REPORT), include_blocks=True), NAME_FIELD]
+
+
+def build_dicts(count):
+    return list(synthetic_records(count))
+
+
+def build_trimmed(count):
+    fields = template_fields()
+    return [{name: record[name] for name in fields if name in record} for record in synthetic_records(count)]
+
+
+def build_store(count):
+    return RecordStore.from_records(synthetic_records(count), template_fields())
+
+
+CONTAINERS = (('dict (all)', build_dicts), ('dict (template)', build_trimmed), ('store', build_store))
+
+
+def _child(conn, build, count):
+    # Tracing slows allocation-heavy code down many times; time an untraced build first
+    started = time.perf_counter()
+    build(count)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    container = build(count)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    conn.send({'bytes': current, 'peak_bytes': peak, 'seconds': elapsed, 'records': len(container)})
+    conn.close()
+
+
+def measure(build, count):
+    """Build one container in a fresh process; bytes held, tracemalloc peak and (untraced) build time"""
+    ctx = multiprocessing.get_context('fork')
+    parent, child = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_child, args=(child, build, count))
+    process.start()
+    child.close()
+    result = parent.recv()
+    process.join()
+    if process.exitcode:
+        raise RuntimeError(f'{build.__name__} failed with exit code {process.exitcode}')
+    return result
+
+
+def check_rendering(count=RENDER_CHECKS):
+    """Render the same records from dicts and store rows; outputs must match byte for byte"""
+    with tempfile.TemporaryDirectory(prefix='bench_records_') as workdir:
+        path = os.path.join(workdir, 'template.docx')
+        write_minimal_docx(path, compile_document_xml(CONSTRUCTION_REPORT))
+        template = compile_template(path)
+    records = list(synthetic_records(count))
+    store = RecordStore.for_template(template, [NAME_FIELD])
+    store.extend(records)
+    return all(render_bytes(template, record) == render_bytes(template, row) for record, row in zip(records, store))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='레코드 저장소 메모리 벤치마크')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)), help='레코드 수 (쉼표 구분)')
+    parser.add_argument('--json', metavar='PATH', help='결과를 JSON으로 저장')
+    args = parser.parse_args(argv)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size.strip()]
+    if not check_rendering():
+        print('❌ dict 와 RecordStore 의 렌더링 결과가 다릅니다')
+        return 1
+
+    print('⏱️  메모리 벤치마크 실행 중...\n')
+    results = {}
+    for count in sizes:
+        baseline = None
+        for name, build in CONTAINERS:
+            result = measure(build, count)
+            results[f'records={count}:{name}'] = result
+            baseline = baseline or result['bytes']
+            print(f'  records={count:<8} {name:<16} {result["bytes"] / 1e6:9.1f} MB'
+                  f'  {result["bytes"] / count:7.0f} B/record  {result["bytes"] / baseline:6.1%}'
+                  f'  peak {result["peak_bytes"] / 1e6:7.1f} MB  {result["seconds"] * 1000:8.0f} ms')
+        print()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f'✅ 결과 저장: {args.json}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+템플릿 생성/주석 제거/치환 벤치마크
+Benchmark template generation, comment stripping and placeholder rendering
+
+Synthetic templates reuse the table/row markup of create_minimal_template().
+Every stage runs in a fresh child process so peak RSS (ru_maxrss) is per
+stage. baseline.json next to this file holds the reference wall time, peak
+RSS and output size; a run fails when any of them regresses.
+
+    python benchmarks/bench_templates.py                  # compare with baseline
+    python benchmarks/bench_templates.py --update-baseline
+    python benchmarks/bench_templates.py --full           # every size combination
+"""
+
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'scripts'))
+
+from create_minimal_template import write_minimal_docx  # noqa: E402
+from docx_template import compile_template, render_document  # noqa: E402
+from remove_comments_from_template import strip_comments  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+TABLE_SIZES = (1, 10, 100, 1000)
+PLACEHOLDER_SIZES = (10, 100, 1000, 10000)
+# (tables, placeholders) pairs run by default; --full runs the whole grid
+DEFAULT_CASES = ((1, 10), (10, 100), (100, 1000), (1000, 10000))
+RENDER_DOCUMENTS = 20
+# Growth below these floors is treated as timer/allocator noise; output size is exact
+REGRESSION_FLOOR = {'seconds': 0.005, 'peak_rss_kb': 2048, 'output_bytes': 0}
+
+TABLE_OPEN = '''
+    <!-- Table {table} -->
+    <w:tbl>
+      <w:tblPr>
+        <w:tblW w:w="9000" w:type="dxa"/>
+        <w:tblBorders>
+          <w:top w:val="single" w:sz="4" w:space="0"/>
+          <w:left w:val="single" w:sz="4" w:space="0"/>
+          <w:bottom w:val="single" w:sz="4" w:space="0"/>
+          <w:right w:val="single" w:sz="4" w:space="0"/>
+          <w:insideH w:val="single" w:sz="4" w:space="0"/>
+          <w:insideV w:val="single" w:sz="4" w:space="0"/>
+        </w:tblBorders>
+      </w:tblPr>
+'''
+ROW = '''
+      <!-- Row {row} -->
+      <w:tr>
+        <w:tc>
+          <w:p><w:pPr><w:jc w:val="center"/></w:pPr>
+            <w:r><w:rPr><w:b/></w:rPr><w:t>항 목 {row}</w:t></w:r>
+          </w:p>
+        </w:tc>
+        <w:tc>
+          <w:p><w:r><w:t xml:space="preserve">{value}</w:t></w:r></w:p>
+        </w:tc>
+      </w:tr>
+'''
+DOCUMENT_OPEN = '''<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+            xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+  <w:body>
+'''
+DOCUMENT_CLOSE = '''
+  </w:body>
+</w:document>'''
+
+
+def synthetic_document_xml(tables, placeholders):
+    """document.xml with `tables` tables holding `placeholders` {{필드N}} cells in total"""
+    rows_per_table = max(1, math.ceil(placeholders / tables))
+    parts = [DOCUMENT_OPEN]
+    field = 0
+    for table in range(1, tables + 1):
+        parts.append(TABLE_OPEN.format(table=table))
+        for _ in range(rows_per_table):
+            if field < placeholders:
+                field += 1
+                value = f'{{{{필드{field}}}}} 원'
+            else:
+                value = '주식회사 블루온'
+            parts.append(ROW.format(row=field, value=value))
+        parts.append('    </w:tbl>\n    <w:p><w:r><w:t> </w:t></w:r></w:p>\n')
+    parts.append(DOCUMENT_CLOSE)
+    return ''.join(parts)
+
+
+def synthetic_record(placeholders, seed=0):
+    return {f'필드{i}': f'값 {seed}-{i}' for i in range(1, placeholders + 1)}
+
+
+def stage_generate(workdir, tables, placeholders):
+    path = os.path.join(workdir, 'template.docx')
+    write_minimal_docx(path, synthetic_document_xml(tables, placeholders))
+    return os.path.getsize(path)
+
+
+def stage_strip(workdir, tables, placeholders):
+    path = os.path.join(workdir, 'template_clean.docx')
+    strip_comments(os.path.join(workdir, 'template.docx'), path)
+    return os.path.getsize(path)
+
+
+def stage_render(workdir, tables, placeholders):
+    template = compile_template(os.path.join(workdir, 'template_clean.docx'))
+    total = 0
+    for i in range(RENDER_DOCUMENTS):
+        path = os.path.join(workdir, f'render_{i}.docx')
+        render_document(template, synthetic_record(placeholders, i), path)
+        total += os.path.getsize(path)
+    return total // RENDER_DOCUMENTS
+
+
+STAGES = (('generate', stage_generate), ('strip_comments', stage_strip), ('render', stage_render))
+
+
+def _child(conn, func, args):
+    started = time.perf_counter()
+    size = func(*args)
+    elapsed = time.perf_counter() - started
+    # High-water mark of the whole child process (KB on Linux)
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    conn.send({'seconds': elapsed, 'peak_rss_kb': peak_rss, 'output_bytes': size})
+    conn.close()
+
+
+def run_stage(func, *args):
+    """Run one stage in a fresh process; wall time, peak RSS (KB) and output size"""
+    ctx = multiprocessing.get_context('fork')
+    parent, child = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_child, args=(child, func, args))
+    process.start()
+    child.close()
+    result = parent.recv()
+    process.join()
+    if process.exitcode:
+        raise RuntimeError(f'{func.__name__} failed with exit code {process.exitcode}')
+    return result
+
+
+def run_benchmarks(cases, repeat=3):
+    """Best-of-`repeat` timings for each (tables, placeholders) case and stage"""
+    results = {}
+    for tables, placeholders in cases:
+        case = f'tables={tables},placeholders={placeholders}'
+        with tempfile.TemporaryDirectory(prefix='bench_templates_') as workdir:
+            for stage, func in STAGES:
+                runs = [run_stage(func, workdir, tables, placeholders) for _ in range(repeat)]
+                best = min(runs, key=lambda r: r['seconds'])
+                best['peak_rss_kb'] = max(r['peak_rss_kb'] for r in runs)
+                results[f'{case}:{stage}'] = best
+                print(f'  {case:<32} {stage:<15} {best["seconds"] * 1000:9.2f} ms'
+                      f'  {best["peak_rss_kb"]:8d} KB  {best["output_bytes"]:10d} B')
+    return results
+
+
+def _format_metric(metric, value):
+    if metric == 'seconds':
+        return f'{value * 1000:.2f} ms'
+    if metric == 'peak_rss_kb':
+        return f'{value:,} KB'
+    return f'{value:,} B'
+
+
+def compare(results, baseline, threshold):
+    """List regressions where wall time, peak RSS or output size exceed baseline by more than `threshold`
+
+    Each metric also has to grow by more than its REGRESSION_FLOOR, so
+    timer and allocator noise on tiny cases is not reported.
+    """
+    regressions = []
+    for key, current in results.items():
+        previous = baseline.get(key)
+        if previous is None:
+            continue
+        for metric, floor in REGRESSION_FLOOR.items():
+            if metric not in previous:
+                continue
+            before, after = previous[metric], current[metric]
+            if after > before * (1 + threshold) and after - before > floor:
+                regressions.append(f'{key} {metric}: {_format_metric(metric, before)} → '
+                                   f'{_format_metric(metric, after)}')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='템플릿 파이프라인 벤치마크')
+    parser.add_argument('--full', action='store_true', help='모든 테이블/플레이스홀더 크기 조합 실행')
+    parser.add_argument('--repeat', type=int, default=3, help='단계별 반복 횟수 (최소값 사용)')
+    parser.add_argument('--threshold', type=float, default=0.25, help='허용 저하 비율: 시간, 최대 RSS, 출력 크기 (0.25 = 25%%)')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='기준 JSON 경로')
+    parser.add_argument('--update-baseline', action='store_true', help='현재 결과를 기준으로 저장')
+    args = parser.parse_args(argv)
+
+    cases = [(t, p) for t in TABLE_SIZES for p in PLACEHOLDER_SIZES] if args.full else DEFAULT_CASES
+
+    print('⏱️  벤치마크 실행 중...\n')
+    results = run_benchmarks(cases, args.repeat)
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f'\n✅ 기준 저장: {args.baseline}')
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f'\n⚠️  기준 파일이 없습니다: {args.baseline} (--update-baseline 으로 생성)')
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f'\n❌ 성능 저하 ({args.threshold:.0%} 초과):')
+        for line in regressions:
+            print(f'  {line}')
+        return 1
+    print('\n✅ 기준 대비 성능 저하 없음')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
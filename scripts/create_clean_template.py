@@ -4,31 +4,133 @@
 Clean DOCX template generator for construction reports
 """
 
-from docx import Document
-from docx.shared import Pt, Inches, RGBColor
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml.ns import qn
-from docx.oxml import OxmlElement
+import argparse
+import time
+import zipfile
 
-def add_border(cell, **kwargs):
-    """Add borders to table cell"""
-    tc = cell._element
-    tcPr = tc.get_or_add_tcPr()
+from docx_template import escape, find_placeholders
+from stage_metrics import METRICS, add_arguments, instrumented
+from template_spec import CONSTRUCTION_REPORT, compile_document_xml
+
+# python-docx (and lxml) are imported inside the functions that need them,
+# so --fast and importers of the border helpers don't pay for them
+
+CELL_EDGES = ('top', 'left', 'bottom', 'right')
+TABLE_EDGES = CELL_EDGES + ('insideH', 'insideV')
+DEFAULT_BORDER = {'val': 'single', 'sz': '4', 'space': '0', 'color': '000000'}
+
+# tblPr children that must follow tblBorders in schema order
+_AFTER_TBL_BORDERS = ('w:shd', 'w:tblLayout', 'w:tblCellMar', 'w:tblLook',
+                      'w:tblCaption', 'w:tblDescription')
+
+OUTPUT_PATH = '양식/☆착공신고서 템플릿_깨끗한버전.docx'
+
+
+def _borders_element(tag, edges, **overrides):
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
 
-    # Create borders element
-    tcBorders = OxmlElement('w:tcBorders')
-    for edge in ('top', 'left', 'bottom', 'right'):
+    borders = OxmlElement(tag)
+    for edge in edges:
+        spec = dict(DEFAULT_BORDER, **overrides.get(edge, {}))
         edge_element = OxmlElement(f'w:{edge}')
-        edge_element.set(qn('w:val'), 'single')
-        edge_element.set(qn('w:sz'), '4')
-        edge_element.set(qn('w:space'), '0')
-        edge_element.set(qn('w:color'), '000000')
-        tcBorders.append(edge_element)
+        for key, value in spec.items():
+            edge_element.set(qn(f'w:{key}'), str(value))
+        borders.append(edge_element)
+    return borders
+
+
+def set_table_borders(table, **overrides):
+    """Apply borders once for the whole table through tblBorders
+
+    Every cell inherits them, so no per-cell tcBorders are written.
+    `overrides` maps an edge name to attribute changes, e.g.
+    insideV={'val': 'nil'}.
+    """
+    from docx.oxml.ns import qn
+
+    tblPr = table._tbl.tblPr
+    existing = tblPr.find(qn('w:tblBorders'))
+    if existing is not None:
+        tblPr.remove(existing)
+
+    borders = _borders_element('w:tblBorders', TABLE_EDGES, **overrides)
+    for tag in _AFTER_TBL_BORDERS:
+        successor = tblPr.find(qn(tag))
+        if successor is not None:
+            successor.addprevious(borders)
+            break
+    else:
+        tblPr.append(borders)
+
 
-    tcPr.append(tcBorders)
+def set_cell_borders(cell, **overrides):
+    """Per-cell override for edges that differ from the table borders
 
-def create_template():
+    Only the edges named in `overrides` are written, e.g.
+    set_cell_borders(cell, bottom={'sz': '12'}).
+    """
+    if not overrides:
+        return
+    from docx.oxml.ns import qn
+
+    tcPr = cell._element.get_or_add_tcPr()
+    existing = tcPr.find(qn('w:tcBorders'))
+    if existing is not None:
+        tcPr.remove(existing)
+    tcPr.append(_borders_element('w:tcBorders', [e for e in CELL_EDGES if e in overrides], **overrides))
+
+
+def add_border(cell, **kwargs):
+    """Add borders to table cell (all four edges; prefer set_table_borders)"""
+    set_cell_borders(cell, **{edge: kwargs for edge in CELL_EDGES})
+
+
+def _text_runs_xml(text, rpr=''):
+    lines = escape(text).split('\n')
+    inner = '<w:br/>'.join(f'<w:t xml:space="preserve">{line}</w:t>' for line in lines)
+    return f'<w:r>{rpr}{inner}</w:r>'
+
+
+def add_label_value_rows(table, rows, label_width=None, value_width=None):
+    """Append all (label, value) rows to a 2-column table in one pass
+
+    The rows are built as one XML fragment and parsed once instead of
+    creating cells, paragraphs and runs through python-docx one by one.
+    Labels are bold and centered; newlines in values become line breaks.
+    Widths default to 1.5 and 5.0 inches.
+    """
+    from docx.oxml import parse_xml
+    from docx.oxml.ns import nsdecls
+    from docx.shared import Inches
+
+    label_width = label_width or Inches(1.5)
+    value_width = value_width or Inches(5.0)
+    label_tcw = f'<w:tcW w:w="{label_width.twips}" w:type="dxa"/>'
+    value_tcw = f'<w:tcW w:w="{value_width.twips}" w:type="dxa"/>'
+    fragment = [f'<w:tbl {nsdecls("w")}>']
+    for label, value in rows:
+        fragment.append(
+            '<w:tr>'
+            f'<w:tc><w:tcPr>{label_tcw}</w:tcPr>'
+            f'<w:p><w:pPr><w:jc w:val="center"/></w:pPr>{_text_runs_xml(label, "<w:rPr><w:b/></w:rPr>")}</w:p></w:tc>'
+            f'<w:tc><w:tcPr>{value_tcw}</w:tcPr><w:p>{_text_runs_xml(value)}</w:p></w:tc>'
+            '</w:tr>'
+        )
+    fragment.append('</w:tbl>')
+
+    tbl = table._tbl
+    for tr in list(parse_xml(''.join(fragment))):
+        tbl.append(tr)
+
+
+def create_template(spec=CONSTRUCTION_REPORT):
     """Create clean construction report template"""
+    from docx import Document
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.shared import Inches, Pt
+
+    started = time.perf_counter()
     doc = Document()
 
     # Set document margins
@@ -42,160 +144,28 @@ def create_template():
     # Title
     title = doc.add_paragraph()
     title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    title_run = title.add_run('사물인터넷(IoT) 측정기기 부착지원 사업\n착 공 신 고 서')
+    title_run = title.add_run('\n'.join(spec.title))
     title_run.font.size = Pt(18)
     title_run.font.bold = True
 
     doc.add_paragraph()  # Spacing
 
     # Main information table
-    table = doc.add_table(rows=11, cols=2)
+    table = doc.add_table(rows=0, cols=2)
     table.style = 'Table Grid'
+    add_label_value_rows(table, [(row.label, '\n'.join(row.lines)) for row in spec.rows])
+    set_table_borders(table)
 
     # Set column widths
     table.columns[0].width = Inches(1.5)
     table.columns[1].width = Inches(5.0)
 
-    # Row 1: 사업장명
-    cell = table.rows[0].cells[0]
-    cell.text = '사 업 장 명'
-    cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-    cell.paragraphs[0].runs[0].font.bold = True
-    add_border(cell)
-
-    cell = table.rows[0].cells[1]
-    cell.text = '{{사업장명}}'
-    add_border(cell)
-
-    # Row 2: 사업장 소재지 (주소)
-    cell = table.rows[1].cells[0]
-    cell.text = '사업장소재지'
-    cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-    cell.paragraphs[0].runs[0].font.bold = True
-    add_border(cell)
-
-    cell = table.rows[1].cells[1]
-    p = cell.paragraphs[0]
-    p.add_run('{{주소}}\n')
-    p.add_run('전화: {{회사연락처}}  팩스: {{팩스번호}}')
-    add_border(cell)
-
-    # Row 3: 설치업체명
-    cell = table.rows[2].cells[0]
-    cell.text = '설 치 업 체 명'
-    cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-    cell.paragraphs[0].runs[0].font.bold = True
-    add_border(cell)
-
-    cell = table.rows[2].cells[1]
-    cell.text = '주식회사 블루온'
-    add_border(cell)
-
-    # Row 4: 시공업체 소재지
-    cell = table.rows[3].cells[0]
-    cell.text = '시공업체소재지'
-    cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-    cell.paragraphs[0].runs[0].font.bold = True
-    add_border(cell)
-
-    cell = table.rows[3].cells[1]
-    p = cell.paragraphs[0]
-    p.add_run('경상북도 고령군 대가야읍 낫질로 285\n')
-    p.add_run('전화: 1661-5543  팩스: 031-8077-2054')
-    add_border(cell)
-
-    # Row 5: 사업자등록번호
-    cell = table.rows[4].cells[0]
-    cell.text = '사업자등록번호'
-    cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-    cell.paragraphs[0].runs[0].font.bold = True
-    add_border(cell)
-
-    cell = table.rows[4].cells[1]
-    p = cell.paragraphs[0]
-    p.add_run('사업장: {{사업자등록번호}}\n')
-    p.add_run('시공업체: 679-86-02827')
-    add_border(cell)
-
-    # Row 6: 부착기간
-    cell = table.rows[5].cells[0]
-    cell.text = '부 착 기 간'
-    cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-    cell.paragraphs[0].runs[0].font.bold = True
-    add_border(cell)
-
-    cell = table.rows[5].cells[1]
-    cell.text = '{{보조금 승인일}} 부터 {{보조금 승인일+3개월}} 까지 (3개월)'
-    add_border(cell)
-
-    # Row 7: 총 소요금액
-    cell = table.rows[6].cells[0]
-    cell.text = '총 소 요 금 액'
-    cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-    cell.paragraphs[0].runs[0].font.bold = True
-    add_border(cell)
-
-    cell = table.rows[6].cells[1]
-    cell.text = '{{환경부고시가}} 원'
-    add_border(cell)
-
-    # Row 8: 보조금 승인액
-    cell = table.rows[7].cells[0]
-    cell.text = '보조금승인액'
-    cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-    cell.paragraphs[0].runs[0].font.bold = True
-    add_border(cell)
-
-    cell = table.rows[7].cells[1]
-    cell.text = '{{보조금 승인액}} 원'
-    add_border(cell)
-
-    # Row 9: 자체부담액
-    cell = table.rows[8].cells[0]
-    cell.text = '자 체 부 담 액'
-    cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-    cell.paragraphs[0].runs[0].font.bold = True
-    add_border(cell)
-
-    cell = table.rows[8].cells[1]
-    cell.text = '{{자부담}} 원'
-    add_border(cell)
-
-    # Row 10: 입금액
-    cell = table.rows[9].cells[0]
-    cell.text = '입 금 액'
-    cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-    cell.paragraphs[0].runs[0].font.bold = True
-    add_border(cell)
-
-    cell = table.rows[9].cells[1]
-    cell.text = '{{입금액}} 원 (부가세 포함)'
-    add_border(cell)
-
-    # Row 11: 설치 품목
-    cell = table.rows[10].cells[0]
-    cell.text = '설 치 품 목'
-    cell.paragraphs[0].alignment = WD_ALIGN_PARAGRAPH.CENTER
-    cell.paragraphs[0].runs[0].font.bold = True
-    add_border(cell)
-
-    cell = table.rows[10].cells[1]
-    p = cell.paragraphs[0]
-    p.add_run('게이트웨이: {{게이트웨이}}대, VPN: {{VPN}}, ')
-    p.add_run('배출CT: {{배출CT}}개, 방지CT: {{방지CT}}개, ')
-    p.add_run('차압계: {{차압계}}개, 온도계: {{온도계}}개, PH계: {{PH계}}개\n')
-    p.add_run('방지시설: {{방지시설명}}')
-    add_border(cell)
-
     doc.add_paragraph()  # Spacing
 
     # Declaration text
     declaration = doc.add_paragraph()
     declaration.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    declaration_run = declaration.add_run(
-        '소규모 사업장 사물인터넷(IoT) 측정기기 부착지원 사업에\n'
-        '대하여 착공신고서를 제출합니다.'
-    )
+    declaration_run = declaration.add_run('\n'.join(spec.declaration))
     declaration_run.font.size = Pt(11)
 
     doc.add_paragraph()  # Spacing
@@ -203,7 +173,7 @@ def create_template():
     # Date and signature
     date_para = doc.add_paragraph()
     date_para.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    date_run = date_para.add_run('{{year}} 년  {{month}} 월  {{day}} 일')
+    date_run = date_para.add_run(spec.date)
     date_run.font.size = Pt(12)
 
     doc.add_paragraph()  # Spacing
@@ -211,7 +181,7 @@ def create_template():
     # Applicant signature
     signature = doc.add_paragraph()
     signature.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    sig_run = signature.add_run('신청인(대표자)  {{사업장명}}  {{대표자성명}}  (인)')
+    sig_run = signature.add_run(spec.signature)
     sig_run.font.size = Pt(11)
 
     doc.add_paragraph()  # Spacing
@@ -219,7 +189,7 @@ def create_template():
     # Recipient
     recipient = doc.add_paragraph()
     recipient.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    recipient_run = recipient.add_run('{{지자체장}}  귀하')
+    recipient_run = recipient.add_run(spec.recipient)
     recipient_run.font.size = Pt(12)
     recipient_run.font.bold = True
 
@@ -231,32 +201,48 @@ def create_template():
     cell = docs_table.rows[0].cells[0]
 
     header = cell.paragraphs[0]
-    header.add_run('구 비 서 류').font.bold = True
+    header.add_run(spec.documents_title).font.bold = True
     header.alignment = WD_ALIGN_PARAGRAPH.CENTER
 
     p = cell.add_paragraph()
-    p.add_run('1. 대기배출시설 설치 허가(신고)증 사본 1부.\n')
-    p.add_run('2. 계약서(사본) 1부.\n')
-    p.add_run('3. 자부담금 입금 확인증 1부.\n')
-    p.add_run('4. 계약이행보증보험 1부.\n')
-    p.add_run('5. 개선계획서(최종, 보완사항 포함) 1부.')
+    p.add_run('\n'.join(spec.documents))
 
-    add_border(cell)
+    set_table_borders(docs_table)
+
+    METRICS.record('generate.docx_build', time.perf_counter() - started)
 
     # Save the document
-    output_path = '양식/☆착공신고서 템플릿_깨끗한버전.docx'
-    doc.save(output_path)
+    with METRICS.stage('generate.save'):
+        doc.save(OUTPUT_PATH)
+    _report(OUTPUT_PATH)
+
+
+def create_template_fast(spec=CONSTRUCTION_REPORT):
+    """Write the clean variant compiled straight from the spec (no python-docx styles)"""
+    from create_minimal_template import write_minimal_docx
+
+    with METRICS.stage('generate.build_xml') as stage:
+        document_xml = compile_document_xml(spec, 'clean')
+        stage.add(bytes_out=len(document_xml))
+    write_minimal_docx(OUTPUT_PATH, document_xml)
+    _report(OUTPUT_PATH)
+
+
+def _report(output_path):
     print(f'✅ 템플릿 파일이 생성되었습니다: {output_path}')
     print('\n📋 포함된 플레이스홀더:')
-    placeholders = [
-        '사업장명', '주소', '회사연락처', '팩스번호', '사업자등록번호',
-        '보조금 승인일', '보조금 승인일+3개월', '환경부고시가', '보조금 승인액',
-        '자부담', '입금액', '게이트웨이', 'VPN', '배출CT', '방지CT',
-        '차압계', '온도계', 'PH계', '방지시설명', 'year', 'month', 'day',
-        '대표자성명', '지자체장'
-    ]
+    with zipfile.ZipFile(output_path) as zip_ref:
+        placeholders = find_placeholders(zip_ref.read('word/document.xml').decode('utf-8'), include_blocks=True)
     for i, placeholder in enumerate(placeholders, 1):
         print(f'  {i}. {{{{{placeholder}}}}}')
 
 if __name__ == '__main__':
-    create_template()
+    parser = argparse.ArgumentParser(description='착공신고서 깨끗한 템플릿 생성')
+    parser.add_argument('--fast', action='store_true', help='python-docx 없이 명세에서 XML 직접 생성')
+    add_arguments(parser)
+    args = parser.parse_args()
+    with instrumented(args, 'clean'):
+        if args.fast:
+            create_template_fast()
+        else:
+            create_template()
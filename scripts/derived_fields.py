@@ -0,0 +1,543 @@
+#!/usr/bin/env python3
+"""
+계산 필드 (날짜/금액) 일괄 계산
+Derived placeholder values declared once and evaluated column-wise per batch
+
+A formula is one line:
+
+    입금액 ?= 자부담 * 1.1 | 원         # fill 입금액 when empty, format as currency
+    보조금 승인일+3개월 | 날짜          # no '=': the placeholder name is the expression
+    year = 작성일.year
+
+`=` overwrites the record value, `?=` only fills empty values, and a row
+whose result cannot be computed (missing or unparsable input) keeps what
+the record already had. Expressions support + - * / and parentheses over
+field names, numbers, durations (3개월, 10일, 1년, 2주), `today` and the
+`.year`/`.month`/`.day` of a date. Formats: 원 (1,234,000), 날짜
+(2024년 3월 15일) or a strftime pattern.
+
+Every formula runs once over a whole batch: a field becomes a column
+(list) and each operator is one pass over its operand columns, with
+number/date parsing memoized per distinct string.
+
+    python scripts/derived_fields.py records.json > derived.jsonl
+"""
+
+import argparse
+import calendar
+import datetime
+import json
+import re
+import sys
+import time
+from decimal import ROUND_HALF_UP, Decimal
+
+from stage_metrics import METRICS
+
+# Fields the 착공신고서 templates compute from their inputs. year/month/day
+# only fill what the record lacks, and only from a 작성일 it carries: a
+# `작성일 ?= today` default would change every output (and its incremental
+# key) each day; put it in a --formulas file to date documents on render.
+DEFAULT_FORMULAS = (
+    '보조금 승인일 = 보조금 승인일 | 날짜',
+    '보조금 승인일+3개월 | 날짜',
+    '환경부고시가 = 환경부고시가 | 원',
+    '보조금 승인액 = 보조금 승인액 | 원',
+    '입금액 ?= 자부담 * 1.1',
+    '입금액 = 입금액 | 원',
+    '자부담 = 자부담 | 원',
+    'year ?= 작성일.year',
+    'month ?= 작성일.month',
+    'day ?= 작성일.day',
+)
+DEFAULT_BATCH_SIZE = 4096
+
+_UNITS = {'개월': 'months', '년': 'years', '주': 'weeks', '일': 'days'}
+_ATTRIBUTES = ('year', 'month', 'day')
+_OPERATORS = '+-*/()'
+_NUMBER = re.compile(r'(\d+(?:\.\d+)?)(개월|년|주|일)?')
+_ATTRIBUTE = re.compile(r'\.(year|month|day)\b')
+_DATE = re.compile(r'(\d{4})\s*[-./년]\s*(\d{1,2})\s*[-./월]\s*(\d{1,2})\s*[.일]?$')
+_COMPACT_DATE = re.compile(r'(\d{4})(\d{2})(\d{2})$')
+
+
+class FormulaError(ValueError):
+    pass
+
+
+class Duration:
+    __slots__ = ('months', 'days')
+
+    def __init__(self, months=0, days=0):
+        self.months = months
+        self.days = days
+
+
+def _duration(amount, unit):
+    amount = int(amount)
+    unit = _UNITS[unit]
+    if unit == 'years':
+        return Duration(months=12 * amount)
+    if unit == 'weeks':
+        return Duration(days=7 * amount)
+    return Duration(**{unit: amount})
+
+
+def add_duration(date, duration, sign=1):
+    """Calendar arithmetic: 1월 31일 + 1개월 is the last day of February"""
+    months = date.year * 12 + date.month - 1 + sign * duration.months
+    year, month = divmod(months, 12)
+    day = min(date.day, calendar.monthrange(year, month + 1)[1])
+    return datetime.date(year, month + 1, day) + datetime.timedelta(days=sign * duration.days)
+
+
+# ----------------------------------------------------------------------------
+# Parsing
+# ----------------------------------------------------------------------------
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    while pos < len(text):
+        char = text[pos]
+        if char.isspace():
+            pos += 1
+            continue
+        if char in _OPERATORS:
+            tokens.append(('op', char))
+            pos += 1
+            continue
+        match = _ATTRIBUTE.match(text, pos)
+        if match:
+            tokens.append(('attr', match.group(1)))
+            pos = match.end()
+            continue
+        match = _NUMBER.match(text, pos)
+        # "3개월" is a duration, but "3차 승인일" is a field name
+        if match and (match.end() == len(text) or text[match.end()] in _OPERATORS or text[match.end()].isspace()):
+            amount, unit = match.groups()
+            tokens.append(('duration', _duration(amount, unit)) if unit else ('number', Decimal(amount)))
+            pos = match.end()
+            continue
+        end = pos
+        while end < len(text) and text[end] not in _OPERATORS and not _ATTRIBUTE.match(text, end):
+            end += 1
+        name = text[pos:end].strip()
+        tokens.append(('today', None) if name == 'today' else ('field', name))
+        pos = end
+    return tokens
+
+
+class _Parser:
+    """Recursive descent over tokens into tuples: (kind, ...)"""
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.pos = 0
+
+    def parse(self):
+        node = self.expression()
+        if self.pos != len(self.tokens):
+            raise FormulaError(f'Unexpected {self.tokens[self.pos][1]!r} in {self.text!r}')
+        return node
+
+    def _peek_op(self, ops):
+        if self.pos < len(self.tokens) and self.tokens[self.pos][0] == 'op' and self.tokens[self.pos][1] in ops:
+            self.pos += 1
+            return self.tokens[self.pos - 1][1]
+        return None
+
+    def expression(self):
+        node = self.term()
+        while True:
+            op = self._peek_op('+-')
+            if op is None:
+                return node
+            node = ('op', op, node, self.term())
+
+    def term(self):
+        node = self.factor()
+        while True:
+            op = self._peek_op('*/')
+            if op is None:
+                return node
+            node = ('op', op, node, self.factor())
+
+    def factor(self):
+        if self._peek_op('('):
+            node = self.expression()
+            if not self._peek_op(')'):
+                raise FormulaError(f'Missing ")" in {self.text!r}')
+        elif self.pos < len(self.tokens):
+            kind, value = self.tokens[self.pos]
+            if kind in ('op', 'attr'):
+                raise FormulaError(f'Unexpected {value!r} in {self.text!r}')
+            self.pos += 1
+            node = (kind, value)
+        else:
+            raise FormulaError(f'Incomplete expression {self.text!r}')
+        while self.pos < len(self.tokens) and self.tokens[self.pos][0] == 'attr':
+            node = ('attr', self.tokens[self.pos][1], node)
+            self.pos += 1
+        return node
+
+
+def _fields(node):
+    kind = node[0]
+    if kind == 'field':
+        return {node[1]}
+    if kind == 'op':
+        return _fields(node[2]) | _fields(node[3])
+    if kind == 'attr':
+        return _fields(node[2])
+    return set()
+
+
+class Formula:
+    __slots__ = ('name', 'expression', 'fill_only', 'format', 'source')
+
+    def __init__(self, name, expression, fill_only=False, format=None, source=''):
+        self.name = name
+        self.expression = expression
+        self.fill_only = fill_only
+        self.format = format
+        self.source = source
+
+    @classmethod
+    def parse(cls, line):
+        text, _, fmt = line.partition('|')
+        fmt = fmt.strip() or None
+        if fmt not in (None, '원', '날짜') and '%' not in fmt:
+            raise FormulaError(f'Unknown format {fmt!r} in {line!r}')
+        fill_only = '?=' in text
+        name, assign, expression = text.partition('?=' if fill_only else '=')
+        if not assign:
+            name = expression = text
+        name = name.strip()
+        if not name:
+            raise FormulaError(f'Missing field name in {line!r}')
+        return cls(name, _Parser(expression.strip()).parse(), fill_only, fmt, line.strip())
+
+    @property
+    def inputs(self):
+        return _fields(self.expression)
+
+
+# ----------------------------------------------------------------------------
+# Column evaluation
+# ----------------------------------------------------------------------------
+
+def _map_distinct(func, column):
+    """Apply `func` once per distinct value of a column (None stays None)"""
+    cache = {}
+    out = []
+    for value in column:
+        if value is None:
+            out.append(None)
+            continue
+        result = cache.get(value, cache)
+        if result is cache:
+            result = cache[value] = func(value)
+        out.append(result)
+    return out
+
+
+def _to_number(value):
+    """Decimal of a cell value, or None; NaN/Infinity are not numbers here"""
+    if isinstance(value, Decimal):
+        number = value
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        number = Decimal(str(value))
+    elif isinstance(value, str):
+        text = value.replace(',', '').replace('원', '').strip()
+        try:
+            number = Decimal(text) if text else None
+        except ArithmeticError:
+            return None
+    else:
+        return None
+    return number if number is not None and number.is_finite() else None
+
+
+def _to_date(value):
+    if isinstance(value, datetime.date):
+        return value
+    if not isinstance(value, str):
+        return None
+    match = _DATE.match(value.strip()) or _COMPACT_DATE.match(value.strip())
+    if not match:
+        return None
+    try:
+        return datetime.date(*map(int, match.groups()))
+    except ValueError:
+        return None
+
+
+def _to_number_or_date(value):
+    number = _to_number(value)
+    return _to_date(value) if number is None else number
+
+
+_PARSERS = {False: _to_number, True: _to_date, 'auto': _to_number_or_date}
+
+
+def _is_date_operand(node):
+    return node[0] in ('today', 'duration') or (node[0] == 'op' and node[1] in '+-' and
+                                               (_is_date_operand(node[2]) or _is_date_operand(node[3])))
+
+
+def _add(a, b):
+    if isinstance(a, datetime.date) and isinstance(b, Duration):
+        return add_duration(a, b)
+    if isinstance(a, Duration) and isinstance(b, datetime.date):
+        return add_duration(b, a)
+    if isinstance(a, Duration) and isinstance(b, Duration):
+        return Duration(a.months + b.months, a.days + b.days)
+    return a + b
+
+
+def _sub(a, b):
+    if isinstance(a, datetime.date) and isinstance(b, Duration):
+        return add_duration(a, b, -1)
+    if isinstance(a, datetime.date) and isinstance(b, datetime.date):
+        return Decimal((a - b).days)
+    return a - b
+
+
+_BINARY = {
+    '+': _add,
+    '-': _sub,
+    '*': lambda a, b: a * b,
+    '/': lambda a, b: a / b,
+}
+
+
+def _safe(func):
+    def call(*args):
+        try:
+            return func(*args)
+        except (TypeError, ArithmeticError, ValueError, OverflowError):
+            return None
+    return call
+
+
+_CONSTANTS = ('number', 'duration', 'today')
+
+
+def _binary(func, left, right):
+    out = []
+    for a, b in zip(left, right):
+        if a is None or b is None:
+            out.append(None)
+            continue
+        try:
+            out.append(func(a, b))
+        except (TypeError, ArithmeticError, ValueError, OverflowError):
+            out.append(None)
+    return out
+
+
+def _evaluate(node, columns, size, today, dates=False):
+    """Evaluate `node` to a column of `size` values (None where not computable)"""
+    kind = node[0]
+    if kind == 'field':
+        column = columns.get(node[1])
+        if column is None:
+            return [None] * size
+        return _map_distinct(_PARSERS[dates], column)
+    if kind in ('number', 'duration'):
+        return [node[1]] * size
+    if kind == 'today':
+        return [today] * size
+    if kind == 'attr':
+        return [getattr(value, node[1], None) if isinstance(value, datetime.date) else None
+                for value in _evaluate(node[2], columns, size, today, dates=True)]
+    _, op, left, right = node
+    # "승인일 + 3개월": a field next to a date or duration is read as a date;
+    # "종료일 - 시작일" falls back to dates for values that are not numbers
+    date_context = False
+    if op in '+-':
+        date_context = dates is True or _is_date_operand(left) or _is_date_operand(right) or 'auto'
+    func = _BINARY[op]
+    # Column op constant (승인일 + 3개월, 자부담 * 1.1): one call per distinct value
+    if right[0] in _CONSTANTS:
+        constant = _evaluate(right, columns, 1, today)[0]
+        return _map_distinct(_safe(lambda value: func(value, constant)),
+                             _evaluate(left, columns, size, today, date_context))
+    if left[0] in _CONSTANTS:
+        constant = _evaluate(left, columns, 1, today)[0]
+        return _map_distinct(_safe(lambda value: func(constant, value)),
+                             _evaluate(right, columns, size, today, date_context))
+    return _binary(func,
+                   _evaluate(left, columns, size, today, date_context),
+                   _evaluate(right, columns, size, today, date_context))
+
+
+def _won(value):
+    if not isinstance(value, Decimal) or not value.is_finite():
+        return None
+    try:
+        return f'{int(value.quantize(Decimal(1), ROUND_HALF_UP)):,}'
+    except ArithmeticError:
+        # Beyond the context precision (1e999): not a sum of money
+        return None
+
+
+def _plain(value):
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        if not value.is_finite():
+            return None
+        try:
+            return str(int(value)) if value == value.to_integral_value() else str(value.normalize())
+        except ValueError:
+            # int -> str digit limit (1e5000)
+            return str(value)
+    if isinstance(value, Duration):
+        return None
+    return str(value)
+
+
+def format_won(column):
+    """Round half up to whole won with thousands separators: 1100000.5 -> '1,100,001'"""
+    return _map_distinct(_won, column)
+
+
+def format_dates(column, pattern=None):
+    """Korean long dates ('2024년 3월 15일') or strftime(`pattern`)"""
+    def text(value):
+        if not isinstance(value, datetime.date):
+            return None
+        return value.strftime(pattern) if pattern else f'{value.year}년 {value.month}월 {value.day}일'
+    return _map_distinct(text, column)
+
+
+def format_column(column, fmt=None):
+    if fmt == '원':
+        return format_won(column)
+    if fmt == '날짜':
+        return format_dates(column)
+    if fmt:
+        return format_dates(column, fmt)
+    return _map_distinct(_plain, column)
+
+
+class FormulaSet:
+    """Ordered formulas; later formulas see the results of earlier ones"""
+
+    def __init__(self, formulas):
+        self.formulas = list(formulas)
+
+    @classmethod
+    def from_lines(cls, lines):
+        formulas = []
+        for line in lines:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                formulas.append(Formula.parse(line))
+        return cls(formulas)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls.from_lines(f)
+
+    @property
+    def fields(self):
+        return list(dict.fromkeys(formula.name for formula in self.formulas))
+
+    def for_placeholders(self, placeholders):
+        """Only the formulas a template needs: its placeholders and their inputs"""
+        needed = set(placeholders)
+        keep = []
+        for formula in reversed(self.formulas):
+            if formula.name in needed:
+                keep.append(formula)
+                needed |= formula.inputs
+        return FormulaSet(reversed(keep))
+
+    def apply(self, records, today=None):
+        """Return copies of `records` with every formula evaluated column-wise"""
+        records = [dict(record) for record in records]
+        if not records or not self.formulas:
+            return records
+        with METRICS.stage('derive.apply'):
+            return self._apply(records, today)
+
+    def _apply(self, records, today):
+        size = len(records)
+        today = today or datetime.date.today()
+        columns = {}
+
+        def column(name):
+            if name not in columns:
+                columns[name] = [record.get(name) for record in records]
+            return columns[name]
+
+        for formula in self.formulas:
+            for name in formula.inputs:
+                column(name)
+            current = column(formula.name)
+            as_dates = formula.format is not None and formula.format != '원'
+            results = format_column(_evaluate(formula.expression, columns, size, today, as_dates),
+                                    formula.format)
+            merged = []
+            for old, new in zip(current, results):
+                if new is None or (formula.fill_only and old not in (None, '')):
+                    merged.append(old)
+                else:
+                    merged.append(new)
+            columns[formula.name] = merged
+
+        for name in self.fields:
+            for record, value in zip(records, columns[name]):
+                if value is not None:
+                    record[name] = value
+        return records
+
+    def iter_apply(self, records, batch_size=DEFAULT_BATCH_SIZE, today=None):
+        """Stream records through apply() in batches of `batch_size`"""
+        today = today or datetime.date.today()
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= batch_size:
+                yield from self.apply(batch, today)
+                batch = []
+        if batch:
+            yield from self.apply(batch, today)
+
+
+def default_formulas():
+    return FormulaSet.from_lines(DEFAULT_FORMULAS)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='계산 필드 일괄 계산 (JSON Lines 출력)')
+    parser.add_argument('records', help='레코드 파일 (.csv, .json, .jsonl)')
+    parser.add_argument('--formulas', help='수식 파일 (한 줄에 하나, 기본: 착공신고서 수식)')
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='한 번에 계산할 레코드 수')
+    args = parser.parse_args(argv)
+
+    from template_renderer import load_records
+
+    try:
+        formulas = FormulaSet.load(args.formulas) if args.formulas else default_formulas()
+    except FormulaError as e:
+        print(f'❌ 수식 오류: {e}', file=sys.stderr)
+        return 1
+
+    started = time.perf_counter()
+    count = 0
+    for record in formulas.iter_apply(load_records(args.records), args.batch_size):
+        sys.stdout.write(json.dumps(record, ensure_ascii=False) + '\n')
+        count += 1
+    elapsed = time.perf_counter() - started
+    print(f'✅ {count}건 계산 ({elapsed * 1000:.1f}ms)', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,436 @@
+"""
+DOCX 템플릿 컴파일/치환 공용 모듈
+Compiled {{placeholder}} template structures shared by the renderer scripts
+"""
+
+import io
+import re
+import zipfile
+import zlib
+
+from docx_zip import read_raw_member, write_raw_member
+from stage_metrics import METRICS
+
+# Bump when the compiled structure changes so persisted caches are rebuilt
+COMPILED_FORMAT = 3
+
+PLACEHOLDER_PATTERN = re.compile(r'\{\{([^{}<>]+)\}\}')
+
+# {{#name}}...{{/name}} repeats per list item (or renders once if truthy),
+# {{^name}}...{{/name}} renders only when name is missing, empty or false
+SECTION = '#'
+INVERTED = '^'
+CLOSE = '/'
+# String values that count as false in a block condition (CSV cells)
+FALSE_STRINGS = frozenset({'', '0', 'false', 'n', 'no', 'x'})
+
+_PARAGRAPH_TAG = re.compile(r'<(/?)w:p(?=[\s>/])([^>]*?)(/?)>')
+_ROW_TAG = re.compile(r'<(/?)w:tr(?=[\s>/])([^>]*?)(/?)>')
+_TEXT_CONTENT = re.compile(r'<w:t(?:\s[^>]*)?>([^<]*)</w:t>')
+
+
+def escape(text):
+    """XML-escape &, < and > (xml.sax.saxutils pulls in urllib/http at import time)"""
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _emit(out, literals, slots, scopes):
+    """Append literal, value, literal, ... to `out`; Section slots emit their own body
+
+    `scopes` are prepared value dicts, innermost (current list item) first.
+    """
+    append = out.append
+    append(literals[0])
+    for i, slot in enumerate(slots, 1):
+        if slot.__class__ is str:
+            for scope in scopes:
+                value = scope.get(slot)
+                if value is not None:
+                    break
+            # Lists feed blocks; as plain values they render empty
+            append(value if value.__class__ is str else '')
+        else:
+            slot.emit(out, scopes)
+        append(literals[i])
+
+
+def _truthy(value):
+    if value is None:
+        return False
+    if value.__class__ is str:
+        return value.strip().lower() not in FALSE_STRINGS
+    if isinstance(value, (list, tuple, dict)):
+        return len(value) > 0
+    return bool(value)
+
+
+class Section:
+    """A compiled {{#name}} / {{^name}} block: its body's literals and slots"""
+
+    __slots__ = ('name', 'inverted', 'literals', 'slots')
+
+    def __init__(self, name, inverted, literals, slots):
+        self.name = name
+        self.inverted = inverted
+        self.literals = literals
+        self.slots = slots
+
+    def emit(self, out, scopes):
+        for scope in scopes:
+            value = scope.get(self.name)
+            if value is not None:
+                break
+        else:
+            value = None
+        if self.inverted:
+            if not _truthy(value):
+                _emit(out, self.literals, self.slots, scopes)
+        elif isinstance(value, (list, tuple)):
+            for item in value:
+                item_scope = prepare_values(item) if isinstance(item, dict) else {'.': escape(str(item))}
+                _emit(out, self.literals, self.slots, (item_scope,) + scopes)
+        elif isinstance(value, dict):
+            _emit(out, self.literals, self.slots, (prepare_values(value),) + scopes)
+        elif _truthy(value):
+            _emit(out, self.literals, self.slots, scopes)
+
+
+class CompiledPart:
+    """An XML part pre-split into literal segments and placeholder slots
+
+    `literals` always has exactly one more entry than `slots`; rendering
+    interleaves them as literal, value, literal, ..., literal. A slot is
+    a placeholder name or a Section, whose body is compiled the same way.
+    """
+
+    __slots__ = ('name', 'literals', 'slots')
+
+    def __init__(self, name, literals, slots):
+        self.name = name
+        self.literals = literals
+        self.slots = slots
+
+    def render(self, values):
+        out = []
+        _emit(out, self.literals, self.slots, (values,))
+        return ''.join(out)
+
+
+class StaticMember:
+    """An untouched member deflated once per template
+
+    `info` carries the CRC and sizes of `raw`, so every rendered document
+    splices the same compressed bytes instead of deflating them again.
+    """
+
+    __slots__ = ('info', 'raw')
+
+    def __init__(self, info, raw):
+        self.info = info
+        self.raw = raw
+
+    @classmethod
+    def from_member(cls, zip_ref, info, data):
+        """Reuse the template's own deflate stream, or deflate `data` once"""
+        static = zipfile.ZipInfo(info.filename, info.date_time)
+        static.external_attr = info.external_attr
+        static.compress_type = zipfile.ZIP_DEFLATED
+        static.CRC = info.CRC
+        static.file_size = info.file_size
+        if info.compress_type == zipfile.ZIP_DEFLATED:
+            raw = read_raw_member(zip_ref, info)
+        else:
+            # Same settings as ZipFile.writestr, so output bytes do not change
+            compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -15)
+            raw = compressor.compress(data) + compressor.flush()
+        static.compress_size = len(raw)
+        return cls(static, raw)
+
+
+class CompiledTemplate:
+    """A template zip read once: compiled XML parts plus untouched members
+
+    `members` keeps the original member order as (filename, date_time,
+    external_attr, payload) where payload is a CompiledPart or a
+    StaticMember.
+    """
+
+    def __init__(self, path, members, digest=None):
+        self.path = path
+        self.members = members
+        self.digest = digest
+
+    @property
+    def placeholders(self):
+        """Placeholder names in document order, without duplicates"""
+        names = {}
+        for _, _, _, payload in self.members:
+            if isinstance(payload, CompiledPart):
+                names.update(dict.fromkeys(slot for slot in payload.slots if slot.__class__ is str))
+        return list(names)
+
+    @property
+    def field_names(self):
+        """Every name a record may supply: placeholders, block names and the fields inside blocks"""
+        names = {}
+
+        def collect(slots):
+            for slot in slots:
+                if slot.__class__ is str:
+                    names[slot] = None
+                else:
+                    names[slot.name] = None
+                    collect(slot.slots)
+        for _, _, _, payload in self.members:
+            if isinstance(payload, CompiledPart):
+                collect(payload.slots)
+        return list(names)
+
+
+def iter_placeholders(text, include_blocks=False):
+    """Yield (name, offset) for the record-level placeholders of `text`
+
+    Block tags are skipped, and so are fields inside blocks (they are
+    looked up in the list item first). With `include_blocks` every field
+    and block name is yielded.
+    """
+    depth = 0
+    for match in PLACEHOLDER_PATTERN.finditer(text):
+        name = match.group(1).strip()
+        kind = name[:1]
+        if kind in (SECTION, INVERTED, CLOSE):
+            if include_blocks and kind != CLOSE:
+                yield name[1:].strip(), match.start()
+            depth += -1 if kind == CLOSE else 1
+        elif include_blocks or depth <= 0:
+            yield name, match.start()
+
+
+def find_placeholders(text, include_blocks=False):
+    """Placeholder names in order of first appearance"""
+    return list(dict.fromkeys(name for name, _ in iter_placeholders(text, include_blocks)))
+
+
+def _element_ranges(xml, pattern):
+    """(start, end) of every element matched by a start/end tag `pattern`"""
+    ranges = []
+    stack = []
+    for match in pattern.finditer(xml):
+        if match.group(3):
+            ranges.append((match.start(), match.end()))
+        elif match.group(1):
+            if stack:
+                ranges.append((stack.pop(), match.end()))
+        else:
+            stack.append(match.start())
+    return ranges
+
+
+def _enclosing(ranges, position):
+    """The innermost range containing `position`, or None"""
+    best = None
+    for start, end in ranges:
+        if start <= position < end and (best is None or start > best[0]):
+            best = (start, end)
+    return best
+
+
+def _block_extent(xml, open_tag, close_tag, paragraphs, rows):
+    """(outer, body) ranges of a block: a table row, whole paragraphs or inline text
+
+    Tags in different paragraphs of one table row repeat the row; tags
+    alone in their own paragraphs repeat the paragraphs between them;
+    anything else repeats exactly the XML between the tags.
+    """
+    open_paragraph = _enclosing(paragraphs, open_tag.start())
+    close_paragraph = _enclosing(paragraphs, close_tag.start())
+    if open_paragraph == close_paragraph:
+        return (open_tag.start(), close_tag.end()), (open_tag.end(), close_tag.start())
+
+    open_row = _enclosing(rows, open_tag.start())
+    if open_row is not None and open_row == _enclosing(rows, close_tag.start()):
+        return open_row, open_row
+
+    def alone(paragraph, tag):
+        if paragraph is None:
+            return False
+        text = ''.join(_TEXT_CONTENT.findall(xml, paragraph[0], paragraph[1]))
+        return text.strip() == tag.group(0)
+
+    if alone(open_paragraph, open_tag) and alone(close_paragraph, close_tag):
+        return (open_paragraph[0], close_paragraph[1]), (open_paragraph[1], close_paragraph[0])
+    return (open_tag.start(), close_tag.end()), (open_tag.end(), close_tag.start())
+
+
+class _Block:
+    __slots__ = ('name', 'inverted', 'outer', 'body', 'children', 'events')
+
+    def __init__(self, name, inverted, outer, body):
+        self.name = name
+        self.inverted = inverted
+        self.outer = outer
+        self.body = body
+        self.children = []
+        # (start, end, name or None) inside the body; None cuts a tag out
+        self.events = []
+
+    def compile(self, xml):
+        items = sorted([(child.outer[0], child.outer[1], child) for child in self.children] + self.events,
+                       key=lambda item: item[0])
+        literals, slots = [], []
+        current = []
+        position = self.body[0]
+        for start, end, payload in items:
+            current.append(xml[position:start])
+            position = end
+            if payload is None:
+                continue
+            literals.append(''.join(current))
+            current = []
+            slots.append(payload.compile(xml) if isinstance(payload, _Block) else payload)
+        current.append(xml[position:self.body[1]])
+        literals.append(''.join(current))
+        if self.name is None:
+            return literals, slots
+        return Section(self.name, self.inverted, literals, slots)
+
+
+def _compile_blocks(part_name, xml_text, matches):
+    """Compile a part that has block tags into nested Sections"""
+    paragraphs = _element_ranges(xml_text, _PARAGRAPH_TAG)
+    rows = _element_ranges(xml_text, _ROW_TAG)
+
+    # Pair block tags and work out what each block covers
+    blocks = []
+    stack = []
+    for match in matches:
+        name = match.group(1).strip()
+        if name[:1] in (SECTION, INVERTED):
+            stack.append((name[1:].strip(), name[:1] == INVERTED, match))
+        elif name[:1] == CLOSE:
+            if not stack or stack[-1][0] != name[1:].strip():
+                raise ValueError(f'{part_name}: 짝이 맞지 않는 블록 태그 {{{{{name}}}}}')
+            block_name, inverted, open_tag = stack.pop()
+            outer, body = _block_extent(xml_text, open_tag, match, paragraphs, rows)
+            block = _Block(block_name, inverted, outer, body)
+            if outer == body:
+                # Row blocks keep their tags inside the body: cut them out
+                block.events += [(open_tag.start(), open_tag.end(), None), (match.start(), match.end(), None)]
+            blocks.append(block)
+    if stack:
+        raise ValueError(f'{part_name}: 닫히지 않은 블록 태그 {{{{#{stack[-1][0]}}}}}')
+
+    # Nest blocks by their outer ranges
+    root = _Block(None, False, (0, len(xml_text)), (0, len(xml_text)))
+    parents = [root]
+    for block in sorted(blocks, key=lambda b: (b.outer[0], -b.outer[1])):
+        while parents[-1] is not root and block.outer[0] >= parents[-1].outer[1]:
+            parents.pop()
+        parent = parents[-1]
+        siblings = parent.children
+        if (not (parent.body[0] <= block.outer[0] and block.outer[1] <= parent.body[1])
+                or (siblings and block.outer[0] < siblings[-1].outer[1])):
+            raise ValueError(f'{part_name}: 블록 {{{{#{block.name}}}}} 이(가) 다른 블록과 겹칩니다')
+        siblings.append(block)
+        parents.append(block)
+
+    # Each field (and row-block tag cut) belongs to the innermost block body holding it
+    for match in matches:
+        name = match.group(1).strip()
+        block = root
+        while True:
+            child = next((c for c in block.children if c.outer[0] <= match.start() < c.outer[1]), None)
+            if child is None:
+                break
+            block = child
+        if name[:1] in (SECTION, INVERTED, CLOSE):
+            continue
+        if not block.body[0] <= match.start() < block.body[1]:
+            continue
+        block.events.append((match.start(), match.end(), name))
+
+    literals, slots = root.compile(xml_text)
+    return CompiledPart(part_name, literals, slots)
+
+
+def compile_part(name, xml_text):
+    """Split one XML part into literals and slots (Sections for block tags)"""
+    matches = list(PLACEHOLDER_PATTERN.finditer(xml_text))
+    if any(match.group(1).strip()[:1] in (SECTION, INVERTED, CLOSE) for match in matches):
+        return _compile_blocks(name, xml_text, matches)
+    pieces = PLACEHOLDER_PATTERN.split(xml_text)
+    return CompiledPart(name, pieces[0::2], [slot.strip() for slot in pieces[1::2]])
+
+
+def compile_template(template_path):
+    """Read a template zip once and pre-split every XML part with placeholders"""
+    members = []
+    with zipfile.ZipFile(template_path, 'r') as zip_ref:
+        for info in zip_ref.infolist():
+            with METRICS.stage('compile.read') as stage:
+                data = zip_ref.read(info)
+                stage.add(info.compress_size, len(data))
+            if info.filename.endswith('.xml') and b'{{' in data:
+                with METRICS.stage('compile.split') as stage:
+                    payload = compile_part(info.filename, data.decode('utf-8'))
+                    stage.add(len(data))
+            else:
+                with METRICS.stage('compile.precompress') as stage:
+                    payload = StaticMember.from_member(zip_ref, info, data)
+                    stage.add(len(data), len(payload.raw))
+            members.append((info.filename, info.date_time, info.external_attr, payload))
+    return CompiledTemplate(template_path, members)
+
+
+def prepare_values(record):
+    """Convert a record into XML-escaped strings keyed by placeholder name
+
+    Records that can prepare themselves (record_store rows) return their
+    own escaped view instead of a new dict.
+    """
+    prepared = getattr(record, 'prepared', None)
+    if prepared is not None:
+        return prepared()
+    values = {}
+    for key, value in record.items():
+        if value is None:
+            value = ''
+        elif isinstance(value, (list, tuple, dict)):
+            # Kept as-is for {{#block}} sections
+            values[str(key).strip()] = value
+            continue
+        values[str(key).strip()] = escape(str(value))
+    return values
+
+
+def render_document(template, record, output):
+    """Render one record into `output` (a path or writable binary file object)
+
+    Member timestamps come from the template, so identical inputs always
+    produce byte-identical files. Only parts with placeholders are
+    deflated here; static members are spliced in precompressed.
+    """
+    values = prepare_values(record)
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as docx:
+        for filename, date_time, external_attr, payload in template.members:
+            if isinstance(payload, StaticMember):
+                with METRICS.stage('render.splice') as stage:
+                    write_raw_member(docx, payload.info, payload.raw)
+                    stage.add(len(payload.raw), len(payload.raw))
+                continue
+            info = zipfile.ZipInfo(filename, date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = external_attr
+            with METRICS.stage('render.substitute') as stage:
+                xml = payload.render(values).encode('utf-8')
+                stage.add(bytes_out=len(xml))
+            with METRICS.stage('render.deflate') as stage:
+                docx.writestr(info, xml)
+                stage.add(len(xml), info.compress_size)
+
+
+def render_bytes(template, record):
+    """Render one record and return the DOCX bytes"""
+    buffer = io.BytesIO()
+    render_document(template, record, buffer)
+    return buffer.getvalue()
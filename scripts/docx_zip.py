@@ -0,0 +1,57 @@
+"""
+DOCX/XLSX ZIP 멤버 원본 복사 유틸리티
+Copy ZIP members byte-for-byte (no decompress/recompress round trip)
+"""
+
+import copy
+import struct
+import zipfile
+
+# Local file header: signature, versions, flags, method, time, date, crc,
+# sizes, filename length, extra length (see zipfile.structFileHeader)
+_LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')
+_DATA_DESCRIPTOR_FLAG = 0x08
+
+
+def read_raw_member(zip_ref, info):
+    """Return the still-compressed bytes of a member as stored in the archive"""
+    fp = zip_ref.fp
+    fp.seek(info.header_offset)
+    header = _LOCAL_HEADER.unpack(fp.read(_LOCAL_HEADER.size))
+    if header[0] != zipfile.stringFileHeader:
+        raise zipfile.BadZipFile(f'Bad local header for {info.filename}')
+
+    # Skip the variable length name/extra fields of the local header
+    fp.seek(header[10] + header[11], 1)
+    return fp.read(info.compress_size)
+
+
+def write_raw_member(zip_out, info, raw):
+    """Append already-compressed bytes to an archive opened for writing
+
+    `info` must carry the CRC, sizes and compression method that describe
+    `raw`; the local header is written with them up front so no data
+    descriptor is needed, which also works on unseekable outputs.
+    """
+    if zip_out._writing:
+        raise ValueError("Can't write to ZIP archive while an open writing handle exists.")
+
+    zinfo = copy.copy(info)
+    zinfo.flag_bits &= ~_DATA_DESCRIPTOR_FLAG
+    zinfo.compress_size = len(raw)
+
+    with zip_out._lock:
+        zinfo.header_offset = zip_out.fp.tell()
+        zip_out.fp.write(zinfo.FileHeader())
+        zip_out.fp.write(raw)
+        zip_out.start_dir = zip_out.fp.tell()
+        zip_out.filelist.append(zinfo)
+        zip_out.NameToInfo[zinfo.filename] = zinfo
+        zip_out._didModify = True
+
+
+def copy_member(zip_ref, zip_out, info):
+    """Copy one member from `zip_ref` into `zip_out` without recompressing it"""
+    raw = read_raw_member(zip_ref, info)
+    write_raw_member(zip_out, info, raw)
+    return len(raw)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+문서 템플릿 통합 CLI (빠른 시작)
+Single fast-start entry point for the template scripts
+
+Each subcommand imports its module (and python-docx/lxml where needed) only
+when it runs, so e.g. strip-comments starts with nothing but zipfile.
+
+    python scripts/facility_docs.py minimal
+    python scripts/facility_docs.py clean [--fast]
+    python scripts/facility_docs.py strip-comments [INPUT [OUTPUT]] [--in-place FILE ...]
+    python scripts/facility_docs.py startup             # import/startup time per subcommand
+    python scripts/facility_docs.py --importtime render records.json
+    python scripts/facility_docs.py --metrics stages.prom --profile run minimal
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from stage_metrics import add_arguments, instrumented
+
+# Imported lazily by the matching subcommand; `startup` measures them
+_DELEGATED = {
+    'strip-comments': 'remove_comments_from_template',
+    'normalize': 'normalize_template_runs',
+    'render': 'template_renderer',
+    'index': 'index_placeholders',
+    'derive': 'derived_fields',
+    'lint': 'lint_templates',
+    'pdf': 'pdf_export',
+    'xlsx': 'xlsx_template',
+    'records': 'record_source',
+    'job': 'render_job',
+    'validate': 'validate_output',
+    'optimize': 'optimize_output',
+}
+
+
+def _load_minimal(args):
+    from create_minimal_template import create_minimal_template
+    return lambda: create_minimal_template()
+
+
+def _load_clean(args):
+    if args.fast:
+        from create_clean_template import create_template_fast
+        return lambda: create_template_fast()
+    import docx  # noqa: F401  (python-docx + lxml, the expensive part of this subcommand)
+    from create_clean_template import create_template
+    return lambda: create_template()
+
+
+def _load_delegated(args):
+    module = __import__(_DELEGATED[args.command])
+    return lambda: module.main(args.argv)
+
+
+def parse_importtime(stderr):
+    """Parse `-X importtime` output into (total_us, [(cumulative_us, module)])
+
+    Only top-level imports (no indentation) are summed so nested imports
+    are not counted twice.
+    """
+    total = 0
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|', 2)
+        cumulative = int(cumulative)
+        if not name[1:].startswith(' '):
+            total += cumulative
+            modules.append((cumulative, name.strip()))
+    modules.sort(reverse=True)
+    return total, modules
+
+
+def _run_importtime(argv):
+    import subprocess
+
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', os.path.abspath(__file__), *argv],
+                            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    wall = time.perf_counter() - started
+    return result, wall
+
+
+def report_importtime(argv, top=8):
+    """Run this CLI with `-X importtime` and print wall time plus the slowest imports"""
+    result, wall = _run_importtime(argv)
+    sys.stdout.write(result.stdout)
+    total, modules = parse_importtime(result.stderr)
+    errors = [line for line in result.stderr.splitlines() if not line.startswith('import time:')]
+    if errors:
+        sys.stderr.write('\n'.join(errors) + '\n')
+
+    print(f'\n⏱️  전체 {wall * 1000:.1f}ms, import {total / 1000:.1f}ms')
+    for cumulative, name in modules[:top]:
+        print(f'  {cumulative / 1000:8.1f}ms  {name}')
+    return result.returncode
+
+
+def report_startup():
+    """Measure interpreter start plus imports for every subcommand
+
+    Modules the bare interpreter already imports (site, encodings, ...) are
+    left out of the import column so it shows what each subcommand adds.
+    """
+    import subprocess
+
+    bare = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'pass'],
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    startup_modules = {name for _, name in parse_importtime(bare.stderr)[1]}
+
+    commands = [['minimal'], ['clean', '--fast'], ['clean'], *([name] for name in _DELEGATED)]
+    print(f'{"subcommand":<16} {"wall":>9} {"import":>9}  heaviest import')
+    for command in commands:
+        result, wall = _run_importtime(['--import-only', *command])
+        label = ' '.join(command)
+        if result.returncode:
+            print(f'{label:<16} ❌ {result.stderr.strip().splitlines()[-1]}')
+            continue
+        own = [m for m in parse_importtime(result.stderr)[1] if m[1] not in startup_modules]
+        total = sum(cumulative for cumulative, _ in own)
+        heaviest = f'{own[0][1]} ({own[0][0] / 1000:.1f}ms)' if own else '-'
+        print(f'{label:<16} {wall * 1000:7.1f}ms {total / 1000:7.1f}ms  {heaviest}')
+    return 0
+
+
+def split_argv(parser, argv):
+    """(own, delegated): everything after a delegated subcommand (including --help) belongs to it
+
+    The subcommand is the first argument that is neither an option nor the
+    value of a top-level option such as `--metrics PATH`.
+    """
+    options = {option: action.nargs != 0 for action in parser._actions for option in action.option_strings}
+    expects_value = False
+    for i, arg in enumerate(argv):
+        if expects_value:
+            expects_value = False
+            continue
+        if arg.startswith('-'):
+            if '=' not in arg:
+                # argparse accepts unambiguous prefixes (--metr stages.prom)
+                matches = [option for option in options if option.startswith(arg)]
+                expects_value = options.get(arg, len(matches) == 1 and options[matches[0]])
+            continue
+        if arg in _DELEGATED:
+            return argv[:i + 1], argv[i + 1:]
+        break
+    return argv, []
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='착공신고서 템플릿 도구')
+    parser.add_argument('--importtime', action='store_true', help='-X importtime 으로 실행하고 import 시간 요약')
+    parser.add_argument('--import-only', action='store_true', help=argparse.SUPPRESS)
+    add_arguments(parser)
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('minimal', help='최소 템플릿 생성').set_defaults(load=_load_minimal)
+    clean = sub.add_parser('clean', help='깨끗한 템플릿 생성 (python-docx)')
+    clean.add_argument('--fast', action='store_true', help='python-docx 없이 명세에서 XML 직접 생성')
+    clean.set_defaults(load=_load_clean)
+    for name, module in _DELEGATED.items():
+        delegated = sub.add_parser(name, add_help=False, help=f'{module}.py 실행')
+        delegated.set_defaults(load=_load_delegated)
+    sub.add_parser('startup', help='서브커맨드별 시작 시간 측정').set_defaults(load=None)
+
+    raw_argv = sys.argv[1:] if argv is None else list(argv)
+
+    own_argv, delegated_argv = split_argv(parser, raw_argv)
+    args = parser.parse_args(own_argv)
+    if args.command in _DELEGATED:
+        args.argv = delegated_argv
+
+    if args.command == 'startup':
+        return report_startup()
+    if args.importtime:
+        return report_importtime([a for a in raw_argv if a != '--importtime'])
+
+    run = args.load(args)
+    if args.import_only:
+        return 0
+    with instrumented(args, args.command):
+        return run() or 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+양식/ 폴더 플레이스홀더 색인 및 레코드 검증
+Index {{placeholders}} across every DOCX/XLSX template and validate records against it
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import zipfile
+from bisect import bisect_right
+from xml.parsers import expat
+
+from docx_template import iter_placeholders
+from template_cache import file_sha256
+
+DEFAULT_TEMPLATE_DIR = '양식'
+INDEX_FILENAME = '.placeholder_index.json'
+INDEX_VERSION = 3
+TEMPLATE_EXTENSIONS = ('.docx', '.xlsx')
+# Local names of text elements (w:t, a:t, t) and of the elements whose text is joined
+TEXT_ELEMENTS = frozenset({'t'})
+PARAGRAPH_ELEMENTS = frozenset({'p', 'si', 'is'})
+
+
+def paragraph_texts(data):
+    """Yield (text, byte offset) per paragraph of an XML part, its text elements joined
+
+    Word splits a placeholder it has edited over several runs
+    (<w:t>{{</w:t>...<w:t>사업장명</w:t>...), so placeholders are found in
+    the joined text of each paragraph (or shared string), not in the raw XML.
+    """
+    parser = expat.ParserCreate()
+    parser.buffer_text = True
+    paragraphs = []
+    # [pieces, offset] of the open paragraph, and the text element nesting depth
+    state = {'current': None, 'in_text': 0}
+
+    def start(name, attrs):
+        local = name.rpartition(':')[2]
+        if local in PARAGRAPH_ELEMENTS:
+            state['current'] = [[], parser.CurrentByteIndex]
+        elif local in TEXT_ELEMENTS:
+            state['in_text'] += 1
+
+    def end(name):
+        local = name.rpartition(':')[2]
+        if local in PARAGRAPH_ELEMENTS and state['current'] is not None:
+            pieces, offset = state['current']
+            if pieces:
+                paragraphs.append((''.join(pieces), offset))
+            state['current'] = None
+        elif local in TEXT_ELEMENTS:
+            state['in_text'] -= 1
+
+    def text(data):
+        if state['in_text'] and state['current'] is not None:
+            state['current'][0].append(data)
+
+    parser.StartElementHandler = start
+    parser.EndElementHandler = end
+    parser.CharacterDataHandler = text
+    parser.Parse(data, True)
+    return paragraphs
+
+
+def scan_template(path):
+    """List (name, part, offset) for every record-level placeholder in a template's XML parts
+
+    The offset is the byte offset of the paragraph holding the placeholder.
+    """
+    entries = []
+    with zipfile.ZipFile(path, 'r') as zip_ref:
+        for info in zip_ref.infolist():
+            if not info.filename.endswith('.xml'):
+                continue
+            data = zip_ref.read(info)
+            if b'{{' not in data:
+                continue
+            paragraphs = paragraph_texts(data)
+            # Block tags open and close in different paragraphs; scan the part as one text
+            text = '\n'.join(paragraph for paragraph, _ in paragraphs)
+            starts = []
+            position = 0
+            for paragraph, offset in paragraphs:
+                starts.append((position, offset))
+                position += len(paragraph) + 1
+            for name, position in iter_placeholders(text):
+                offset = starts[bisect_right(starts, (position, float('inf'))) - 1][1]
+                entries.append((name, info.filename, offset))
+    return entries
+
+
+def iter_templates(template_dir):
+    for root, _, files in os.walk(template_dir):
+        for name in sorted(files):
+            # Skip Office lock files such as "~$공신고서 템플릿.docx"
+            if name.startswith('~$') or not name.lower().endswith(TEMPLATE_EXTENSIONS):
+                continue
+            yield os.path.join(root, name)
+
+
+def load_index(index_path):
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return {'version': INDEX_VERSION, 'templates': {}}
+    if index.get('version') != INDEX_VERSION:
+        return {'version': INDEX_VERSION, 'templates': {}}
+    return index
+
+
+def build_index(template_dir=DEFAULT_TEMPLATE_DIR, index_path=None):
+    """Incrementally (re)build the index; returns (index, rescanned template names)
+
+    A template is rescanned only when its mtime/size changed and its
+    SHA-256 no longer matches the stored one.
+    """
+    index_path = index_path or os.path.join(template_dir, INDEX_FILENAME)
+    previous = load_index(index_path)['templates']
+    templates = {}
+    rescanned = []
+
+    for path in iter_templates(template_dir):
+        rel = os.path.relpath(path, template_dir)
+        stat = os.stat(path)
+        entry = previous.get(rel)
+
+        if entry and entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            templates[rel] = entry
+            continue
+
+        digest = file_sha256(path)
+        if entry and entry['sha256'] == digest:
+            entry.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            templates[rel] = entry
+            continue
+
+        try:
+            occurrences = scan_template(path)
+        except zipfile.BadZipFile:
+            print(f'⚠️  ZIP 형식이 아닌 파일 건너뜀: {rel}')
+            continue
+        templates[rel] = {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': digest,
+            'occurrences': occurrences,
+        }
+        rescanned.append(rel)
+
+    placeholders = {}
+    for rel, entry in templates.items():
+        for name, part, offset in entry['occurrences']:
+            placeholders.setdefault(name, []).append([rel, part, offset])
+
+    index = {'version': INDEX_VERSION, 'templates': templates, 'placeholders': placeholders}
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=1)
+
+    return index, rescanned
+
+
+def template_placeholders(index, template):
+    """Ordered placeholder names used by one indexed template"""
+    entry = index['templates'].get(template)
+    if entry is None:
+        raise KeyError(f'색인에 없는 템플릿: {template}')
+    return list(dict.fromkeys(name for name, _, _ in entry['occurrences']))
+
+
+def validate_records(records, required, allow_unknown=True):
+    """Check record keys against `required` placeholders before rendering
+
+    Records usually share one key set (CSV columns, one JSON schema), so
+    each distinct key set is checked once and reported once with the
+    number of the first record using it. Returns a list of error strings.
+    """
+    required = frozenset(required)
+    problems = {}
+
+    for number, record in enumerate(records, 1):
+        keys = frozenset(str(key).strip() for key, value in record.items() if value is not None)
+        problem = problems.get(keys)
+        if problem is None:
+            missing = sorted(required - keys)
+            unknown = [] if allow_unknown else sorted(keys - required)
+            problem = problems[keys] = {'first': number, 'count': 0,
+                                        'missing': missing, 'unknown': unknown}
+        problem['count'] += 1
+
+    errors = []
+    for problem in sorted(problems.values(), key=lambda p: p['first']):
+        where = f'레코드 {problem["first"]}'
+        if problem['count'] > 1:
+            where += f' 외 {problem["count"] - 1}건'
+        if problem['missing']:
+            errors.append(f'{where}: 누락된 필드 {", ".join(problem["missing"])}')
+        if problem['unknown']:
+            errors.append(f'{where}: 템플릿에 없는 필드 {", ".join(problem["unknown"])}')
+    return errors
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='플레이스홀더 색인 및 레코드 검증')
+    parser.add_argument('--template-dir', default=DEFAULT_TEMPLATE_DIR, help='템플릿 폴더')
+    parser.add_argument('--index', help=f'색인 파일 경로 (기본: <템플릿 폴더>/{INDEX_FILENAME})')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    sub.add_parser('index', help='색인 생성/갱신')
+
+    validate = sub.add_parser('validate', help='레코드를 템플릿 색인과 대조')
+    validate.add_argument('template', help='템플릿 파일명 (템플릿 폴더 기준)')
+    validate.add_argument('records', help='레코드 파일 (.csv, .json, .jsonl)')
+    validate.add_argument('--strict', action='store_true', help='템플릿에 없는 필드도 오류로 처리')
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    index, rescanned = build_index(args.template_dir, args.index)
+
+    if args.command == 'index':
+        for rel in rescanned:
+            print(f'🔍 색인: {rel}')
+        print(f'✅ 템플릿 {len(index["templates"])}개, 플레이스홀더 {len(index["placeholders"])}종 '
+              f'(재색인 {len(rescanned)}개, {time.perf_counter() - started:.3f}초)')
+        for name, locations in sorted(index['placeholders'].items()):
+            print(f'  {{{{{name}}}}} × {len(locations)}')
+        return 0
+
+    from template_renderer import load_records
+
+    template = os.path.relpath(args.template, args.template_dir) \
+        if os.path.exists(args.template) else args.template
+    try:
+        required = template_placeholders(index, template)
+    except KeyError as e:
+        print(f'❌ {e.args[0]}')
+        return 1
+
+    errors = validate_records(load_records(args.records), required, allow_unknown=not args.strict)
+    elapsed = time.perf_counter() - started
+    if errors:
+        for error in errors:
+            print(f'❌ {error}')
+        print(f'\n❌ 검증 실패 ({elapsed * 1000:.1f}ms)')
+        return 1
+    print(f'✅ 검증 통과: 필수 플레이스홀더 {len(required)}개 ({elapsed * 1000:.1f}ms)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+템플릿 린터 (분할된 플레이스홀더, 주석, 알 수 없는 필드, 대용량 파트)
+Lint every DOCX/XLSX template in a directory before it reaches the renderer
+
+Each XML part is streamed through expat in fixed-size chunks, so memory is
+bounded by the chunk size and the longest paragraph, not by the part. A
+process pool lints templates in parallel.
+
+    python scripts/lint_templates.py                    # 양식/
+    python scripts/lint_templates.py 양식 other/ --workers 8 --max-part-mb 2
+    python scripts/lint_templates.py --known-file fields.txt
+
+Exit status is 1 when anything is reported.
+"""
+
+import argparse
+import os
+import sys
+import time
+import zipfile
+from bisect import bisect_right
+from xml.parsers import expat
+
+from docx_template import PLACEHOLDER_PATTERN
+from index_placeholders import DEFAULT_TEMPLATE_DIR, TEMPLATE_EXTENSIONS, iter_templates
+
+CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_PART_BYTES = 4 * 1024 * 1024
+# Findings of one kind reported per part; the rest are only counted
+MAX_FINDINGS_PER_KIND = 20
+# Text collected per paragraph before it is checked early
+MAX_PARAGRAPH_CHARS = 1 << 20
+
+# Local names: text elements (w:t, a:t, t) and the elements a placeholder cannot span
+TEXT_ELEMENTS = frozenset({'t'})
+PARAGRAPH_ELEMENTS = frozenset({'p', 'si', 'is'})
+
+FRAGMENTED = 'fragmented'
+UNTERMINATED = 'unterminated'
+COMMENT = 'comment'
+UNKNOWN = 'unknown'
+OVERSIZED = 'oversized'
+MALFORMED = 'malformed'
+
+MESSAGES = {
+    FRAGMENTED: '여러 런으로 분할된 플레이스홀더',
+    UNTERMINATED: '짝이 맞지 않는 중괄호',
+    COMMENT: 'XML 주석',
+    UNKNOWN: '알 수 없는 플레이스홀더',
+    OVERSIZED: '크기 제한 초과 파트',
+    MALFORMED: 'XML 파싱 오류',
+}
+
+
+def default_known_placeholders():
+    """The placeholder contract of create_minimal_template()"""
+    from docx_template import find_placeholders
+    from template_spec import CONSTRUCTION_REPORT, compile_document_xml
+
+    return frozenset(find_placeholders(compile_document_xml(CONSTRUCTION_REPORT), include_blocks=True))
+
+
+_TEXT = 'text'
+_PARAGRAPH = 'paragraph'
+# Qualified tag name -> _TEXT, _PARAGRAPH or '' (callbacks run per element)
+_ELEMENT_KINDS = {}
+
+
+def _element_kind(name):
+    local = name.rpartition(':')[2]
+    kind = _TEXT if local in TEXT_ELEMENTS else _PARAGRAPH if local in PARAGRAPH_ELEMENTS else ''
+    _ELEMENT_KINDS[name] = kind
+    return kind
+
+
+class _PartLinter:
+    """expat callbacks for one XML part; collects findings as (kind, line, detail)"""
+
+    def __init__(self, known):
+        self.known = known
+        self.findings = []
+        self.counts = {}
+        self.parser = expat.ParserCreate()
+        self.parser.buffer_text = True
+        self.parser.StartElementHandler = self.start
+        self.parser.EndElementHandler = self.end
+        self.parser.CharacterDataHandler = self.text
+        self.parser.CommentHandler = self.comment
+        self.in_text = 0
+        # (text, line) pieces of the current paragraph
+        self.pieces = []
+        self.size = 0
+
+    def report(self, kind, line, detail=''):
+        count = self.counts[kind] = self.counts.get(kind, 0) + 1
+        if count <= MAX_FINDINGS_PER_KIND:
+            self.findings.append((kind, line, detail))
+
+    def start(self, name, attrs):
+        kind = _ELEMENT_KINDS.get(name)
+        if kind is None:
+            kind = _element_kind(name)
+        if kind is _TEXT:
+            self.in_text += 1
+            self.pieces.append(['', self.parser.CurrentLineNumber])
+        elif kind is _PARAGRAPH:
+            self.check_paragraph()
+
+    def end(self, name):
+        kind = _ELEMENT_KINDS.get(name)
+        if kind is _TEXT:
+            self.in_text -= 1
+        elif kind is _PARAGRAPH:
+            self.check_paragraph()
+
+    def text(self, data):
+        if self.in_text:
+            self.pieces[-1][0] += data
+            self.size += len(data)
+            if self.size > MAX_PARAGRAPH_CHARS:
+                self.check_paragraph()
+
+    def comment(self, data):
+        self.report(COMMENT, self.parser.CurrentLineNumber, f'<!--{data[:40]}-->')
+
+    def check_paragraph(self):
+        """Check the placeholders of one paragraph against its text pieces"""
+        pieces = self.pieces
+        if self.in_text and pieces:
+            # Flushing early inside a text element: keep the open piece
+            self.pieces = [pieces.pop()]
+        else:
+            self.pieces = []
+        self.size = sum(len(text) for text, _ in self.pieces)
+        if not pieces:
+            return
+
+        joined = ''.join(text for text, _ in pieces)
+        if '{' not in joined and '}' not in joined:
+            return
+
+        # Offset at which each piece ends, to map matches back to pieces
+        ends = []
+        offset = 0
+        for text, _ in pieces:
+            offset += len(text)
+            ends.append(offset)
+
+        def piece_at(position):
+            return min(bisect_right(ends, position), len(ends) - 1)
+
+        remainder = []
+        last = 0
+        for match in PLACEHOLDER_PATTERN.finditer(joined):
+            # Block tags ({{#name}}, {{^name}}, {{/name}}) are checked by their name
+            name = match.group(1).strip().lstrip('#^/').strip()
+            first, final = piece_at(match.start()), piece_at(match.end() - 1)
+            line = pieces[first][1]
+            if first != final:
+                self.report(FRAGMENTED, line, f'{{{{{name}}}}} ({final - first + 1}개 런)')
+            if self.known is not None and name not in self.known:
+                self.report(UNKNOWN, line, f'{{{{{name}}}}}')
+            remainder.append(joined[last:match.start()])
+            last = match.end()
+        remainder.append(joined[last:])
+
+        leftover = ''.join(remainder)
+        if '{{' in leftover or '}}' in leftover:
+            position = joined.find('{{') if '{{' in leftover else joined.find('}}')
+            snippet = joined[max(0, position - 10):position + 20]
+            self.report(UNTERMINATED, pieces[piece_at(max(position, 0))][1], repr(snippet))
+
+    def feed(self, data, final=False):
+        self.parser.Parse(data, final)
+        if final:
+            self.check_paragraph()
+
+
+def lint_part(zip_ref, info, known, max_part_bytes=DEFAULT_MAX_PART_BYTES):
+    """Findings for one member as ([(kind, line, detail)], {kind: total count})"""
+    if info.file_size > max_part_bytes:
+        return [(OVERSIZED, 0, f'{info.file_size:,} B > {max_part_bytes:,} B')], {OVERSIZED: 1}
+
+    linter = _PartLinter(known)
+    try:
+        with zip_ref.open(info) as stream:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                linter.feed(chunk)
+        linter.feed(b'', final=True)
+    except expat.ExpatError as e:
+        linter.report(MALFORMED, e.lineno, expat.ErrorString(e.code))
+    return linter.findings, linter.counts
+
+
+def lint_template(path, known=None, max_part_bytes=DEFAULT_MAX_PART_BYTES):
+    """Lint one template; returns (path, [(part, kind, line, detail)], {kind: count})"""
+    findings = []
+    counts = {}
+    try:
+        with zipfile.ZipFile(path, 'r') as zip_ref:
+            for info in zip_ref.infolist():
+                if not info.filename.endswith(('.xml', '.rels')):
+                    continue
+                part_findings, part_counts = lint_part(zip_ref, info, known, max_part_bytes)
+                findings.extend((info.filename, kind, line, detail) for kind, line, detail in part_findings)
+                for kind, count in part_counts.items():
+                    counts[kind] = counts.get(kind, 0) + count
+    except (zipfile.BadZipFile, OSError) as e:
+        findings.append(('', MALFORMED, 0, str(e)))
+        counts[MALFORMED] = counts.get(MALFORMED, 0) + 1
+    return path, findings, counts
+
+
+def _lint_task(args):
+    return lint_template(*args)
+
+
+def iter_paths(targets):
+    for target in targets:
+        if os.path.isdir(target):
+            yield from iter_templates(target)
+        elif target.lower().endswith(TEMPLATE_EXTENSIONS):
+            yield target
+
+
+def lint_paths(targets, known=None, max_part_bytes=DEFAULT_MAX_PART_BYTES, workers=1):
+    """Yield lint_template() results for every template under `targets`
+
+    With `workers` > 1 templates are spread over a process pool; results
+    still come back in input order.
+    """
+    tasks = ((path, known, max_part_bytes) for path in iter_paths(targets))
+    if workers <= 1:
+        yield from map(_lint_task, tasks)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(_lint_task, tasks, chunksize=4)
+
+
+def _load_known(args):
+    if args.no_unknown:
+        return None
+    known = set() if args.known or args.known_file else set(default_known_placeholders())
+    if args.known:
+        known.update(name.strip() for name in args.known.split(',') if name.strip())
+    if args.known_file:
+        with open(args.known_file, 'r', encoding='utf-8') as f:
+            known.update(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    return frozenset(known)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='DOCX/XLSX 템플릿 린터')
+    parser.add_argument('targets', nargs='*', default=[DEFAULT_TEMPLATE_DIR], help='템플릿 파일 또는 폴더')
+    parser.add_argument('--workers', type=int, default=0, help='병렬 프로세스 수 (0 = CPU 코어 수)')
+    parser.add_argument('--max-part-mb', type=float, default=DEFAULT_MAX_PART_BYTES / (1024 * 1024),
+                        help='XML 파트 크기 제한 (MB)')
+    parser.add_argument('--known', help='허용 플레이스홀더 (쉼표 구분, 기본: 착공신고서 명세)')
+    parser.add_argument('--known-file', help='허용 플레이스홀더 파일 (한 줄에 하나)')
+    parser.add_argument('--no-unknown', action='store_true', help='알 수 없는 플레이스홀더 검사 생략')
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    workers = args.workers or os.cpu_count() or 1
+    max_part_bytes = int(args.max_part_mb * 1024 * 1024)
+    totals = {}
+    templates = 0
+    failed = 0
+
+    for path, findings, counts in lint_paths(args.targets, _load_known(args), max_part_bytes, workers):
+        templates += 1
+        if not counts:
+            continue
+        failed += 1
+        print(f'❌ {path}')
+        for part, kind, line, detail in findings:
+            location = f'{part}:{line}' if line else part
+            print(f'  {location}: {MESSAGES[kind]} {detail}'.rstrip())
+        for kind, count in counts.items():
+            totals[kind] = totals.get(kind, 0) + count
+            shown = sum(1 for finding in findings if finding[1] == kind)
+            if count > shown:
+                print(f'  … {MESSAGES[kind]} {count - shown}건 더 있음')
+
+    elapsed = time.perf_counter() - started
+    if failed:
+        summary = ', '.join(f'{MESSAGES[kind]} {count}건' for kind, count in sorted(totals.items()))
+        print(f'\n❌ 템플릿 {templates}개 중 {failed}개에서 문제 발견 ({elapsed:.2f}초): {summary}')
+        return 1
+    print(f'✅ 템플릿 {templates}개 문제 없음 ({elapsed:.2f}초)')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Word에서 편집한 템플릿의 분할된 플레이스홀더 병합
+Merge <w:r> runs that split a {{placeholder}} in Word-edited DOCX templates
+"""
+
+import argparse
+import os
+import re
+import sys
+import zipfile
+
+from docx_zip import copy_member
+
+# A run holding nothing but optional formatting and one text element
+SIMPLE_RUN = re.compile(
+    r'(?P<open><w:r(?:\s[^>]*)?>)'
+    r'(?P<rpr><w:rPr>(?:(?!</w:rPr>).)*</w:rPr>)?'
+    r'<w:t(?:\s[^>]*)?>(?P<text>[^<]*)</w:t>'
+    r'</w:r>',
+    re.DOTALL,
+)
+# What may sit between two runs that are still considered adjacent
+IGNORABLE_GAP = re.compile(r'(?:\s|<w:proofErr\b[^>]*/>)*')
+TEXT_PARTS = re.compile(r'word/(document|header\d*|footer\d*|footnotes|endnotes)\.xml$')
+
+
+def _is_open(text):
+    """True when `text` ends inside a {{ token, or on a '{' that may start one"""
+    start = text.rfind('{{')
+    if start == -1:
+        return text.endswith('{')
+    return text.find('}}', start + 2) == -1
+
+
+def normalize_runs(xml_text, merge_formatting=False):
+    """Merge fragmented placeholder runs in one pass over `xml_text`
+
+    Runs are merged only while a token is open and the next run is
+    adjacent; with `merge_formatting` runs whose rPr differs are merged too
+    (the first run's formatting wins). Returns (xml, merged, unresolved).
+    """
+    out = []
+    pos = 0
+    group = None
+    merged = 0
+    unresolved = 0
+
+    def flush(group, closed):
+        nonlocal merged, unresolved
+        first, end, rpr, texts = group['first'], group['end'], group['rpr'], group['texts']
+        if len(texts) > 1 and closed:
+            out.append(f'{first.group("open")}{rpr}<w:t xml:space="preserve">{"".join(texts)}</w:t></w:r>')
+            merged += 1
+        else:
+            out.append(xml_text[first.start():end])
+            if not closed:
+                unresolved += 1
+
+    for match in SIMPLE_RUN.finditer(xml_text):
+        text = match.group('text')
+        rpr = match.group('rpr') or ''
+
+        if group is not None:
+            gap_ok = IGNORABLE_GAP.fullmatch(xml_text, group['end'], match.start()) is not None
+            if gap_ok and (merge_formatting or rpr == group['rpr']):
+                group['texts'].append(text)
+                group['end'] = match.end()
+                if not _is_open(''.join(group['texts'])):
+                    flush(group, closed=True)
+                    pos = match.end()
+                    group = None
+                continue
+            flush(group, closed=False)
+            pos = group['end']
+            group = None
+
+        if _is_open(text):
+            out.append(xml_text[pos:match.start()])
+            group = {'first': match, 'end': match.end(), 'rpr': rpr, 'texts': [text]}
+
+    if group is not None:
+        flush(group, closed=False)
+        pos = group['end']
+    out.append(xml_text[pos:])
+
+    return ''.join(out), merged, unresolved
+
+
+def normalize_template(input_path, output_path, merge_formatting=False):
+    """Normalize every text part of a DOCX; untouched members are copied raw"""
+    stats = {'merged': 0, 'unresolved': 0, 'parts': []}
+
+    with zipfile.ZipFile(input_path, 'r') as zip_ref, \
+            zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zip_out:
+        for info in zip_ref.infolist():
+            if TEXT_PARTS.match(info.filename):
+                xml_text = zip_ref.read(info).decode('utf-8')
+                if '{' in xml_text:
+                    normalized, merged, unresolved = normalize_runs(xml_text, merge_formatting)
+                    stats['unresolved'] += unresolved
+                    if merged:
+                        new_info = zipfile.ZipInfo(info.filename, info.date_time)
+                        new_info.compress_type = zipfile.ZIP_DEFLATED
+                        new_info.external_attr = info.external_attr
+                        zip_out.writestr(new_info, normalized)
+                        stats['merged'] += merged
+                        stats['parts'].append(info.filename)
+                        continue
+            copy_member(zip_ref, zip_out, info)
+
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='분할된 플레이스홀더 run 병합')
+    parser.add_argument('input', help='Word에서 편집한 DOCX 템플릿')
+    parser.add_argument('output', nargs='?', help='출력 경로 (기본: <입력>_정규화.docx)')
+    parser.add_argument('--merge-formatting', action='store_true',
+                        help='서식(rPr)이 다른 run도 병합 (첫 run 서식 유지)')
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.input):
+        print(f'❌ 입력 파일을 찾을 수 없습니다: {args.input}')
+        return 1
+
+    output = args.output or os.path.splitext(args.input)[0] + '_정규화.docx'
+    print(f'📖 읽는 중: {args.input}')
+    stats = normalize_template(args.input, output, args.merge_formatting)
+
+    for name in stats['parts']:
+        print(f'✅ {name} 수정 완료')
+    print(f'🔗 병합된 플레이스홀더: {stats["merged"]}개')
+    if stats['unresolved']:
+        print(f'⚠️  병합하지 못한 분할 토큰: {stats["unresolved"]}개 (서식이 다르면 --merge-formatting)')
+    print(f'✅ 저장: {output}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
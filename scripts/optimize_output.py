@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+"""
+DOCX/XLSX 출력 크기 최적화 (XML 축소, 미사용 스타일/번호 제거, 미디어 중복 제거)
+Shrink generated documents for storage and bulk download
+
+Passes, each reported with the bytes it saved and the time it took:
+
+    minify     drop indentation between tags (text elements such as <w:t>
+               are left exactly as they are, so <w:t> </w:t> keeps its space)
+    comments   drop XML comments such as <!-- Row N -->
+    styles     drop word/styles.xml entries nothing refers to (python-docx
+               ships ~160 of them), following basedOn/next/link chains
+    numbering  drop numbering definitions no paragraph or kept style uses
+    media      store identical media once and point every relationship at it
+    deflate    recompress with the chosen level; members whose bytes did not
+               change and have no level rule are copied without recompressing
+
+A member that does not get smaller when deflated is stored. Running this
+once on a template shrinks every document rendered from it at no cost per
+document; on an output directory it trades CPU time for archive size:
+
+    python scripts/optimize_output.py 양식/템플릿.docx 양식/템플릿_최적화.docx
+    python scripts/optimize_output.py output/착공신고서 --in-place --workers 4 --level 9
+    python scripts/optimize_output.py report.docx out.docx --member-level 'word/media/*=0' --member-level '*.xml=9'
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import os
+import posixpath
+import re
+import sys
+import tempfile
+import time
+import zipfile
+import zlib
+
+from docx_zip import copy_member, write_raw_member
+from lint_templates import iter_paths
+from remove_comments_from_template import COMMENT_PATTERN, _target_mode
+from stage_metrics import METRICS, add_arguments, instrumented
+from validate_output import CONTENT_TYPES_PART, XML_EXTENSIONS, _resolve_target, _source_part
+
+PASSES = ('minify', 'comments', 'styles', 'numbering', 'media', 'deflate')
+DEFAULT_LEVEL = 6
+
+# Elements whose text is content: whitespace inside them is significant
+_TEXT_ELEMENT = re.compile(rb'<((?:\w+:)?(?:t|instrText|delText|delInstrText))(?:\s[^>]*)?(?<!/)>.*?</\1>', re.S)
+# Indentation between tags always contains a line break; a lone space may be content
+_INDENT = re.compile(rb'>[ \t]*\r?\n\s*<')
+
+STYLE_PARTS = ('word/styles.xml', 'word/stylesWithEffects.xml')
+NUMBERING_PART = 'word/numbering.xml'
+_STYLE = re.compile(rb'<w:style\b[^>]*?(?:/>|>.*?</w:style>)', re.S)
+_STYLE_ID = re.compile(rb'\bw:styleId="([^"]*)"')
+_STYLE_DEFAULT = re.compile(rb'\bw:default="(?:1|true|on)"')
+_STYLE_REF = re.compile(rb'<w:(?:pStyle|rStyle|tblStyle|basedOn|next|link|numStyleLink|styleLink)\b[^>]*?\bw:val="([^"]*)"')
+_NUM_REF = re.compile(rb'<w:numId\b[^>]*?\bw:val="(\d+)"')
+_NUM = re.compile(rb'<w:num\b[^>]*?\bw:numId="(\d+)"[^>]*>.*?</w:num>', re.S)
+_ABSTRACT_NUM = re.compile(rb'<w:abstractNum\b[^>]*?\bw:abstractNumId="(\d+)"[^>]*>.*?</w:abstractNum>', re.S)
+_ABSTRACT_REF = re.compile(rb'<w:abstractNumId\b[^>]*?\bw:val="(\d+)"')
+
+_RELATIONSHIP = re.compile(rb'<Relationship\b[^>]*>')
+_TARGET = re.compile(rb'\bTarget="([^"]*)"')
+_OVERRIDE = re.compile(rb'<Override\b[^>]*?\bPartName="([^"]*)"[^>]*/>')
+
+
+class _Timer:
+    """Add a pass's wall time to stats['seconds'] (and to METRICS when enabled)"""
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.stage = METRICS.stage(f'optimize.{self.name}').__enter__()
+        self.started = time.perf_counter()
+        return self.stage
+
+    def __exit__(self, *exc):
+        seconds = self.stats['seconds']
+        seconds[self.name] = seconds.get(self.name, 0.0) + time.perf_counter() - self.started
+        return self.stage.__exit__(*exc)
+
+
+def _saved(stats, name, before, after):
+    stats['saved'][name] = stats['saved'].get(name, 0) + before - after
+
+
+def minify_xml(data):
+    """Remove indentation between tags, leaving text elements untouched"""
+    out = []
+    last = 0
+    for match in _TEXT_ELEMENT.finditer(data):
+        out.append(_INDENT.sub(b'><', data[last:match.start()]))
+        out.append(match.group(0))
+        last = match.end()
+    out.append(_INDENT.sub(b'><', data[last:]))
+    return b''.join(out)
+
+
+def prune_styles(parts):
+    """Drop unused styles and numbering from `parts` ({name: bytes}) in place
+
+    A style is kept when it is a default, when any part other than the
+    style/numbering parts refers to it, or when a kept style or kept
+    numbering level does; numbering is kept when a part or kept style
+    uses its numId. Returns (styles removed, numbering definitions removed).
+    """
+    styles_part = next((name for name in STYLE_PARTS if name in parts), None)
+    if styles_part is None:
+        return 0, 0
+
+    styles = {}
+    keep_styles = set()
+    for match in _STYLE.finditer(parts[styles_part]):
+        block = match.group(0)
+        style_id = _STYLE_ID.search(block)
+        if style_id is None:
+            continue
+        styles[style_id.group(1)] = block
+        if _STYLE_DEFAULT.search(block.split(b'>', 1)[0]):
+            keep_styles.add(style_id.group(1))
+
+    numbering = parts.get(NUMBERING_PART, b'')
+    nums = {}
+    for match in _NUM.finditer(numbering):
+        abstract = _ABSTRACT_REF.search(match.group(0))
+        nums[match.group(1)] = abstract.group(1) if abstract else None
+    abstracts = {match.group(1): match.group(0) for match in _ABSTRACT_NUM.finditer(numbering)}
+
+    keep_nums = set()
+    for name, data in parts.items():
+        if name in STYLE_PARTS or name == NUMBERING_PART or not name.endswith('.xml'):
+            continue
+        keep_styles.update(_STYLE_REF.findall(data))
+        keep_nums.update(_NUM_REF.findall(data))
+
+    # Styles refer to numbering (numPr) and numbering levels to styles (pStyle): iterate to a fixpoint
+    keep_abstracts = set()
+    pending = list(keep_styles)
+    while True:
+        while pending:
+            block = styles.get(pending.pop())
+            if block is None:
+                continue
+            for style_id in _STYLE_REF.findall(block):
+                if style_id not in keep_styles:
+                    keep_styles.add(style_id)
+                    pending.append(style_id)
+            keep_nums.update(_NUM_REF.findall(block))
+        added = {nums.get(num_id) for num_id in keep_nums} - keep_abstracts - {None}
+        if not added:
+            break
+        keep_abstracts |= added
+        for abstract_id in added:
+            for style_id in _STYLE_REF.findall(abstracts.get(abstract_id, b'')):
+                if style_id not in keep_styles:
+                    keep_styles.add(style_id)
+                    pending.append(style_id)
+
+    removed_styles = 0
+    for name in STYLE_PARTS:
+        if name not in parts:
+            continue
+
+        def style(match):
+            nonlocal removed_styles
+            style_id = _STYLE_ID.search(match.group(0))
+            if style_id is None or style_id.group(1) in keep_styles:
+                return match.group(0)
+            removed_styles += name == styles_part
+            return b''
+        parts[name] = _STYLE.sub(style, parts[name])
+
+    removed_numbering = 0
+    if numbering:
+        def definition(match, keep):
+            nonlocal removed_numbering
+            if match.group(1) in keep:
+                return match.group(0)
+            removed_numbering += 1
+            return b''
+        numbering = _NUM.sub(lambda match: definition(match, keep_nums), numbering)
+        parts[NUMBERING_PART] = _ABSTRACT_NUM.sub(lambda match: definition(match, keep_abstracts), numbering)
+    return removed_styles, removed_numbering
+
+
+def dedupe_media(parts):
+    """Keep one copy of identical media and retarget relationships to it
+
+    Only members under a media/ folder are merged; obfuscated fonts are
+    keyed per reference and must stay separate. Returns {removed: kept}.
+    """
+    seen = {}
+    duplicates = {}
+    for name, data in parts.items():
+        if '/media/' not in f'/{name}':
+            continue
+        digest = hashlib.sha256(data).digest()
+        if digest in seen:
+            duplicates[name] = seen[digest]
+        else:
+            seen[digest] = name
+    if not duplicates:
+        return duplicates
+
+    for name in list(parts):
+        if name.endswith('.rels'):
+            source = _source_part(name)
+
+            def relationship(match):
+                element = match.group(0)
+                if b'TargetMode="External"' in element:
+                    return element
+                target = _TARGET.search(element)
+                resolved = _resolve_target(source, target.group(1).decode('utf-8')) if target else None
+                if resolved not in duplicates:
+                    return element
+                kept = posixpath.relpath(duplicates[resolved], posixpath.dirname(source) or '.')
+                return element[:target.start(1)] + kept.encode('utf-8') + element[target.end(1):]
+            parts[name] = _RELATIONSHIP.sub(relationship, parts[name])
+    if CONTENT_TYPES_PART in parts:
+        parts[CONTENT_TYPES_PART] = _OVERRIDE.sub(
+            lambda match: b'' if match.group(1).decode('utf-8').lstrip('/') in duplicates else match.group(0),
+            parts[CONTENT_TYPES_PART])
+    for name in duplicates:
+        del parts[name]
+    return duplicates
+
+
+def member_level(name, level, member_levels):
+    """Compression level for `name`: the first matching PATTERN=LEVEL rule, else `level`"""
+    for pattern, pattern_level in member_levels:
+        if fnmatch.fnmatchcase(name, pattern):
+            return pattern_level
+    return level
+
+
+def _write_member(zip_out, info, data, level):
+    """Deflate `data` at `level` (0 = stored), storing it when deflate does not help"""
+    member = zipfile.ZipInfo(info.filename, info.date_time)
+    member.external_attr = info.external_attr
+    member.CRC = zlib.crc32(data)
+    member.file_size = len(data)
+    raw = data
+    member.compress_type = zipfile.ZIP_STORED
+    if level:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+        deflated = compressor.compress(data) + compressor.flush()
+        if len(deflated) < len(data):
+            raw = deflated
+            member.compress_type = zipfile.ZIP_DEFLATED
+    write_raw_member(zip_out, member, raw)
+    return len(raw)
+
+
+def optimize_package(input_path, output_path, minify=True, comments=True, prune=True, dedupe=True,
+                     level=None, member_levels=()):
+    """Write an optimized copy of `input_path` to `output_path`; returns a stats dict
+
+    `level` recompresses every member at that level; without it only
+    rewritten members are recompressed (at DEFAULT_LEVEL) and the rest are
+    copied as they are. `member_levels` is a list of (glob, level) rules
+    that take precedence. The package is held in memory while it is
+    rewritten, which is fine for generated documents.
+    """
+    stats = {'bytes_in': os.path.getsize(input_path), 'bytes_out': 0, 'seconds': {}, 'saved': {},
+             'styles': 0, 'numbering': 0, 'media': 0}
+    started = time.perf_counter()
+
+    with zipfile.ZipFile(input_path, 'r') as zip_ref:
+        infos = zip_ref.infolist()
+        with _Timer(stats, 'read'):
+            original = {info.filename: zip_ref.read(info) for info in infos if not info.is_dir()}
+        parts = dict(original)
+
+        xml_names = [name for name in parts if name.lower().endswith(XML_EXTENSIONS)]
+        if comments:
+            with _Timer(stats, 'comments') as stage:
+                for name in xml_names:
+                    data = parts[name]
+                    if b'<!--' in data:
+                        parts[name] = COMMENT_PATTERN.sub(b'', data)
+                        _saved(stats, 'comments', len(data), len(parts[name]))
+                        stage.add(len(data), len(parts[name]))
+        if minify:
+            with _Timer(stats, 'minify') as stage:
+                for name in xml_names:
+                    data = parts[name]
+                    minified = minify_xml(data) if b'\n' in data else data
+                    if len(minified) != len(data):
+                        parts[name] = minified
+                        _saved(stats, 'minify', len(data), len(minified))
+                        stage.add(len(data), len(minified))
+        if prune:
+            with _Timer(stats, 'styles'):
+                before = {name: len(parts[name]) for name in (*STYLE_PARTS, NUMBERING_PART) if name in parts}
+                stats['styles'], stats['numbering'] = prune_styles(parts)
+                for name, size in before.items():
+                    _saved(stats, 'numbering' if name == NUMBERING_PART else 'styles', size, len(parts[name]))
+        if dedupe:
+            with _Timer(stats, 'media'):
+                duplicates = dedupe_media(parts)
+                stats['media'] = len(duplicates)
+                for name in duplicates:
+                    _saved(stats, 'media', len(original[name]), 0)
+
+        with _Timer(stats, 'deflate') as stage, zipfile.ZipFile(output_path, 'w') as zip_out:
+            for info in infos:
+                data = parts.get(info.filename)
+                if data is None:
+                    continue
+                chosen = member_level(info.filename, level, member_levels)
+                if chosen is None and data is original[info.filename]:
+                    written = copy_member(zip_ref, zip_out, info)
+                else:
+                    written = _write_member(zip_out, info, data, DEFAULT_LEVEL if chosen is None else chosen)
+                stage.add(len(data), written)
+
+    stats['bytes_out'] = os.path.getsize(output_path)
+    stats['seconds']['total'] = time.perf_counter() - started
+    return stats
+
+
+def optimize_file(input_path, output_path, **options):
+    """optimize_package() through a temp file, so `output_path` may be `input_path`"""
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    fd, temp_path = tempfile.mkstemp(suffix='.tmp', prefix='.optimize_', dir=output_dir)
+    os.close(fd)
+    try:
+        stats = optimize_package(input_path, temp_path, **options)
+        os.chmod(temp_path, _target_mode(output_path))
+        os.replace(temp_path, output_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return stats
+
+
+def _optimize_task(args):
+    input_path, output_path, options = args
+    try:
+        return input_path, optimize_file(input_path, output_path, **options), METRICS.drain(), None
+    except (zipfile.BadZipFile, OSError) as e:
+        return input_path, None, METRICS.drain(), str(e)
+
+
+def _init_worker(metrics):
+    METRICS.enabled = metrics
+
+
+def optimize_paths(jobs, options, workers=1):
+    """Yield (input, stats, stage metrics, error) per (input, output) job, in input order"""
+    tasks = ((input_path, output_path, options) for input_path, output_path in jobs)
+    if workers <= 1:
+        yield from map(_optimize_task, tasks)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(METRICS.enabled,)) as pool:
+        yield from pool.map(_optimize_task, tasks, chunksize=8)
+
+
+def _parse_member_level(text):
+    pattern, separator, level = text.rpartition('=')
+    if not separator or not pattern or not level.isdigit() or int(level) > 9:
+        raise argparse.ArgumentTypeError(f'PATTERN=LEVEL (0-9) 형식이어야 합니다: {text}')
+    return pattern, int(level)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='DOCX/XLSX 출력 크기 최적화')
+    parser.add_argument('paths', nargs='*', help='INPUT [OUTPUT], or files/folders to rewrite with --in-place')
+    parser.add_argument('--in-place', action='store_true', help='각 파일을 제자리에서 수정')
+    parser.add_argument('--workers', type=int, default=1, help='병렬 프로세스 수 (0 = CPU 코어 수)')
+    parser.add_argument('--level', type=int, choices=range(10), metavar='0-9',
+                        help='모든 멤버를 이 압축 레벨로 다시 압축 (기본: 바뀐 멤버만 레벨 6)')
+    parser.add_argument('--member-level', type=_parse_member_level, action='append', default=[],
+                        metavar='PATTERN=LEVEL', help="멤버별 압축 레벨, 예: 'word/media/*=0' (여러 번 지정 가능)")
+    parser.add_argument('--no-minify', action='store_true', help='XML 공백 유지')
+    parser.add_argument('--keep-comments', action='store_true', help='XML 주석 유지')
+    parser.add_argument('--no-prune', action='store_true', help='미사용 스타일/번호 유지')
+    parser.add_argument('--no-dedupe', action='store_true', help='중복 미디어 유지')
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.in_place:
+        jobs = [(path, path) for path in iter_paths(args.paths)]
+    elif len(args.paths) not in (1, 2):
+        parser.error('without --in-place, pass INPUT [OUTPUT]')
+    else:
+        input_file = args.paths[0]
+        output_file = args.paths[1] if len(args.paths) == 2 else os.path.splitext(input_file)[0] + '_최적화' + \
+            os.path.splitext(input_file)[1]
+        jobs = [(input_file, output_file)]
+
+    for input_file, _ in jobs:
+        if not os.path.exists(input_file):
+            print(f'❌ 입력 파일을 찾을 수 없습니다: {input_file}')
+            return 1
+
+    options = {'minify': not args.no_minify, 'comments': not args.keep_comments, 'prune': not args.no_prune,
+               'dedupe': not args.no_dedupe, 'level': args.level, 'member_levels': args.member_level}
+    workers = args.workers or os.cpu_count() or 1
+    totals = {'files': 0, 'bytes_in': 0, 'bytes_out': 0, 'seconds': {}, 'saved': {},
+              'styles': 0, 'numbering': 0, 'media': 0}
+    failed = 0
+    started = time.perf_counter()
+
+    with instrumented(args, 'optimize'):
+        for path, stats, stages, error in optimize_paths(jobs, options, workers):
+            METRICS.merge(stages)
+            if error is not None:
+                failed += 1
+                print(f'❌ {path}: {error}')
+                continue
+            totals['files'] += 1
+            for key in ('bytes_in', 'bytes_out', 'styles', 'numbering', 'media'):
+                totals[key] += stats[key]
+            for key in ('seconds', 'saved'):
+                for name, value in stats[key].items():
+                    totals[key][name] = totals[key].get(name, 0) + value
+            if len(jobs) <= 20:
+                print(f'✅ {path}: {stats["bytes_in"]:,} B → {stats["bytes_out"]:,} B '
+                      f'({_percent(stats["bytes_in"], stats["bytes_out"])}, {stats["seconds"]["total"] * 1000:.1f}ms)')
+
+    _print_summary(totals, time.perf_counter() - started)
+    return 1 if failed else 0
+
+
+def _percent(before, after):
+    return f'{(after - before) / before * 100:+.1f}%' if before else '0%'
+
+
+def _print_summary(totals, elapsed):
+    bytes_in, bytes_out = totals['bytes_in'], totals['bytes_out']
+    print(f'\n📦 파일 {totals["files"]}개: {bytes_in:,} B → {bytes_out:,} B '
+          f'({bytes_in - bytes_out:,} B 절감, {_percent(bytes_in, bytes_out)}), {elapsed:.2f}초')
+    counts = {'styles': f'스타일 {totals["styles"]}개 제거', 'numbering': f'번호 정의 {totals["numbering"]}개 제거',
+              'media': f'중복 미디어 {totals["media"]}개 제거'}
+    seconds = totals['seconds']
+    for name in PASSES:
+        if name not in seconds and name not in totals['saved']:
+            continue
+        # XML passes save uncompressed bytes; deflate shows the compressed total
+        detail = f'압축 후 {bytes_out:,} B' if name == 'deflate' else f'-{totals["saved"].get(name, 0):,} B (압축 전)'
+        extra = f', {counts[name]}' if name in counts else ''
+        # Numbering is pruned together with styles and timed with them
+        took = f'{seconds[name]:.3f}초' if name in seconds else '(styles 포함)'
+        print(f'  {name:<10} {detail}{extra}  {took}')
+
+
+if __name__ == '__main__':
+    sys.exit(main())
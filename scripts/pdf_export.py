@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+생성된 DOCX를 PDF로 변환 (상주 LibreOffice 워커 풀)
+Convert rendered DOCX files to PDF through a pool of warm headless soffice instances
+
+Each worker owns one soffice process with its own profile directory
+(UserInstallation), started once and reused for every file it takes from
+the shared queue, when the `uno` module (python3-uno) is available: files
+are loaded and exported over a local pipe connection. Without it the pool
+falls back to a cold start per batch: each worker runs a new
+`soffice --convert-to pdf` for every COMMAND_BATCH files (only its profile
+is reused), and a warning says so. Conversions that exceed the timeout
+kill and restart that worker's soffice and the file is retried. Nothing
+leaves the machine.
+
+    python scripts/pdf_export.py output/착공신고서 -o output/착공신고서_pdf --workers 4
+"""
+
+import argparse
+import os
+import queue
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+
+DEFAULT_TIMEOUT = 120
+STARTUP_TIMEOUT = 60
+MAX_ATTEMPTS = 2
+COMMAND_BATCH = 8
+PDF_FILTER = 'writer_pdf_Export'
+
+_SOFFICE_CANDIDATES = (
+    'soffice',
+    'libreoffice',
+    '/usr/lib/libreoffice/program/soffice',
+    '/opt/libreoffice/program/soffice',
+    '/Applications/LibreOffice.app/Contents/MacOS/soffice',
+    r'C:\Program Files\LibreOffice\program\soffice.exe',
+)
+
+
+def find_soffice():
+    """Path of the soffice binary, or None"""
+    for candidate in _SOFFICE_CANDIDATES:
+        path = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        if path:
+            return path
+    return None
+
+
+def _uno_available():
+    try:
+        import uno  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _profile_url(path):
+    from pathlib import Path
+    return Path(path).resolve().as_uri()
+
+
+def pdf_path(docx_path, output_dir):
+    stem = os.path.splitext(os.path.basename(docx_path))[0]
+    return os.path.join(output_dir, f'{stem}.pdf')
+
+
+class ConversionError(RuntimeError):
+    """Conversion of `sources` failed (None: the whole batch)"""
+
+    def __init__(self, message, sources=None):
+        super().__init__(message)
+        self.sources = sources
+
+
+class _Worker(ABC):
+    """One soffice instance plus the thread feeding it from the queue"""
+
+    # True when one soffice process serves every file the worker takes
+    warm = True
+
+    def __init__(self, index, soffice, profile_dir, timeout):
+        self.index = index
+        self.soffice = soffice
+        self.profile_dir = profile_dir
+        self.timeout = timeout
+        self.process = None
+        self.converted = 0
+        self.restarts = 0
+        self.busy_seconds = 0.0
+
+    def _base_command(self):
+        return [self.soffice, '--headless', '--invisible', '--nologo', '--norestore', '--nodefault',
+                '--nolockcheck', f'-env:UserInstallation={_profile_url(self.profile_dir)}']
+
+    def start(self):
+        pass
+
+    def _spawn(self, command, stderr):
+        import subprocess
+
+        # Own process group: the soffice wrapper script forks soffice.bin,
+        # and both must die when a conversion hangs
+        return subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                                stderr=stderr, start_new_session=os.name == 'posix')
+
+    def stop(self):
+        process, self.process = self.process, None
+        if process is None or process.poll() is not None:
+            return
+        if os.name == 'posix':
+            import signal
+
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+        else:
+            process.kill()
+        process.wait()
+
+    def restart(self):
+        self.stop()
+        self.restarts += 1
+        self.start()
+
+    @abstractmethod
+    def convert(self, jobs, output_dir):
+        """Write the PDF of every path in `jobs` to `output_dir`; raise ConversionError on failure"""
+
+
+class UnoWorker(_Worker):
+    """Warm soffice listening on a named pipe; documents are exported over UNO"""
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.pipe = f'facility_pdf_{os.getpid()}_{self.index}'
+        self.desktop = None
+
+    def start(self):
+        import subprocess
+
+        import uno
+        from com.sun.star.connection import NoConnectException
+
+        command = self._base_command() + [f'--accept=pipe,name={self.pipe};urp;StarOffice.ComponentContext']
+        self.process = self._spawn(command, subprocess.DEVNULL)
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext('com.sun.star.bridge.UnoUrlResolver', local)
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while True:
+            try:
+                context = resolver.resolve(f'uno:pipe,name={self.pipe};urp;StarOffice.ComponentContext')
+                break
+            except NoConnectException:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    raise ConversionError(f'soffice 워커 {self.index} 시작 실패')
+                time.sleep(0.2)
+        self.desktop = context.ServiceManager.createInstanceWithContext('com.sun.star.frame.Desktop', context)
+
+    @staticmethod
+    def _properties(**values):
+        from com.sun.star.beans import PropertyValue
+
+        properties = []
+        for name, value in values.items():
+            prop = PropertyValue()
+            prop.Name = name
+            prop.Value = value
+            properties.append(prop)
+        return tuple(properties)
+
+    def convert(self, jobs, output_dir):
+        import uno
+
+        for source in jobs:
+            target = pdf_path(source, output_dir)
+            temp_target = f'{target}.{self.index}.tmp'
+            # A hung export blocks inside soffice; killing the process unblocks the call
+            watchdog = threading.Timer(self.timeout, self.stop)
+            watchdog.start()
+            try:
+                document = self.desktop.loadComponentFromURL(
+                    uno.systemPathToFileUrl(os.path.abspath(source)), '_blank', 0,
+                    self._properties(Hidden=True, ReadOnly=True))
+                try:
+                    document.storeToURL(uno.systemPathToFileUrl(os.path.abspath(temp_target)),
+                                        self._properties(FilterName=PDF_FILTER))
+                finally:
+                    document.close(True)
+            except Exception as e:
+                raise ConversionError(f'{source}: {e}') from e
+            finally:
+                watchdog.cancel()
+            os.replace(temp_target, target)
+
+
+class CommandWorker(_Worker):
+    """`soffice --convert-to pdf` per batch: a new process each time, only the profile is reused"""
+
+    warm = False
+
+    def start(self):
+        # The first run creates the profile; later runs skip that setup
+        os.makedirs(self.profile_dir, exist_ok=True)
+
+    def convert(self, jobs, output_dir):
+        import subprocess
+
+        scratch = tempfile.mkdtemp(prefix='convert_', dir=self.profile_dir)
+        try:
+            command = self._base_command() + ['--convert-to', 'pdf', '--outdir', scratch, *jobs]
+            self.process = self._spawn(command, subprocess.PIPE)
+            try:
+                _, stderr = self.process.communicate(timeout=self.timeout * len(jobs))
+            except subprocess.TimeoutExpired as e:
+                raise ConversionError(f'시간 초과: {", ".join(jobs)}') from e
+            finally:
+                self.stop()
+            missing = []
+            for source in jobs:
+                produced = pdf_path(source, scratch)
+                if os.path.exists(produced):
+                    os.replace(produced, pdf_path(source, output_dir))
+                else:
+                    missing.append(source)
+            if missing:
+                detail = stderr.decode('utf-8', 'replace').strip().splitlines()
+                raise ConversionError(f'{detail[-1] if detail else "변환 실패"}', sources=missing)
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+def pending_exports(docx_paths, output_dir, force=False):
+    """DOCX files whose PDF is missing or older than the DOCX"""
+    for source in docx_paths:
+        target = pdf_path(source, output_dir)
+        if force or not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(source):
+            yield source
+
+
+def export_pdfs(docx_paths, output_dir, workers=2, timeout=DEFAULT_TIMEOUT, use_uno=None,
+                soffice=None):
+    """Convert `docx_paths` into `output_dir` with `workers` warm soffice instances
+
+    Returns {'count', 'failed': [(path, error)], 'seconds', 'workers': [...]}.
+    """
+    soffice = soffice or find_soffice()
+    if soffice is None:
+        raise ConversionError('LibreOffice(soffice)를 찾을 수 없습니다')
+    if use_uno is None:
+        use_uno = _uno_available()
+    worker_class = UnoWorker if use_uno else CommandWorker
+    if not worker_class.warm:
+        print(f'⚠️  콜드 스타트 모드 (uno 미사용): 상주 워커 대신 {COMMAND_BATCH}건마다 '
+              f'soffice를 새로 시작합니다', file=sys.stderr)
+    os.makedirs(output_dir, exist_ok=True)
+
+    jobs = queue.Queue()
+    total = 0
+    for source in docx_paths:
+        jobs.put((source, 1))
+        total += 1
+    if not total:
+        return {'count': 0, 'failed': [], 'seconds': 0.0, 'workers': []}
+
+    started = time.perf_counter()
+    profile_root = tempfile.mkdtemp(prefix='facility_soffice_')
+    pool = [worker_class(i, soffice, os.path.join(profile_root, f'profile_{i}'), timeout)
+            for i in range(max(1, min(workers, total)))]
+    failed = []
+    lock = threading.Lock()
+
+    def finish(sources, error=None):
+        if error is not None:
+            with lock:
+                failed.extend((source, error) for source in sources)
+
+    # Files from a failed batch are retried one at a time, before new work
+    retries = queue.Queue()
+
+    def take_batch(size):
+        try:
+            return [retries.get_nowait()]
+        except queue.Empty:
+            pass
+        batch = []
+        while len(batch) < size:
+            try:
+                batch.append(jobs.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def run(worker):
+        try:
+            worker.start()
+        except Exception as e:
+            # The remaining workers drain the queue
+            print(f'⚠️  워커 {worker.index} 시작 실패: {e}', file=sys.stderr)
+            return
+        try:
+            while True:
+                batch = take_batch(1 if use_uno else COMMAND_BATCH)
+                if not batch:
+                    return
+                sources = [source for source, _ in batch]
+                busy = time.perf_counter()
+                try:
+                    worker.convert(sources, output_dir)
+                except ConversionError as e:
+                    broken = set(sources if e.sources is None else e.sources)
+                    converted = [source for source in sources if source not in broken]
+                    worker.converted += len(converted)
+                    finish(converted)
+                    for source, attempt in batch:
+                        if source not in broken:
+                            continue
+                        if attempt < MAX_ATTEMPTS:
+                            retries.put((source, attempt + 1))
+                        else:
+                            finish([source], str(e))
+                    try:
+                        worker.restart()
+                    except Exception as restart_error:
+                        print(f'⚠️  워커 {worker.index} 재시작 실패: {restart_error}', file=sys.stderr)
+                        return
+                else:
+                    worker.converted += len(sources)
+                    finish(sources)
+                worker.busy_seconds += time.perf_counter() - busy
+        finally:
+            worker.stop()
+
+    threads = [threading.Thread(target=run, args=(worker,), daemon=True) for worker in pool]
+    try:
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        for worker in pool:
+            worker.stop()
+        shutil.rmtree(profile_root, ignore_errors=True)
+
+    # Files left when every worker failed to start
+    for left in (retries, jobs):
+        while True:
+            try:
+                source, _ = left.get_nowait()
+            except queue.Empty:
+                break
+            failed.append((source, '사용 가능한 워커 없음'))
+
+    return {
+        'count': total - len(failed),
+        'failed': failed,
+        'seconds': time.perf_counter() - started,
+        'workers': [{'index': w.index, 'count': w.converted, 'restarts': w.restarts,
+                     'seconds': w.busy_seconds} for w in pool],
+    }
+
+
+def _iter_docx(targets):
+    for target in targets:
+        if os.path.isdir(target):
+            for name in sorted(os.listdir(target)):
+                if name.lower().endswith('.docx') and not name.startswith('~$'):
+                    yield os.path.join(target, name)
+        else:
+            yield target
+
+
+def print_report(stats, output_dir):
+    count, elapsed = stats['count'], stats['seconds']
+    per_minute = count / elapsed * 60 if elapsed > 0 else 0.0
+    print(f'✅ PDF {count}건 변환: {output_dir}')
+    print(f'⏱️  {elapsed:.1f}초, {per_minute:.1f} docs/min')
+    for worker in stats['workers']:
+        restarts = f', 재시작 {worker["restarts"]}회' if worker['restarts'] else ''
+        print(f'   👷 soffice {worker["index"]}: {worker["count"]}건{restarts}')
+    for source, error in stats['failed']:
+        print(f'❌ {source}: {error}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='DOCX → PDF 변환 (LibreOffice 워커 풀)')
+    parser.add_argument('inputs', nargs='+', help='DOCX 파일 또는 폴더')
+    parser.add_argument('-o', '--output-dir', help='PDF 출력 폴더 (기본: 첫 입력 폴더)')
+    parser.add_argument('--workers', type=int, default=2, help='동시에 실행할 soffice 수')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT, help='파일당 변환 제한 시간 (초)')
+    parser.add_argument('--soffice', help='soffice 실행 파일 경로')
+    parser.add_argument('--no-uno', action='store_true', help='uno 없이 --convert-to 사용')
+    parser.add_argument('--force', action='store_true', help='PDF가 최신이어도 다시 변환')
+    args = parser.parse_args(argv)
+
+    output_dir = args.output_dir or (args.inputs[0] if os.path.isdir(args.inputs[0])
+                                     else os.path.dirname(args.inputs[0]) or '.')
+    sources = list(pending_exports(_iter_docx(args.inputs), output_dir, args.force))
+    if not sources:
+        print('✅ 변환할 파일이 없습니다 (모든 PDF가 최신)')
+        return 0
+
+    print(f'📄 PDF 변환 대상 {len(sources)}건 (워커 {args.workers}개)')
+    try:
+        stats = export_pdfs(sources, output_dir, args.workers, args.timeout,
+                            use_uno=False if args.no_uno else None, soffice=args.soffice)
+    except ConversionError as e:
+        print(f'❌ {e}')
+        return 1
+    print_report(stats, output_dir)
+    return 1 if stats['failed'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,424 @@
+#!/usr/bin/env python3
+"""
+레코드 수집 (CSV/JSON 내보내기 또는 Postgres/SQLite 직접 조회)
+Stream template records from an export file or a database, renamed to placeholders
+
+A mapping file says which columns feed which placeholders:
+
+    {
+      "table": "business_info",
+      "key": "id",
+      "where": "is_deleted = false",
+      "columns": {
+        "business_name": "사업장명",
+        "COALESCE(fan_current_meter, 0) + COALESCE(pump_current_meter, 0)": "방지CT"
+      }
+    }
+
+Plain column names are quoted; anything else is selected as an SQL
+expression (database sources only). Rows come from a server-side cursor
+in `fetch_size` batches, so a whole table is never held in memory, and
+connections are borrowed from a small pool. Without a mapping file the
+business_info -> 착공신고서 mapping below is used for databases, and file
+records pass through unchanged.
+
+    python scripts/record_source.py postgresql://user@host/db --limit 5
+    python scripts/record_source.py postgres                    # DSN from $DATABASE_URL
+    python scripts/record_source.py export.csv --to-sqlite standin.db
+    python scripts/record_source.py sqlite:///standin.db --mapping mapping.json   # sqlite:////abs/path.db
+
+psycopg2 is only imported for postgres sources.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, Optional
+
+DEFAULT_FETCH_SIZE = 500
+DEFAULT_POOL_SIZE = 4
+DATABASE_URL_ENV = 'DATABASE_URL'
+
+_IDENTIFIER = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+@dataclass
+class RecordMapping:
+    """Source table/query and the column -> placeholder renames applied to each row"""
+    columns: Dict[str, str]
+    table: Optional[str] = None
+    key: Optional[str] = None
+    where: Optional[str] = None
+    query: Optional[str] = None
+    params: Dict[str, object] = field(default_factory=dict)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def select(self):
+        """The SELECT for database sources; `query` wins when given"""
+        if self.query:
+            return self.query
+        if not self.table:
+            raise ValueError('매핑에 table 또는 query 가 필요합니다')
+        selected = [f'{_quote(self.key)} AS {_quote(self.key)}'] if self.key else []
+        for source, placeholder in self.columns.items():
+            expression = _quote(source) if _IDENTIFIER.match(source) else f'({source})'
+            selected.append(f'{expression} AS {_quote(placeholder)}')
+        sql = f'SELECT {", ".join(selected)} FROM {self.table}'
+        if self.where:
+            sql += f' WHERE {self.where}'
+        if self.key:
+            # Stable order, so a rerun sees records in the same sequence
+            sql += f' ORDER BY {_quote(self.key)}'
+        return sql
+
+    def rename(self, record):
+        """Apply the plain-column renames to a file record (expressions are skipped)"""
+        renamed = {}
+        for column, value in record.items():
+            name = str(column).strip()
+            renamed[self.columns.get(name, name)] = value
+        return renamed
+
+
+def load_mapping(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return RecordMapping.from_dict(json.load(f))
+
+
+# business_info columns (sql/02_business_schema.sql) -> 착공신고서 placeholders
+DEFAULT_MAPPING = RecordMapping(
+    table='business_info',
+    key='id',
+    where='is_deleted = false',
+    columns={
+        'business_name': '사업장명',
+        'address': '주소',
+        'business_contact': '회사연락처',
+        'fax_number': '팩스번호',
+        'business_registration_number': '사업자등록번호',
+        'representative_name': '대표자성명',
+        'local_government': '지자체장',
+        'subsidy_approval_date': '보조금 승인일',
+        'gateway': '게이트웨이',
+        'vpn': 'VPN',
+        'discharge_current_meter': '배출CT',
+        'COALESCE(fan_current_meter, 0) + COALESCE(pump_current_meter, 0)': '방지CT',
+        'differential_pressure_meter': '차압계',
+        'temperature_meter': '온도계',
+        'ph_meter': 'PH계',
+    },
+)
+
+
+def _quote(identifier):
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def to_value(value):
+    """Database value -> what the renderer and derived fields expect"""
+    if isinstance(value, Decimal):
+        return int(value) if value == value.to_integral_value() else str(value)
+    if isinstance(value, datetime.datetime):
+        return value.isoformat(sep=' ')
+    if isinstance(value, datetime.date):
+        return value.isoformat()
+    if isinstance(value, (bytes, memoryview)):
+        return None
+    return value
+
+
+class ConnectionPool:
+    """At most `size` connections made by `connect()`, reused across queries
+
+    Thread-safe; a borrower blocks while all connections are in use.
+    """
+
+    def __init__(self, connect, size=DEFAULT_POOL_SIZE):
+        self._connect = connect
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._all = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        try:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+                with self._lock:
+                    self._all.append(conn)
+            try:
+                yield conn
+            finally:
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            for conn in self._all:
+                conn.close()
+            self._all = []
+        self._idle = queue.LifoQueue()
+
+
+class DatabaseSource:
+    """Rows of a mapping's SELECT, streamed through a server-side cursor"""
+
+    def __init__(self, pool, fetch_size=DEFAULT_FETCH_SIZE):
+        self.pool = pool
+        self.fetch_size = fetch_size
+
+    def _cursor(self, conn):
+        return conn.cursor()
+
+    def _finish(self, conn):
+        pass
+
+    def _check(self, conn, mapping):
+        pass
+
+    def records(self, mapping):
+        """Yield one dict per row, keyed by placeholder name"""
+        sql = mapping.select()
+        with self.pool.connection() as conn:
+            self._check(conn, mapping)
+            cursor = self._cursor(conn)
+            try:
+                cursor.execute(sql, mapping.params)
+                names = None
+                while True:
+                    rows = cursor.fetchmany(self.fetch_size)
+                    if not rows:
+                        break
+                    if names is None:
+                        names = [column[0] for column in cursor.description]
+                    for row in rows:
+                        yield {name: to_value(value) for name, value in zip(names, row)}
+            finally:
+                cursor.close()
+                self._finish(conn)
+
+    def count(self, mapping):
+        with self.pool.connection() as conn:
+            self._check(conn, mapping)
+            cursor = conn.cursor()
+            try:
+                cursor.execute(f'SELECT COUNT(*) FROM ({mapping.select()}) AS records', mapping.params)
+                return cursor.fetchone()[0]
+            finally:
+                cursor.close()
+                self._finish(conn)
+
+    def close(self):
+        self.pool.close()
+
+
+class PostgresSource(DatabaseSource):
+    """Postgres via psycopg2: named (server-side) cursors, pooled connections"""
+
+    def __init__(self, dsn, fetch_size=DEFAULT_FETCH_SIZE, pool_size=DEFAULT_POOL_SIZE):
+        try:
+            import psycopg2
+        except ImportError:
+            raise RuntimeError('Postgres 조회에는 psycopg2 가 필요합니다 (pip install psycopg2-binary)') from None
+        super().__init__(ConnectionPool(lambda: psycopg2.connect(dsn), pool_size), fetch_size)
+        self._cursors = 0
+
+    def _cursor(self, conn):
+        # A named cursor keeps the result set on the server; rows arrive per fetchmany()
+        self._cursors += 1
+        cursor = conn.cursor(name=f'facility_records_{os.getpid()}_{self._cursors}')
+        cursor.itersize = self.fetch_size
+        return cursor
+
+    def _finish(self, conn):
+        # Named cursors live in a transaction; end it before the connection is reused
+        conn.rollback()
+
+
+class SQLiteSource(DatabaseSource):
+    """SQLite stand-in for tests and local runs (cursors step lazily through results)"""
+
+    def __init__(self, path, fetch_size=DEFAULT_FETCH_SIZE, pool_size=DEFAULT_POOL_SIZE):
+        def connect():
+            return sqlite3.connect(f'file:{path}?mode=ro', uri=True, check_same_thread=False)
+        super().__init__(ConnectionPool(connect, pool_size), fetch_size)
+
+    def _check(self, conn, mapping):
+        """Fail on mapped columns the table lacks
+
+        SQLite reads a double-quoted name that matches no column as a string
+        literal, so "vpn" AS "VPN" would quietly yield 'vpn' where Postgres
+        raises an error.
+        """
+        if mapping.query or not mapping.table:
+            return
+        schema, _, table = mapping.table.rpartition('.')
+        pragma = f'PRAGMA {_quote(schema)}.table_info' if schema else 'PRAGMA table_info'
+        existing = {row[1] for row in conn.execute(f'{pragma}({_quote(table)})')}
+        if not existing:
+            raise RuntimeError(f'SQLite 테이블을 찾을 수 없습니다: {mapping.table}')
+        wanted = [mapping.key] if mapping.key else []
+        wanted += [source for source in mapping.columns if _IDENTIFIER.match(source)]
+        missing = [column for column in dict.fromkeys(wanted) if column not in existing]
+        if missing:
+            raise RuntimeError(f'{mapping.table} 테이블에 없는 컬럼: {", ".join(missing)}')
+
+
+def is_database(source):
+    return (source in ('postgres', 'postgresql') or source.startswith(('postgres://', 'postgresql://', 'sqlite:///'))
+            or source.lower().endswith(('.db', '.sqlite', '.sqlite3')))
+
+
+def open_database(source, fetch_size=DEFAULT_FETCH_SIZE, pool_size=DEFAULT_POOL_SIZE):
+    if source in ('postgres', 'postgresql'):
+        dsn = os.environ.get(DATABASE_URL_ENV)
+        if not dsn:
+            raise RuntimeError(f'${DATABASE_URL_ENV} 가 설정되지 않았습니다')
+        return PostgresSource(dsn, fetch_size, pool_size)
+    if source.startswith(('postgres://', 'postgresql://')):
+        return PostgresSource(source, fetch_size, pool_size)
+    # sqlite:///relative.db, sqlite:////absolute/path.db (SQLAlchemy style) or a bare path
+    path = source[len('sqlite:///'):] if source.startswith('sqlite:///') else source
+    if not os.path.exists(path):
+        raise RuntimeError(f'SQLite 파일을 찾을 수 없습니다: {path}')
+    return SQLiteSource(path, fetch_size, pool_size)
+
+
+def open_records(source, mapping=None, fetch_size=DEFAULT_FETCH_SIZE):
+    """Stream records from a file path or database URL
+
+    `mapping` is a RecordMapping or a mapping file path. Database sources
+    default to DEFAULT_MAPPING; file records are only renamed when a
+    mapping is given.
+    """
+    if isinstance(mapping, str):
+        mapping = load_mapping(mapping)
+    if is_database(source):
+        database = open_database(source, fetch_size)
+        try:
+            yield from database.records(mapping or DEFAULT_MAPPING)
+        finally:
+            database.close()
+        return
+
+    from template_renderer import load_records
+
+    records = load_records(source)
+    if mapping is None:
+        yield from records
+    else:
+        yield from map(mapping.rename, records)
+
+
+def count_records(source, mapping=None, fetch_size=DEFAULT_FETCH_SIZE):
+    """Number of records open_records() will yield (COUNT(*) for databases)"""
+    if isinstance(mapping, str):
+        mapping = load_mapping(mapping)
+    if is_database(source):
+        database = open_database(source, fetch_size)
+        try:
+            return database.count(mapping or DEFAULT_MAPPING)
+        finally:
+            database.close()
+    return sum(1 for _ in open_records(source, mapping, fetch_size))
+
+
+def _sqlite_value(value):
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, str) and value.lower() in ('true', 'false'):
+        return int(value.lower() == 'true')
+    if value is None or isinstance(value, (int, float, str)):
+        return value
+    return json.dumps(value, ensure_ascii=False, default=str)
+
+
+def write_sqlite(path, records, table='business_info', batch_size=DEFAULT_FETCH_SIZE):
+    """Load records into a SQLite table to stand in for Postgres
+
+    Columns are untyped, so numbers stay numbers; booleans (and the
+    'true'/'false' strings of a Supabase CSV export) become 1/0 so
+    `is_deleted = false` filters work the same way.
+    """
+    conn = sqlite3.connect(path)
+    count = 0
+    try:
+        columns = None
+        batch = []
+
+        def flush():
+            conn.executemany(
+                f'INSERT INTO {_quote(table)} VALUES ({", ".join("?" * len(columns))})',
+                [[_sqlite_value(record.get(column)) for column in columns] for record in batch])
+            batch.clear()
+
+        for record in records:
+            if columns is None:
+                columns = [str(column).strip() for column in record]
+                conn.execute(f'DROP TABLE IF EXISTS {_quote(table)}')
+                conn.execute(f'CREATE TABLE {_quote(table)} ({", ".join(map(_quote, columns))})')
+            batch.append(record)
+            count += 1
+            if len(batch) >= batch_size:
+                flush()
+        if batch:
+            flush()
+        conn.commit()
+    finally:
+        conn.close()
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='레코드 수집 (JSON Lines 출력)')
+    parser.add_argument('source', help='레코드 파일 (.csv, .json, .jsonl) 또는 DB (postgresql://…, sqlite:///…, postgres)')
+    parser.add_argument('--mapping', help='컬럼 → 플레이스홀더 매핑 파일 (JSON)')
+    parser.add_argument('--fetch-size', type=int, default=DEFAULT_FETCH_SIZE, help='한 번에 가져올 행 수')
+    parser.add_argument('--limit', type=int, help='출력할 최대 레코드 수')
+    parser.add_argument('--to-sqlite', metavar='DB', help='JSON Lines 대신 SQLite 테이블로 저장 (테스트용)')
+    parser.add_argument('--table', default='business_info', help='--to-sqlite 테이블 이름')
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    try:
+        records = open_records(args.source, args.mapping, args.fetch_size)
+        if args.limit is not None:
+            from itertools import islice
+
+            records = islice(records, args.limit)
+        if args.to_sqlite:
+            count = write_sqlite(args.to_sqlite, records, args.table, args.fetch_size)
+        else:
+            count = 0
+            for record in records:
+                sys.stdout.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+                count += 1
+    except (RuntimeError, ValueError, OSError, sqlite3.Error) as e:
+        print(f'❌ {e}', file=sys.stderr)
+        return 1
+    elapsed = time.perf_counter() - started
+    destination = f' → {args.to_sqlite}' if args.to_sqlite else ''
+    print(f'✅ {count}건 수집{destination} ({elapsed * 1000:.1f}ms)', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""
+컬럼형 레코드 저장소 (대량 일괄 생성용)
+Columnar, compact in-memory storage for large render batches
+
+A list of dicts pays for a hash table per record and a separate string
+object per value, even when thousands of records share the same 지자체장,
+dates or counts. RecordStore keeps one column per template field instead,
+in the compiled template's field order:
+
+    - repeating values are dictionary-encoded: an array('H') (or 'I') of
+      codes per column, with the strings interned across the whole store
+    - columns where most values are unique (사업장명, 주소, ...) switch to
+      a plain list, so they do not pay for a lookup table as well
+    - list/dict values for {{#block}} sections are kept as objects
+
+Rows are __slots__ views. A Row reads like a read-only dict of the raw
+values (output_filename, record_digest and formulas take it as is), and
+prepare_values() turns it into an escaped view rather than a new dict,
+so the renderer reads the columns directly:
+
+    store = RecordStore.for_template(template, extra_fields=['사업장명'])
+    store.extend(records)
+    render_batch(template_path, store, output_dir)
+
+Fields the template does not use are not stored.
+"""
+
+from array import array
+from collections.abc import Mapping
+
+from docx_template import escape
+
+# Code 0 marks a field the record did not have
+_MISSING = 0
+_ABSENT = object()
+# Checked once a column holds this many rows; above the ratio it goes plain
+_CARDINALITY_SAMPLE = 1024
+_PLAIN_RATIO = 0.5
+
+
+class _Column:
+    """One field: dictionary-encoded codes, or a plain list once values are mostly unique"""
+
+    __slots__ = ('codes', 'values', 'lookup', 'escaped', 'plain')
+
+    def __init__(self):
+        self.codes = array('H')
+        # values[0] stands for a missing field
+        self.values = [None]
+        self.lookup = {}
+        self.escaped = [None]
+        self.plain = None
+
+    def __len__(self):
+        return len(self.plain) if self.plain is not None else len(self.codes)
+
+    def __getstate__(self):
+        # The lookup table and escaped values are rebuilt; only codes and values travel
+        return self.codes, self.values, self.plain
+
+    def __setstate__(self, state):
+        self.codes, self.values, self.plain = state
+        if self.plain is None:
+            self.lookup = {value: code for code, value in enumerate(self.values) if code}
+            self.escaped = [None]
+        else:
+            self.lookup = self.escaped = None
+
+    def append(self, value, strings):
+        if self.plain is not None:
+            self.plain.append(value)
+            return
+        if value is None:
+            self.codes.append(_MISSING)
+            return
+        if value.__class__ is not str:
+            # Lists and dicts feed {{#block}} sections; they are not hashable codes
+            self._go_plain()
+            self.plain.append(value)
+            return
+        code = self.lookup.get(value)
+        if code is None:
+            code = len(self.values)
+            if code == 0x10000 and self.codes.typecode == 'H':
+                self.codes = array('I', self.codes)
+            value = strings.setdefault(value, value)
+            self.values.append(value)
+            self.lookup[value] = code
+        self.codes.append(code)
+        if len(self.codes) == _CARDINALITY_SAMPLE and len(self.values) > _CARDINALITY_SAMPLE * _PLAIN_RATIO:
+            self._go_plain()
+
+    def _go_plain(self):
+        values = self.values
+        self.plain = [values[code] for code in self.codes]
+        self.codes = self.values = self.lookup = self.escaped = None
+
+    def value(self, position):
+        if self.plain is not None:
+            return self.plain[position]
+        return self.values[self.codes[position]]
+
+    def escaped_value(self, position):
+        if self.plain is not None:
+            value = self.plain[position]
+            return escape(value) if value.__class__ is str else value
+        code = self.codes[position]
+        escaped = self.escaped
+        if code >= len(escaped):
+            # Escape each distinct value once, as the column grows
+            escaped.extend(escape(value) for value in self.values[len(escaped):])
+        return escaped[code]
+
+
+def _to_value(value):
+    """The renderer's view of a raw value: None as '', scalars as str, blocks as is"""
+    if value is None:
+        return ''
+    if value.__class__ is str or isinstance(value, (list, tuple, dict)):
+        return value
+    return str(value)
+
+
+class RecordStore:
+    """Records as columns, one per field, in `fields` order"""
+
+    def __init__(self, fields):
+        self.fields = tuple(dict.fromkeys(str(name).strip() for name in fields))
+        self.index = {name: position for position, name in enumerate(self.fields)}
+        self.columns = [_Column() for _ in self.fields]
+        self._strings = {}
+        self._size = 0
+
+    @classmethod
+    def for_template(cls, template, extra_fields=()):
+        """A store for the fields `template` renders, plus e.g. the file name or ID field"""
+        return cls([*template.field_names, *extra_fields])
+
+    @classmethod
+    def from_records(cls, records, fields):
+        store = cls(fields)
+        store.extend(records)
+        return store
+
+    def append(self, record):
+        """Add one record (any object with .get); fields outside the store are dropped"""
+        strings = self._strings
+        get = record.get
+        for name, column in zip(self.fields, self.columns):
+            value = get(name, _ABSENT)
+            column.append(None if value is _ABSENT else _to_value(value), strings)
+        self._size += 1
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, position):
+        if position < 0:
+            position += self._size
+        if not 0 <= position < self._size:
+            raise IndexError(position)
+        return Row(self, position)
+
+    def __iter__(self):
+        for position in range(self._size):
+            yield Row(self, position)
+
+    def slice(self, start, stop=None):
+        """A new store with rows [start, stop), e.g. a chunk to send to a worker process"""
+        chunk = RecordStore(self.fields)
+        for position in range(*slice(start, stop).indices(self._size)):
+            chunk.append(Row(self, position))
+        return chunk
+
+    def __getstate__(self):
+        return {'fields': self.fields, 'columns': self.columns, 'size': self._size}
+
+    def __setstate__(self, state):
+        self.fields = state['fields']
+        self.index = {name: position for position, name in enumerate(self.fields)}
+        self.columns = state['columns']
+        self._size = state['size']
+        self._strings = {}
+        for column in self.columns:
+            if column.plain is None:
+                self._strings.update((value, value) for value in column.values[1:])
+
+
+class Row(Mapping):
+    """Read-only view of one stored record: raw values, like the dict it was built from"""
+
+    __slots__ = ('store', 'position')
+
+    def __init__(self, store, position):
+        self.store = store
+        self.position = position
+
+    def get(self, name, default=None):
+        store = self.store
+        index = store.index.get(name)
+        if index is None:
+            return default
+        value = store.columns[index].value(self.position)
+        return default if value is None else value
+
+    def __getitem__(self, name):
+        value = self.get(name, _ABSENT)
+        if value is _ABSENT:
+            raise KeyError(name)
+        return value
+
+    def items(self):
+        position = self.position
+        pairs = ((name, column.value(position)) for name, column in zip(self.store.fields, self.store.columns))
+        return [(name, value) for name, value in pairs if value is not None]
+
+    def keys(self):
+        return [name for name, _ in self.items()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.items())
+
+    def __repr__(self):
+        return f'Row({dict(self.items())!r})'
+
+    def __reduce__(self):
+        # A worker process needs only this record, not the store: send the plain dict
+        return dict, (self.items(),)
+
+    def prepared(self):
+        """The renderer's view: XML-escaped strings, block values as is"""
+        return PreparedRow(self.store, self.position)
+
+
+class PreparedRow:
+    """Escaped values of one stored record, read by the renderer in place of prepare_values()"""
+
+    __slots__ = ('index', 'columns', 'position')
+
+    def __init__(self, store, position):
+        self.index = store.index
+        self.columns = store.columns
+        self.position = position
+
+    def get(self, name, default=None):
+        index = self.index.get(name)
+        if index is None:
+            return default
+        value = self.columns[index].escaped_value(self.position)
+        return default if value is None else value
@@ -1,78 +1,138 @@
 #!/usr/bin/env python3
 """
 템플릿에서 XML 주석 제거
-Remove XML comments from template
+Remove XML comments from template (zip-to-zip streaming, no temp directory)
 """
 
-import zipfile
-import re
+import argparse
 import os
+import re
+import sys
+import tempfile
+import zipfile
 
-def remove_comments_from_template(input_path, output_path):
-    """Remove XML comments from DOCX template"""
+from docx_zip import copy_member
+from stage_metrics import METRICS, add_arguments, instrumented
 
-    print(f'📖 읽는 중: {input_path}')
+COMMENT_PATTERN = re.compile(rb'<!--.*?-->', re.DOTALL)
+XML_SUFFIXES = ('.xml', '.rels')
 
-    # Create temp directory
-    temp_dir = 'temp_comment_removal'
-    os.makedirs(temp_dir, exist_ok=True)
 
-    try:
-        # Extract DOCX
-        with zipfile.ZipFile(input_path, 'r') as zip_ref:
-            zip_ref.extractall(temp_dir)
+def _is_xml_part(name):
+    return name.lower().endswith(XML_SUFFIXES)
 
-        print('✅ DOCX 압축 해제 완료')
 
-        # Read document.xml
-        doc_xml_path = os.path.join(temp_dir, 'word', 'document.xml')
-        with open(doc_xml_path, 'r', encoding='utf-8') as f:
-            xml_content = f.read()
+def _target_mode(path):
+    """Keep an existing file's mode, otherwise use the umask default (mkstemp uses 0600)"""
+    if os.path.exists(path):
+        return os.stat(path).st_mode & 0o777
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
 
-        print('✅ document.xml 읽기 완료')
 
-        # Count comments before
-        comments_before = len(re.findall(r'<!--.*?-->', xml_content, re.DOTALL))
-        print(f'📝 주석 발견: {comments_before}개')
+def strip_comments(input_path, output_path):
+    """Stream `input_path` into `output_path`, rewriting only XML parts with comments
 
-        # Remove XML comments
-        xml_without_comments = re.sub(r'<!--.*?-->', '', xml_content, flags=re.DOTALL)
+    Members without comments (including all fonts/media) are copied as their
+    original compressed bytes. Returns a stats dict.
+    """
+    stats = {'parts': 0, 'rewritten': [], 'copied': 0, 'comments': 0}
 
-        # Count comments after
-        comments_after = len(re.findall(r'<!--.*?-->', xml_without_comments, re.DOTALL))
-        print(f'✅ 주석 제거 후: {comments_after}개')
+    with zipfile.ZipFile(input_path, 'r') as zip_ref, \
+            zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zip_out:
+        for info in zip_ref.infolist():
+            stats['parts'] += 1
 
-        # Write fixed XML
-        with open(doc_xml_path, 'w', encoding='utf-8') as f:
-            f.write(xml_without_comments)
+            if _is_xml_part(info.filename):
+                with METRICS.stage('strip.read') as stage:
+                    data = zip_ref.read(info)
+                    stage.add(info.compress_size, len(data))
+                if b'<!--' in data:
+                    with METRICS.stage('strip.regex') as stage:
+                        cleaned, count = COMMENT_PATTERN.subn(b'', data)
+                        stage.add(len(data), len(cleaned))
+                    if count:
+                        new_info = zipfile.ZipInfo(info.filename, info.date_time)
+                        new_info.compress_type = zipfile.ZIP_DEFLATED
+                        new_info.external_attr = info.external_attr
+                        with METRICS.stage('strip.write') as stage:
+                            zip_out.writestr(new_info, cleaned)
+                            stage.add(len(cleaned), new_info.compress_size)
+                        stats['rewritten'].append(info.filename)
+                        stats['comments'] += count
+                        continue
 
-        print('✅ document.xml 수정 완료')
+            with METRICS.stage('strip.copy') as stage:
+                copied = copy_member(zip_ref, zip_out, info)
+                stage.add(copied, copied)
+            stats['copied'] += 1
 
-        # Recreate DOCX
-        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zip_ref:
-            for root, dirs, files in os.walk(temp_dir):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    arcname = os.path.relpath(file_path, temp_dir)
-                    zip_ref.write(file_path, arcname)
+    return stats
 
-        print(f'✅ 수정된 파일 저장: {output_path}')
 
-    finally:
-        # Cleanup
-        import shutil
-        if os.path.exists(temp_dir):
-            shutil.rmtree(temp_dir)
-        print('✅ 임시 파일 정리 완료')
+def remove_comments_from_template(input_path, output_path):
+    """Remove XML comments from DOCX template
 
-if __name__ == '__main__':
-    input_file = '양식/☆착공신고서 템플릿_최종.docx'
-    output_file = '양식/☆착공신고서 템플릿_최종_주석제거.docx'
+    Writes to a unique temp file next to `output_path` and renames it into
+    place, so concurrent runs never share state and `output_path` may be
+    the same file as `input_path`.
+    """
+
+    print(f'📖 읽는 중: {input_path}')
 
-    if not os.path.exists(input_file):
-        print(f'❌ 입력 파일을 찾을 수 없습니다: {input_file}')
-        exit(1)
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    fd, temp_path = tempfile.mkstemp(suffix='.tmp', prefix='.comment_removal_', dir=output_dir)
+    os.close(fd)
+
+    try:
+        stats = strip_comments(input_path, temp_path)
+        os.chmod(temp_path, _target_mode(output_path))
+        os.replace(temp_path, output_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    print(f'📝 주석 발견: {stats["comments"]}개')
+    for name in stats['rewritten']:
+        print(f'✅ {name} 수정 완료')
+    print(f'✅ 변경 없는 파트 {stats["copied"]}개 원본 그대로 복사')
+    print(f'✅ 수정된 파일 저장: {output_path}')
+
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='DOCX 템플릿 XML 주석 제거')
+    parser.add_argument('paths', nargs='*', help='INPUT [OUTPUT], or files to rewrite with --in-place')
+    parser.add_argument('--in-place', action='store_true', help='각 파일을 제자리에서 수정')
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    if args.in_place:
+        jobs = [(path, path) for path in args.paths]
+    elif len(args.paths) > 2:
+        parser.error('without --in-place, pass at most INPUT and OUTPUT')
+    else:
+        input_file = args.paths[0] if args.paths else '양식/☆착공신고서 템플릿_최종.docx'
+        if len(args.paths) == 2:
+            output_file = args.paths[1]
+        else:
+            output_file = os.path.splitext(input_file)[0] + '_주석제거.docx'
+        jobs = [(input_file, output_file)]
+
+    for input_file, _ in jobs:
+        if not os.path.exists(input_file):
+            print(f'❌ 입력 파일을 찾을 수 없습니다: {input_file}')
+            return 1
 
     print('🔧 XML 주석 제거 시작...\n')
-    remove_comments_from_template(input_file, output_file)
+    with instrumented(args, 'strip_comments'):
+        for input_file, output_file in jobs:
+            remove_comments_from_template(input_file, output_file)
     print('\n🎉 완료!')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,440 @@
+#!/usr/bin/env python3
+"""
+재개 가능한 일괄 생성 작업 (SQLite 저널, 재시도, 진행률)
+Resumable batch render job with a SQLite journal, retries and progress reporting
+
+Every finished chunk is committed to the journal (record ID, output file,
+SHA-256), so a run killed at document 7,000 of 10,000 resumes with the
+next unfinished record. Outputs are written to a temporary name and
+renamed, so a journaled file is always complete. Records that raise are
+retried with exponential backoff after the main pass; what still fails
+stays in the journal and is tried again on the next run.
+
+Progress (done/total, docs/s, ETA) goes to stdout, and with --status to a
+JSON file rewritten atomically for the admin pages to poll.
+
+    python scripts/render_job.py sqlite:////data/standin.db -o output/착공신고서 --status status.json
+    python scripts/render_job.py records.csv -o output/착공신고서 --workers 4 --retries 3
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+
+import template_renderer
+from docx_template import render_bytes
+from stage_metrics import METRICS, add_arguments, instrumented
+from template_cache import get_template
+from template_renderer import DEFAULT_NAME_FIELD, DEFAULT_TEMPLATE, _chunked, _init_worker, output_filename
+
+DEFAULT_ID_FIELD = 'id'
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 1.0
+MAX_BACKOFF = 60.0
+PROGRESS_INTERVAL = 1.0
+
+# `<output>.<pid>.tmp` names written by _render_job_chunk
+_TEMP_OUTPUT = re.compile(r'\.docx\.\d+\.tmp$')
+
+DONE = 'done'
+FAILED = 'failed'
+
+_SCHEMA = '''
+CREATE TABLE IF NOT EXISTS job (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS records (
+    record_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    filename TEXT,
+    sha256 TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    updated REAL NOT NULL
+);
+'''
+
+
+def journal_path(output_dir):
+    return os.path.normpath(output_dir) + '.job.sqlite'
+
+
+class JobJournal:
+    """Completed and failed records of one output directory, committed per chunk"""
+
+    def __init__(self, path):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(_SCHEMA)
+
+    def get(self, key, default=None):
+        row = self.conn.execute('SELECT value FROM job WHERE key = ?', (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set(self, **values):
+        with self.conn:
+            self.conn.executemany('INSERT OR REPLACE INTO job (key, value) VALUES (?, ?)',
+                                  [(key, json.dumps(value, ensure_ascii=False)) for key, value in values.items()])
+
+    def reset(self):
+        with self.conn:
+            self.conn.execute('DELETE FROM job')
+            self.conn.execute('DELETE FROM records')
+
+    def completed(self):
+        """{record_id: filename} of records already rendered"""
+        return dict(self.conn.execute('SELECT record_id, filename FROM records WHERE status = ?', (DONE,)))
+
+    def attempts(self):
+        return dict(self.conn.execute('SELECT record_id, attempts FROM records WHERE status = ?', (FAILED,)))
+
+    def commit(self, done, failed):
+        """Record one chunk: done as [(record_id, filename, sha256)], failed as [(record_id, attempts, error)]"""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO records (record_id, status, filename, sha256, attempts, error, updated) '
+                'VALUES (?, ?, ?, ?, COALESCE((SELECT attempts FROM records WHERE record_id = ?), 0) + 1, NULL, ?)',
+                [(record_id, DONE, filename, digest, record_id, now) for record_id, filename, digest in done])
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO records (record_id, status, attempts, error, updated) VALUES (?, ?, ?, ?, ?)',
+                [(record_id, FAILED, attempts, error, now) for record_id, attempts, error in failed])
+
+    def failures(self):
+        return self.conn.execute(
+            'SELECT record_id, attempts, error FROM records WHERE status = ? ORDER BY record_id', (FAILED,)).fetchall()
+
+    def close(self):
+        self.conn.close()
+
+
+class Progress:
+    """done/total, docs/s and ETA, printed and/or written to a JSON status file"""
+
+    def __init__(self, job, total, skipped=0, status_path=None, quiet=False, interval=PROGRESS_INTERVAL):
+        self.job = job
+        self.total = total
+        self.skipped = skipped
+        self.status_path = status_path
+        self.quiet = quiet
+        self.interval = interval
+        self.done = 0
+        self.failed = 0
+        self.retrying = 0
+        self.state = 'running'
+        self.started = time.time()
+        self._last = 0.0
+
+    def snapshot(self):
+        elapsed = time.time() - self.started
+        rate = self.done / elapsed if elapsed > 0 else 0.0
+        finished = self.skipped + self.done
+        remaining = None if self.total is None else max(self.total - finished - self.failed, 0)
+        eta = remaining / rate if remaining is not None and rate > 0 else None
+        return {
+            'job': self.job,
+            'state': self.state,
+            'done': finished,
+            'rendered': self.done,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'retrying': self.retrying,
+            'total': self.total,
+            'docs_per_second': round(rate, 2),
+            'eta_seconds': None if eta is None else round(eta, 1),
+            'elapsed_seconds': round(elapsed, 1),
+            'started': self.started,
+            'updated': time.time(),
+        }
+
+    def update(self, done=0, failed=0, force=False):
+        self.done += done
+        self.failed += failed
+        now = time.monotonic()
+        if force or now - self._last >= self.interval:
+            self._last = now
+            self.report()
+
+    def report(self):
+        status = self.snapshot()
+        if self.status_path:
+            _write_json_atomic(self.status_path, status)
+        if not self.quiet:
+            total = '?' if status['total'] is None else status['total']
+            eta = '-' if status['eta_seconds'] is None else _format_seconds(status['eta_seconds'])
+            failed = f', 실패 {status["failed"]}' if status['failed'] else ''
+            print(f'⏳ {status["done"]}/{total}{failed}  {status["docs_per_second"]:.1f} docs/s  ETA {eta}',
+                  flush=True)
+
+    def finish(self, state):
+        self.state = state
+        self.report()
+
+
+def _format_seconds(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f'{hours}:{minutes:02d}:{seconds:02d}' if hours else f'{minutes}:{seconds:02d}'
+
+
+def _write_json_atomic(path, data):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _derive(chunk, formulas):
+    """`chunk` with `formulas` applied, or the exception for a record they raise on
+
+    The chunk is evaluated column-wise in one go; only when that raises is
+    each record evaluated alone, so the records at fault fail by themselves.
+    """
+    records = [record for _, _, record in chunk]
+    try:
+        derived = formulas.apply(records)
+    except Exception:  # noqa: BLE001 - narrowed down per record below
+        derived = []
+        for record in records:
+            try:
+                derived.extend(formulas.apply([record]))
+            except Exception as e:  # noqa: BLE001 - reported per record and retried
+                derived.append(e)
+    return [(index, record_id, record) for (index, record_id, _), record in zip(chunk, derived)]
+
+
+def _render_job_chunk(chunk, output_dir, name_field, formulas=None):
+    """Render (index, record_id, record) items; one failing record does not sink the chunk
+
+    Derived fields are computed here rather than while reading records, so
+    a record whose formulas raise is journaled as failed like a render error.
+    Returns (pid, [(record_id, filename, sha256)], [(record_id, error)], stage metrics).
+    """
+    if formulas is not None:
+        chunk = _derive(chunk, formulas)
+    done = []
+    failed = []
+    for index, record_id, record in chunk:
+        try:
+            if isinstance(record, Exception):
+                raise record
+            filename = output_filename(index, record, name_field)
+            data = render_bytes(template_renderer._worker_template, record)
+            path = os.path.join(output_dir, filename)
+            with METRICS.stage('render.write') as stage:
+                temp_path = f'{path}.{os.getpid()}.tmp'
+                with open(temp_path, 'wb') as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+                stage.add(len(data), len(data))
+            done.append((record_id, filename, hashlib.sha256(data).hexdigest()))
+        except Exception as e:  # noqa: BLE001 - reported per record and retried
+            failed.append((record_id, f'{type(e).__name__}: {e}'))
+    return os.getpid(), done, failed, METRICS.drain()
+
+
+def _record_id(index, record, id_field):
+    value = record.get(id_field)
+    return str(index) if value is None or value == '' else str(value)
+
+
+def run_job(template_path, records, output_dir, journal, progress, name_field=DEFAULT_NAME_FIELD,
+            id_field=DEFAULT_ID_FIELD, workers=1, chunk_size=64, cache_dir=None,
+            retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, formulas=None):
+    """Render every record not yet in `journal`, committing after each chunk
+
+    `formulas` (a FormulaSet) is applied to each chunk in the worker.
+    Failed records are kept in memory and retried up to `retries` times
+    after the main pass, sleeping backoff * 2**n seconds between rounds.
+    Returns the number of records that still failed.
+    """
+    template = get_template(template_path, cache_dir)
+    completed = journal.completed()
+    attempts = journal.attempts()
+    pending_failures = {}
+
+    def pending():
+        for index, record in enumerate(records, 1):
+            record_id = _record_id(index, record, id_field)
+            filename = completed.get(record_id)
+            if filename is not None and os.path.exists(os.path.join(output_dir, filename)):
+                continue
+            yield index, record_id, record
+
+    def account(pid, done, failed, stages):
+        METRICS.merge(stages)
+        journaled = []
+        for record_id, error in failed:
+            attempts[record_id] = attempts.get(record_id, 0) + 1
+            journaled.append((record_id, attempts[record_id], error))
+        with METRICS.stage('job.journal'):
+            journal.commit(done, journaled)
+        for record_id, _, _ in done:
+            if pending_failures.pop(record_id, None) is not None:
+                progress.retrying -= 1
+        progress.update(done=len(done), failed=len(failed))
+
+    def render(items):
+        if workers <= 1:
+            for chunk in _chunked(items, chunk_size):
+                keep_failures(chunk, *_render_job_chunk(chunk, output_dir, name_field, formulas))
+            return
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(template, METRICS.enabled)) as pool:
+            in_flight = {}
+            for chunk in _chunked(items, chunk_size):
+                if len(in_flight) >= workers * 2:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        keep_failures(in_flight.pop(future), *future.result())
+                in_flight[pool.submit(_render_job_chunk, chunk, output_dir, name_field, formulas)] = chunk
+            for future, chunk in in_flight.items():
+                keep_failures(chunk, *future.result())
+
+    def keep_failures(chunk, pid, done, failed, stages):
+        if failed:
+            records_by_id = {record_id: (index, record) for index, record_id, record in chunk}
+            for record_id, _ in failed:
+                if record_id not in pending_failures:
+                    progress.retrying += 1
+                pending_failures[record_id] = records_by_id[record_id]
+        account(pid, done, failed, stages)
+
+    os.makedirs(output_dir, exist_ok=True)
+    # Half-written files of a killed run; their records were never journaled
+    for name in os.listdir(output_dir):
+        if _TEMP_OUTPUT.search(name):
+            os.remove(os.path.join(output_dir, name))
+    if workers <= 1:
+        _init_worker(template)
+    render(pending())
+
+    for attempt in range(retries):
+        if not pending_failures:
+            break
+        delay = min(backoff * 2 ** attempt, MAX_BACKOFF)
+        print(f'🔁 실패 {len(pending_failures)}건 {delay:.1f}초 후 재시도 ({attempt + 1}/{retries})', flush=True)
+        time.sleep(delay)
+        progress.failed -= len(pending_failures)
+        render([(index, record_id, record) for record_id, (index, record) in sorted(pending_failures.items())])
+    return len(pending_failures)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='재개 가능한 착공신고서 일괄 생성 작업')
+    parser.add_argument('records', help='레코드 파일 (.csv, .json, .jsonl) 또는 DB (postgresql://…, sqlite:///…)')
+    parser.add_argument('-t', '--template', default=DEFAULT_TEMPLATE, help='템플릿 DOCX 경로')
+    parser.add_argument('-o', '--output-dir', default='output/착공신고서', help='출력 디렉토리')
+    parser.add_argument('--journal', help='작업 저널 경로 (기본: <출력 디렉토리>.job.sqlite)')
+    parser.add_argument('--restart', action='store_true', help='저널을 비우고 처음부터 다시 생성')
+    parser.add_argument('--status', metavar='PATH', help='진행 상태 JSON 파일 (관리자 페이지 폴링용)')
+    parser.add_argument('--quiet', action='store_true', help='진행률을 stdout에 출력하지 않음')
+    parser.add_argument('--id-field', default=DEFAULT_ID_FIELD, help='레코드 ID 필드 (없으면 순번)')
+    parser.add_argument('--name-field', default=DEFAULT_NAME_FIELD, help='파일명에 사용할 필드')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES, help='실패한 레코드 재시도 횟수')
+    parser.add_argument('--backoff', type=float, default=DEFAULT_BACKOFF, help='첫 재시도 대기 시간 (초, 매번 2배)')
+    parser.add_argument('--workers', type=int, default=1, help='병렬 프로세스 수 (0 = CPU 코어 수)')
+    parser.add_argument('--chunk-size', type=int, default=64, help='저널에 한 번에 기록할 레코드 수')
+    parser.add_argument('--cache-dir', help='컴파일된 템플릿 캐시 디렉토리')
+    parser.add_argument('--mapping', help='컬럼 → 플레이스홀더 매핑 파일 (record_source.py 참고)')
+    parser.add_argument('--fetch-size', type=int, default=500, help='DB에서 한 번에 가져올 행 수')
+    parser.add_argument('--formulas', help='계산 필드 수식 파일 (기본: 착공신고서 수식)')
+    parser.add_argument('--no-formulas', action='store_true', help='계산 필드를 적용하지 않음')
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with instrumented(args, 'job'):
+        return _run(args)
+
+
+def _run(args):
+    from record_source import count_records, is_database, open_records
+    from template_cache import file_sha256
+
+    if not os.path.exists(args.template):
+        print(f'❌ 템플릿 파일을 찾을 수 없습니다: {args.template}')
+        return 1
+
+    journal = JobJournal(args.journal or journal_path(args.output_dir))
+    try:
+        digest = file_sha256(args.template)
+        # A records file edited in place keeps its name; a database is expected to change
+        records_digest = (file_sha256(args.records)
+                          if not is_database(args.records) and os.path.isfile(args.records) else None)
+        job = {'template': digest, 'records': args.records, 'records_sha256': records_digest,
+               'id_field': args.id_field}
+        if args.restart:
+            journal.reset()
+        else:
+            changed = [key for key, value in job.items() if journal.get(key) not in (None, value)]
+            if changed:
+                print(f'❌ 저널이 다른 작업입니다 ({", ".join(changed)} 변경): --restart 로 새로 시작하세요')
+                return 1
+        resumed = bool(journal.get('template'))
+        journal.set(**job, output_dir=args.output_dir)
+
+        try:
+            total = count_records(args.records, args.mapping, args.fetch_size)
+            template = get_template(args.template, args.cache_dir)
+        except (RuntimeError, ValueError) as e:
+            print(f'❌ {e}')
+            return 1
+        skipped = sum(1 for filename in journal.completed().values()
+                      if os.path.exists(os.path.join(args.output_dir, filename)))
+        if resumed:
+            print(f'▶️  저널에서 재개: 완료 {skipped}/{total}건 건너뜀')
+
+        records = open_records(args.records, args.mapping, args.fetch_size)
+        formulas = None
+        if not args.no_formulas:
+            from derived_fields import FormulaError, FormulaSet, default_formulas
+
+            try:
+                formulas = FormulaSet.load(args.formulas) if args.formulas else default_formulas()
+            except FormulaError as e:
+                print(f'❌ 수식 오류: {e}')
+                return 1
+            formulas = formulas.for_placeholders(template.placeholders)
+
+        progress = Progress(os.path.basename(os.path.normpath(args.output_dir)), total, skipped,
+                            args.status, args.quiet)
+        progress.report()
+        workers = args.workers or os.cpu_count() or 1
+        try:
+            remaining = run_job(args.template, records, args.output_dir, journal, progress, args.name_field,
+                                args.id_field, workers, args.chunk_size, args.cache_dir, args.retries, args.backoff,
+                                formulas)
+        except KeyboardInterrupt:
+            progress.finish('interrupted')
+            print('⏸️  중단됨: 다시 실행하면 이어서 생성합니다')
+            return 130
+
+        progress.finish('failed' if remaining else 'done')
+        if remaining:
+            for record_id, attempts, error in journal.failures():
+                print(f'❌ {record_id} ({attempts}회 시도): {error}')
+            print(f'❌ {remaining}건 실패: 다시 실행하면 실패한 레코드만 재시도합니다')
+            return 1
+        status = progress.snapshot()
+        print(f'✅ {status["rendered"]}건 생성, {status["skipped"]}건 건너뜀 ({status["elapsed_seconds"]}초): '
+              f'{args.output_dir}')
+        return 0
+    finally:
+        journal.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""
+일괄 생성 결과 매니페스트 (증분 재생성)
+Manifest of rendered outputs so reruns only regenerate changed records
+
+The manifest lives next to the output directory (`<output_dir>.manifest.json`)
+and maps each record identity (its ID or name, see record_identity() in
+template_renderer) to its output file, the key of the inputs that produced
+it (template hash + normalized record hash) and the SHA-256 of the file.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+
+from docx_template import COMPILED_FORMAT
+
+MANIFEST_VERSION = 2
+
+
+def manifest_path(output_dir):
+    return os.path.normpath(output_dir) + '.manifest.json'
+
+
+def record_digest(record):
+    """Hash of a record as the renderer sees it (stripped keys, None as '', str values)"""
+    normalized = {str(key).strip(): '' if value is None else str(value) for key, value in record.items()}
+    data = json.dumps(normalized, ensure_ascii=False, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def input_key(template_digest, record):
+    """Key of everything that determines one output document"""
+    return f'{template_digest}.v{COMPILED_FORMAT}:{record_digest(record)}'
+
+
+def load_manifest(path):
+    """Return {identity: {'file', 'key', 'sha256'}}; an unreadable manifest means a full render"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest['outputs']
+
+
+def save_manifest(path, outputs):
+    """Write the manifest atomically so an interrupted run never leaves it half-written"""
+    directory = os.path.dirname(path) or '.'
+    fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'version': MANIFEST_VERSION, 'outputs': outputs}, f,
+                      ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
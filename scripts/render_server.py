@@ -0,0 +1,447 @@
+#!/usr/bin/env python3
+"""
+상주형 문서 렌더 서버 (템플릿 캐시 유지)
+Long-running asyncio render service with warm compiled templates
+
+Speaks a small HTTP/1.1 subset over localhost TCP or a Unix socket:
+
+    POST /render?template=NAME        JSON record      -> DOCX bytes
+    POST /render/batch?template=NAME  JSON [records]   -> ZIP of DOCX files
+    GET  /metrics                                      -> JSON (p50/p99 latency, queue)
+    GET  /healthz
+
+Records go through the same derived_fields formulas as template_renderer
+(dates, won amounts, 입금액), unless the server runs with --no-formulas.
+
+    python scripts/render_server.py serve --unix /tmp/render.sock
+    python scripts/render_server.py loadgen --unix /tmp/render.sock --requests 2000 --max-p99-ms 200
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import sys
+import time
+import zipfile
+from collections import deque
+from urllib.parse import parse_qs, quote, urlsplit
+
+from docx_template import render_bytes
+from template_cache import DEFAULT_CACHE_DIR, get_template
+from template_renderer import DEFAULT_NAME_FIELD, load_records, output_filename
+
+DEFAULT_TEMPLATE_DIR = '양식'
+DEFAULT_TEMPLATE = '☆착공신고서 템플릿_최종.docx'
+DOCX_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+MAX_BODY = 64 * 1024 * 1024
+LATENCY_WINDOW = 10000
+
+_STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+                413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+# (formulas file or None, template digest) -> FormulaSet, per process
+_formula_sets = {}
+
+
+def _template_formulas(template, formulas_path):
+    """The derived_fields formulas `template` needs, as template_renderer applies them"""
+    key = (formulas_path, template.digest)
+    formulas = _formula_sets.get(key)
+    if formulas is None:
+        from derived_fields import FormulaSet, default_formulas
+
+        formulas = FormulaSet.load(formulas_path) if formulas_path else default_formulas()
+        formulas = _formula_sets[key] = formulas.for_placeholders(template.placeholders)
+    return formulas
+
+
+def _render_many(template_path, cache_dir, records, use_formulas=True, formulas_path=None):
+    """Executor job: render a batch of records against one template"""
+    template = get_template(template_path, cache_dir)
+    if use_formulas:
+        records = _template_formulas(template, formulas_path).apply(records)
+    return [render_bytes(template, record) for record in records]
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class RenderService:
+    """Queue + batcher between connections and the render executor
+
+    Requests wait in a bounded queue (a full queue answers 503 right away),
+    the batcher groups up to `batch_size` of them per template within
+    `batch_window` seconds, and at most `concurrency` batches render at once.
+    """
+
+    def __init__(self, template_dir, cache_dir, workers=0, concurrency=2,
+                 batch_size=16, batch_window=0.005, queue_size=256, use_formulas=True, formulas_path=None):
+        self.template_dir = template_dir
+        self.cache_dir = cache_dir
+        self.use_formulas = use_formulas
+        self.formulas_path = formulas_path
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self.queue = asyncio.Queue(maxsize=queue_size)
+        self.slots = asyncio.Semaphore(concurrency)
+        if workers > 0:
+            from concurrent.futures import ProcessPoolExecutor
+            self.executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            from concurrent.futures import ThreadPoolExecutor
+            self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.counters = {'requests': 0, 'documents': 0, 'batches': 0, 'rejected': 0, 'errors': 0}
+        self._batcher = None
+
+    def template_path(self, name):
+        path = os.path.normpath(os.path.join(self.template_dir, name or DEFAULT_TEMPLATE))
+        if not path.startswith(os.path.normpath(self.template_dir) + os.sep) or not os.path.isfile(path):
+            raise FileNotFoundError(name)
+        return path
+
+    def preload(self):
+        """Compile every template in the template directory into the warm cache"""
+        names = []
+        for name in sorted(os.listdir(self.template_dir)):
+            if name.endswith('.docx') and not name.startswith('~$'):
+                try:
+                    get_template(os.path.join(self.template_dir, name), self.cache_dir)
+                    names.append(name)
+                except zipfile.BadZipFile:
+                    continue
+        return names
+
+    def start(self):
+        self._batcher = asyncio.get_running_loop().create_task(self._batch_loop())
+
+    async def close(self):
+        if self._batcher:
+            self._batcher.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, template_path, records):
+        """Queue records for rendering; returns a future of DOCX bytes list"""
+        future = asyncio.get_running_loop().create_future()
+        self.queue.put_nowait((template_path, records, future))
+        return future
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.batch_window
+            size = len(batch[0][1])
+            while size < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(item)
+                size += len(item[1])
+
+            by_template = {}
+            for item in batch:
+                by_template.setdefault(item[0], []).append(item)
+            for template_path, items in by_template.items():
+                await self.slots.acquire()
+                loop.create_task(self._run_batch(template_path, items))
+
+    async def _run_batch(self, template_path, items):
+        loop = asyncio.get_running_loop()
+        try:
+            records = [record for _, item_records, _ in items for record in item_records]
+            try:
+                documents = await loop.run_in_executor(
+                    self.executor, _render_many, template_path, self.cache_dir, records,
+                    self.use_formulas, self.formulas_path)
+            except Exception as e:
+                for _, _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            self.counters['batches'] += 1
+            self.counters['documents'] += len(documents)
+            offset = 0
+            for _, item_records, future in items:
+                if not future.done():
+                    future.set_result(documents[offset:offset + len(item_records)])
+                offset += len(item_records)
+        finally:
+            self.slots.release()
+
+    def metrics(self):
+        ordered = sorted(self.latencies)
+        return {
+            **self.counters,
+            'queue_depth': self.queue.qsize(),
+            'latency_ms': {
+                'count': len(ordered),
+                'p50': round(percentile(ordered, 0.50) * 1000, 3),
+                'p99': round(percentile(ordered, 0.99) * 1000, 3),
+                'max': round((ordered[-1] if ordered else 0.0) * 1000, 3),
+            },
+        }
+
+
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+async def _read_request(reader):
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    try:
+        method, target, _ = request_line.decode('latin-1').rstrip('\r\n').split(' ', 2)
+    except ValueError:
+        raise HttpError(400, 'malformed request line')
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        headers[key.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise HttpError(400, 'invalid Content-Length')
+    if length > MAX_BODY:
+        raise HttpError(413, 'payload too large')
+    body = await reader.readexactly(length) if length else b''
+    return method, target, headers, body
+
+
+def _response(status, body=b'', content_type='application/json', extra_headers=()):
+    if isinstance(body, (dict, list)):
+        body = json.dumps(body, ensure_ascii=False).encode('utf-8')
+    lines = [f'HTTP/1.1 {status} {_STATUS_TEXT.get(status, "")}',
+             f'Content-Type: {content_type}', f'Content-Length: {len(body)}', *extra_headers]
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('utf-8') + body
+
+
+def _zip_documents(records, documents):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_STORED) as archive:
+        for index, (record, document) in enumerate(zip(records, documents), 1):
+            archive.writestr(output_filename(index, record, DEFAULT_NAME_FIELD), document)
+    return buffer.getvalue()
+
+
+async def _dispatch(service, method, target, body):
+    url = urlsplit(target)
+    query = parse_qs(url.query)
+
+    if url.path == '/healthz':
+        return _response(200, {'ok': True})
+    if url.path == '/metrics':
+        return _response(200, service.metrics())
+    if url.path not in ('/render', '/render/batch'):
+        return _response(404, {'error': 'not found'})
+    if method != 'POST':
+        return _response(405, {'error': 'POST only'})
+
+    try:
+        template_path = service.template_path(query.get('template', [''])[0])
+    except FileNotFoundError:
+        return _response(404, {'error': 'unknown template'})
+    try:
+        payload = json.loads(body or b'null')
+    except ValueError:
+        return _response(400, {'error': 'invalid JSON'})
+
+    batch = url.path == '/render/batch'
+    records = payload if batch else [payload]
+    if not isinstance(records, list) or not all(isinstance(r, dict) for r in records):
+        return _response(400, {'error': 'expected a JSON object' if not batch else 'expected a JSON array of objects'})
+
+    try:
+        future = service.submit(template_path, records)
+    except asyncio.QueueFull:
+        service.counters['rejected'] += 1
+        return _response(503, {'error': 'render queue full'}, extra_headers=('Retry-After: 1',))
+    documents = await future
+
+    if batch:
+        return _response(200, _zip_documents(records, documents), 'application/zip')
+    return _response(200, documents[0], DOCX_TYPE)
+
+
+async def handle_connection(service, reader, writer):
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except HttpError as e:
+                writer.write(_response(e.status, {'error': str(e)}))
+                break
+            except (asyncio.IncompleteReadError, ConnectionError):
+                break
+            if request is None:
+                break
+
+            method, target, headers, body = request
+            started = time.perf_counter()
+            service.counters['requests'] += 1
+            try:
+                response = await _dispatch(service, method, target, body)
+            except Exception as e:
+                service.counters['errors'] += 1
+                response = _response(500, {'error': str(e)})
+            writer.write(response)
+            await writer.drain()
+            if target.startswith('/render'):
+                service.latencies.append(time.perf_counter() - started)
+
+            if headers.get('connection', '').lower() == 'close':
+                break
+    finally:
+        writer.close()
+
+
+async def serve(args):
+    if args.formulas and not args.no_formulas:
+        from derived_fields import FormulaError, FormulaSet
+
+        try:
+            FormulaSet.load(args.formulas)
+        except FormulaError as e:
+            print(f'❌ 수식 오류: {e}')
+            return 1
+    service = RenderService(args.template_dir, args.cache_dir, workers=args.workers,
+                            concurrency=args.concurrency, batch_size=args.batch_size,
+                            batch_window=args.batch_window_ms / 1000, queue_size=args.queue_size,
+                            use_formulas=not args.no_formulas, formulas_path=args.formulas)
+    loaded = service.preload()
+    print(f'🔥 템플릿 {len(loaded)}개 캐시 완료: {", ".join(loaded)}')
+    service.start()
+
+    def handler(reader, writer):
+        return handle_connection(service, reader, writer)
+
+    if args.unix:
+        if os.path.exists(args.unix):
+            os.remove(args.unix)
+        server = await asyncio.start_unix_server(handler, path=args.unix)
+        print(f'🚀 렌더 서버 시작: unix:{args.unix}')
+    else:
+        server = await asyncio.start_server(handler, host='127.0.0.1', port=args.port)
+        print(f'🚀 렌더 서버 시작: http://127.0.0.1:{args.port}')
+
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+async def _open(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection('127.0.0.1', args.port)
+
+
+async def loadgen(args):
+    """Send --requests render requests over --concurrency keep-alive connections"""
+    records = list(load_records(args.records)) if args.records else [{DEFAULT_NAME_FIELD: '부하테스트'}]
+    target = f'/render?template={quote(args.template)}'
+    latencies = []
+    statuses = {}
+    counter = iter(range(args.requests))
+
+    async def client():
+        reader, writer = await _open(args)
+        try:
+            for i in counter:
+                body = json.dumps(records[i % len(records)], ensure_ascii=False).encode('utf-8')
+                started = time.perf_counter()
+                writer.write(f'POST {target} HTTP/1.1\r\nHost: localhost\r\n'
+                             f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n'
+                             .encode('latin-1') + body)
+                await writer.drain()
+                status_line = await reader.readline()
+                status = int(status_line.split()[1])
+                length = 0
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b''):
+                        break
+                    if line.lower().startswith(b'content-length:'):
+                        length = int(line.split(b':', 1)[1])
+                await reader.readexactly(length)
+                latencies.append(time.perf_counter() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p50 = percentile(latencies, 0.50) * 1000
+    p99 = percentile(latencies, 0.99) * 1000
+    print(f'📊 {len(latencies)}건 / {elapsed:.2f}초 = {len(latencies) / elapsed:.1f} req/s')
+    print(f'   p50 {p50:.1f}ms, p99 {p99:.1f}ms, 상태 {statuses}')
+
+    failed = sum(count for status, count in statuses.items() if status != 200)
+    if failed and not args.allow_errors:
+        print(f'❌ 실패 응답 {failed}건')
+        return 1
+    if args.max_p99_ms and p99 > args.max_p99_ms:
+        print(f'❌ p99 {p99:.1f}ms > 허용치 {args.max_p99_ms}ms')
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='상주형 문서 렌더 서버')
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    for name in ('serve', 'loadgen'):
+        command = sub.add_parser(name)
+        where = command.add_mutually_exclusive_group()
+        where.add_argument('--unix', help='Unix 소켓 경로')
+        where.add_argument('--port', type=int, default=8765, help='localhost TCP 포트')
+
+    serve_parser = sub.choices['serve']
+    serve_parser.add_argument('--template-dir', default=DEFAULT_TEMPLATE_DIR, help='템플릿 폴더')
+    serve_parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='컴파일 캐시 디렉토리')
+    serve_parser.add_argument('--workers', type=int, default=0, help='렌더 프로세스 수 (0 = 스레드)')
+    serve_parser.add_argument('--concurrency', type=int, default=2, help='동시에 렌더하는 배치 수')
+    serve_parser.add_argument('--batch-size', type=int, default=16, help='배치당 최대 문서 수')
+    serve_parser.add_argument('--batch-window-ms', type=float, default=5.0, help='배치 모으기 대기 시간')
+    serve_parser.add_argument('--queue-size', type=int, default=256, help='대기열 크기 (초과 시 503)')
+    serve_parser.add_argument('--formulas', help='계산 필드 수식 파일 (기본: 착공신고서 수식)')
+    serve_parser.add_argument('--no-formulas', action='store_true', help='계산 필드를 적용하지 않음')
+
+    load_parser = sub.choices['loadgen']
+    load_parser.add_argument('--template', default=DEFAULT_TEMPLATE, help='템플릿 이름')
+    load_parser.add_argument('--records', help='요청에 사용할 레코드 파일')
+    load_parser.add_argument('--requests', type=int, default=1000, help='전체 요청 수')
+    load_parser.add_argument('--concurrency', type=int, default=16, help='동시 연결 수')
+    load_parser.add_argument('--max-p99-ms', type=float, help='p99 허용치 (초과 시 실패)')
+    load_parser.add_argument('--allow-errors', action='store_true', help='200 이외 응답을 실패로 보지 않음')
+
+    args = parser.parse_args(argv)
+    try:
+        return asyncio.run(serve(args) if args.command == 'serve' else loadgen(args)) or 0
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
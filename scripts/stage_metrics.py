@@ -0,0 +1,261 @@
+"""
+단계별 시간/바이트 계측 및 프로파일링
+Per-stage timing and byte counters, exported as JSON lines or a Prometheus textfile
+
+Instrumented code wraps each step in `METRICS.stage(name)`; while metrics
+are disabled (the default) that returns a shared no-op context, so the
+hot paths pay one attribute lookup and an empty `with`.
+
+    with METRICS.stage('render.deflate') as stage:
+        ...
+        stage.add(bytes_in=len(xml), bytes_out=info.compress_size)
+
+Command line tools call add_arguments(parser) and wrap their work in
+`with instrumented(args, 'render'):`, which gives them:
+
+    --metrics PATH           append JSON lines (or write a .prom textfile)
+    --metrics-format FORMAT  jsonl | prom (default: from the file extension)
+    --profile PREFIX         PREFIX.pstats (cProfile) + PREFIX.collapsed (flamegraph stacks)
+"""
+
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+PROMETHEUS_PREFIX = 'facility_template'
+SAMPLE_INTERVAL = 0.001
+
+
+class _Stage:
+    __slots__ = ('metrics', 'name', 'started', 'bytes_in', 'bytes_out')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def add(self, bytes_in=0, bytes_out=0):
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.record(self.name, time.perf_counter() - self.started, self.bytes_in, self.bytes_out)
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def add(self, bytes_in=0, bytes_out=0):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+class StageMetrics:
+    """Counters per stage name: calls, seconds, bytes_in, bytes_out"""
+
+    def __init__(self):
+        self.enabled = False
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def stage(self, name):
+        return _Stage(self, name) if self.enabled else _NO_STAGE
+
+    def record(self, name, seconds, bytes_in=0, bytes_out=0):
+        if not self.enabled:
+            return
+        with self._lock:
+            entry = self.stages.get(name)
+            if entry is None:
+                entry = self.stages[name] = [0, 0.0, 0, 0]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] += bytes_in
+            entry[3] += bytes_out
+
+    def drain(self):
+        """Return and reset the counters (workers ship these to the parent)"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            stages, self.stages = self.stages, {}
+        return stages
+
+    def merge(self, stages):
+        if not stages:
+            return
+        with self._lock:
+            for name, (calls, seconds, bytes_in, bytes_out) in stages.items():
+                entry = self.stages.setdefault(name, [0, 0.0, 0, 0])
+                entry[0] += calls
+                entry[1] += seconds
+                entry[2] += bytes_in
+                entry[3] += bytes_out
+
+    def rows(self):
+        return [{'stage': name, 'calls': calls, 'seconds': round(seconds, 6),
+                 'bytes_in': bytes_in, 'bytes_out': bytes_out}
+                for name, (calls, seconds, bytes_in, bytes_out) in sorted(self.stages.items())]
+
+    def write_jsonl(self, path, labels):
+        """Append one JSON object per stage, tagged with `labels` (command, run id, ...)"""
+        import json
+
+        with open(path, 'a', encoding='utf-8') as f:
+            for row in self.rows():
+                f.write(json.dumps({**labels, **row}, ensure_ascii=False) + '\n')
+
+    def write_prometheus(self, path, labels):
+        """Write a node_exporter textfile atomically (the collector may read at any time)"""
+        import tempfile
+
+        base = ','.join(f'{key}="{_label(value)}"' for key, value in labels.items())
+        lines = []
+        for metric, help_text, column in (
+                ('stage_calls_total', 'Number of times the stage ran', 'calls'),
+                ('stage_seconds_total', 'Wall time spent in the stage', 'seconds'),
+                ('stage_bytes_in_total', 'Bytes consumed by the stage', 'bytes_in'),
+                ('stage_bytes_out_total', 'Bytes produced by the stage', 'bytes_out')):
+            name = f'{PROMETHEUS_PREFIX}_{metric}'
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} counter')
+            for row in self.rows():
+                stage_labels = f'{base},stage="{_label(row["stage"])}"' if base else f'stage="{_label(row["stage"])}"'
+                lines.append(f'{name}{{{stage_labels}}} {row[column]}')
+
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(lines) + '\n')
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def write(self, path, fmt=None, labels=None):
+        labels = labels or {}
+        if resolve_format(path, fmt) == 'prom':
+            self.write_prometheus(path, labels)
+        else:
+            self.write_jsonl(path, labels)
+
+
+def resolve_format(path, fmt=None):
+    return fmt or ('prom' if path.endswith('.prom') else 'jsonl')
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Process-wide recorder used by the instrumented modules
+METRICS = StageMetrics()
+
+
+class StackSampler:
+    """Sample one thread's Python stack into flamegraph 'collapsed' counts
+
+    A daemon thread reads sys._current_frames() every `interval` seconds;
+    the output ("outer;inner;leaf count" per line) feeds flamegraph.pl,
+    speedscope or inferno directly.
+    """
+
+    def __init__(self, thread_id=None, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.counts = {}
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def _run(self):
+        codes = {}
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                label = codes.get(code)
+                if label is None:
+                    label = codes[code] = f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+                stack.append(label)
+                frame = frame.f_back
+            key = ';'.join(reversed(stack))
+            self.counts[key] = self.counts.get(key, 0) + 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.counts.items()):
+                f.write(f'{stack} {count}\n')
+
+
+def add_arguments(parser):
+    group = parser.add_argument_group('계측')
+    group.add_argument('--metrics', metavar='PATH', help='단계별 시간/바이트 기록 (JSON Lines, .prom 이면 Prometheus)')
+    group.add_argument('--metrics-format', choices=('jsonl', 'prom'), help='기록 형식 (기본: 확장자로 판단)')
+    group.add_argument('--profile', metavar='PREFIX', help='PREFIX.pstats 및 PREFIX.collapsed 작성')
+
+
+@contextmanager
+def instrumented(args, command):
+    """Enable metrics/profiling per the add_arguments() flags around a block"""
+    metrics_path = getattr(args, 'metrics', None)
+    profile_prefix = getattr(args, 'profile', None)
+    if metrics_path:
+        METRICS.enabled = True
+
+    profiler = sampler = None
+    if profile_prefix:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        sampler = StackSampler()
+        sampler.start()
+        profiler.enable()
+
+    started = time.perf_counter()
+    try:
+        yield METRICS
+    finally:
+        elapsed = time.perf_counter() - started
+        if profiler is not None:
+            profiler.disable()
+            sampler.stop()
+            profiler.dump_stats(f'{profile_prefix}.pstats')
+            sampler.write(f'{profile_prefix}.collapsed')
+            print(f'🔬 프로파일 저장: {profile_prefix}.pstats, {profile_prefix}.collapsed', file=sys.stderr)
+        if metrics_path:
+            METRICS.record(f'{command}.total', elapsed)
+            labels = {'command': command, 'pid': os.getpid(), 'time': int(time.time())}
+            fmt = getattr(args, 'metrics_format', None)
+            if resolve_format(metrics_path, fmt) == 'prom':
+                # Textfile series must stay stable across runs
+                labels = {'command': command}
+            METRICS.write(metrics_path, fmt, labels)
+            METRICS.enabled = False
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+컴파일된 템플릿 캐시 (메모리 LRU + 디스크 저장)
+Compiled template cache keyed by the template's SHA-256, with on-disk persistence
+"""
+
+import argparse
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+
+from docx_template import COMPILED_FORMAT, compile_template
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    'FACILITY_TEMPLATE_CACHE',
+    os.path.join(os.path.expanduser('~'), '.cache', 'facility-manager', 'templates'),
+)
+DEFAULT_MAX_ENTRIES = 8
+
+
+def file_sha256(path, chunk_size=1 << 20):
+    """Hex SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class TemplateCache:
+    """LRU cache of compiled templates backed by pickles in `cache_dir`
+
+    Entries are keyed by content hash, so a renamed or copied template hits
+    the same entry and an edited one never returns stale output. Hashes are
+    memoized per (path, mtime, size) to avoid re-reading unchanged files.
+
+    Safe to share between threads (render_server's thread executor): the
+    LRU is updated under a lock, and compiling runs outside it under a
+    per-content lock, so a slow compile does not block hits on other
+    templates and two threads missing the same template compile it once.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_entries=DEFAULT_MAX_ENTRIES):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._digests = {}
+        self._lock = threading.Lock()
+        self._compiling = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def digest(self, path):
+        stat = os.stat(path)
+        key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        digest = self._digests.get(key)
+        if digest is None:
+            digest = self._digests[key] = file_sha256(path)
+        return digest
+
+    def _disk_path(self, digest):
+        return os.path.join(self.cache_dir, f'{digest}.v{COMPILED_FORMAT}.pickle')
+
+    def _load_from_disk(self, digest):
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._disk_path(digest), 'rb') as f:
+                fmt, template = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ValueError):
+            return None
+        return template if fmt == COMPILED_FORMAT else None
+
+    def _save_to_disk(self, digest, template):
+        if not self.cache_dir:
+            return
+        os.makedirs(self.cache_dir, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(suffix='.tmp', dir=self.cache_dir)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump((COMPILED_FORMAT, template), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_path, self._disk_path(digest))
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _lookup(self, digest):
+        with self._lock:
+            template = self._entries.get(digest)
+            if template is not None:
+                self._entries.move_to_end(digest)
+                self.hits += 1
+            return template
+
+    def _remember(self, path, digest, template, disk_hit):
+        with self._lock:
+            if disk_hit:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+            # Set once, before other threads can see the object
+            template.path = path
+            template.digest = digest
+            self._entries[digest] = template
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return template
+
+    def get(self, path):
+        """Return the compiled template for `path`, compiling at most once per content"""
+        digest = self.digest(path)
+        template = self._lookup(digest)
+        if template is not None:
+            return template
+
+        with self._lock:
+            compiling = self._compiling.setdefault(digest, threading.Lock())
+        try:
+            with compiling:
+                # A thread that waited here finds the template the first one cached
+                template = self._lookup(digest)
+                if template is not None:
+                    return template
+                template = self._load_from_disk(digest)
+                disk_hit = template is not None
+                if not disk_hit:
+                    template = compile_template(path)
+                    self._save_to_disk(digest, template)
+                return self._remember(path, digest, template, disk_hit)
+        finally:
+            with self._lock:
+                self._compiling.pop(digest, None)
+
+    def clear(self, disk=False):
+        with self._lock:
+            self._entries.clear()
+        if disk and self.cache_dir and os.path.isdir(self.cache_dir):
+            for name in os.listdir(self.cache_dir):
+                if name.endswith('.pickle'):
+                    os.remove(os.path.join(self.cache_dir, name))
+
+
+_default_caches = {}
+_default_caches_lock = threading.Lock()
+
+
+def get_template(path, cache_dir=None):
+    """Compiled template through the process-wide cache for `cache_dir`"""
+    cache_dir = cache_dir or DEFAULT_CACHE_DIR
+    with _default_caches_lock:
+        cache = _default_caches.get(cache_dir)
+        if cache is None:
+            cache = _default_caches[cache_dir] = TemplateCache(cache_dir)
+    return cache.get(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='컴파일된 템플릿 캐시 관리')
+    parser.add_argument('command', choices=['warm', 'clear', 'info'])
+    parser.add_argument('templates', nargs='*', help='warm 대상 템플릿 파일')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='캐시 디렉토리')
+    args = parser.parse_args(argv)
+
+    cache = TemplateCache(args.cache_dir)
+
+    if args.command == 'warm':
+        for path in args.templates:
+            template = cache.get(path)
+            print(f'🔥 {path} → {template.digest[:12]} (placeholder {len(template.placeholders)}개)')
+    elif args.command == 'clear':
+        cache.clear(disk=True)
+        print(f'🧹 캐시 삭제 완료: {args.cache_dir}')
+    else:
+        names = sorted(os.listdir(args.cache_dir)) if os.path.isdir(args.cache_dir) else []
+        total = sum(os.path.getsize(os.path.join(args.cache_dir, n)) for n in names)
+        print(f'📦 {args.cache_dir}: {len(names)}개, {total / 1024:.1f} KB')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
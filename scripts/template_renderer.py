@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+착공신고서 일괄 생성 - 템플릿 1회 컴파일 후 레코드별 치환
+Batch render {{placeholder}} DOCX templates for many businesses in one process
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+import zipfile
+
+from docx_template import render_bytes
+from render_manifest import input_key, load_manifest, manifest_path, save_manifest
+from stage_metrics import METRICS, add_arguments, instrumented
+from template_cache import get_template
+
+DEFAULT_TEMPLATE = '양식/☆착공신고서 템플릿_최종.docx'
+DEFAULT_NAME_FIELD = '사업장명'
+
+
+def load_records(records_path):
+    """Stream records from a CSV, JSON array or JSON Lines file"""
+    ext = os.path.splitext(records_path)[1].lower()
+
+    if ext == '.csv':
+        with open(records_path, 'r', encoding='utf-8-sig', newline='') as f:
+            yield from csv.DictReader(f)
+    elif ext in ('.jsonl', '.ndjson'):
+        with open(records_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(records_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        yield from (data if isinstance(data, list) else data['records'])
+
+
+_UNSAFE_FILENAME = re.compile(r'[\\/:*?"<>|\s]+')
+
+
+def _sanitize(value):
+    return _UNSAFE_FILENAME.sub('_', str(value or '')).strip('_')
+
+
+def output_filename(index, record, name_field=DEFAULT_NAME_FIELD, extension='.docx'):
+    """Deterministic output filename: sequence number plus a sanitized name"""
+    name = _sanitize(record.get(name_field))
+    return f'{index:05d}_{name}{extension}' if name else f'{index:05d}{extension}'
+
+
+def record_identity(index, record, id_field=None, name_field=DEFAULT_NAME_FIELD):
+    """(identity, file stem) of a record that survive insertions and deletions around it
+
+    The identity is the `id_field` value, else the name; only a record
+    with neither falls back to its position. The stem carries the name as
+    well when an ID is used, so files stay readable.
+    """
+    name = record.get(name_field)
+    name = '' if name is None else str(name).strip()
+    value = record.get(id_field) if id_field else None
+    value = '' if value is None else str(value).strip()
+    if value:
+        stem = _sanitize(value)
+        return f'id:{value}', f'{stem}_{_sanitize(name)}' if _sanitize(name) else stem
+    if name:
+        return f'name:{name}', _sanitize(name)
+    return f'index:{index}', f'{index:05d}'
+
+
+_worker_template = None
+
+
+def _init_worker(template, metrics=False):
+    """Process pool initializer: receive the compiled template once per worker"""
+    global _worker_template
+    _worker_template = template
+    if metrics:
+        # A forked worker inherits the parent's counters; start from zero
+        METRICS.enabled = True
+        METRICS.drain()
+
+
+def _render_chunk(chunk, output_dir):
+    """Render a chunk of (filename, record) pairs inside a worker process
+
+    Returns (pid, [(filename, sha256)], seconds, stage metrics) so the
+    parent can record every output in the manifest without reading the
+    files back.
+    """
+    started = time.perf_counter()
+    written = []
+    for filename, record in chunk:
+        data = render_bytes(_worker_template, record)
+        with METRICS.stage('render.write') as stage:
+            with open(os.path.join(output_dir, filename), 'wb') as f:
+                f.write(data)
+            stage.add(len(data), len(data))
+        with METRICS.stage('manifest.hash') as stage:
+            written.append((filename, hashlib.sha256(data).hexdigest()))
+            stage.add(len(data))
+    return os.getpid(), written, time.perf_counter() - started, METRICS.drain()
+
+
+def _render_chunk_bytes(chunk, name_field):
+    """Render a chunk in memory for the streaming ZIP writer"""
+    started = time.perf_counter()
+    documents = [(output_filename(index, record, name_field), render_bytes(_worker_template, record))
+                 for index, record in chunk]
+    return os.getpid(), documents, time.perf_counter() - started, METRICS.drain()
+
+
+def _chunked(items, chunk_size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def render_batch(template_path, records, output_dir, name_field=DEFAULT_NAME_FIELD,
+                 workers=1, chunk_size=64, cache_dir=None, incremental=False, prune=False, id_field=None):
+    """Render every record of `records` into `output_dir`
+
+    With `workers` > 1 the compiled template is handed to each pool process
+    once, records are fed in chunks with a bounded number in flight, and
+    each worker writes its files as it finishes them.
+
+    Files are named after record_identity() (`id_field`, else the name
+    field), not the record's position, and every run records them in the
+    manifest next to `output_dir` under that identity. With `incremental`,
+    records whose template and record hashes match the manifest and whose
+    file still exists are skipped, so inserting or deleting one record
+    re-renders only that record. Outputs of records that disappeared are
+    reported as stale, or deleted with `prune`.
+    Returns a stats dict with per-worker document counts and busy time.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    started = time.perf_counter()
+    template = get_template(template_path, cache_dir)
+    per_worker = {}
+
+    manifest_file = manifest_path(output_dir)
+    previous = load_manifest(manifest_file)
+    outputs = {}
+    pending_keys = {}
+    skipped = 0
+
+    def account(pid, written, seconds, stages):
+        METRICS.merge(stages)
+        for filename, digest in written:
+            identity, key = pending_keys.pop(filename)
+            outputs[identity] = {'file': filename, 'key': key, 'sha256': digest}
+        entry = per_worker.setdefault(pid, {'count': 0, 'seconds': 0.0})
+        entry['count'] += len(written)
+        entry['seconds'] += seconds
+
+    def changed():
+        nonlocal skipped
+        occurrences = {}
+        filenames = set()
+        for index, record in enumerate(records, 1):
+            identity, stem = record_identity(index, record, id_field, name_field)
+            # Records sharing an identity are told apart by their order among themselves
+            occurrence = occurrences[identity] = occurrences.get(identity, 0) + 1
+            if occurrence > 1:
+                identity, stem = f'{identity}#{occurrence}', f'{stem}_{occurrence}'
+            filename = f'{stem}.docx'
+            suffix = 1
+            while filename in filenames:
+                # Distinct names that sanitize to the same file
+                suffix += 1
+                filename = f'{stem}~{suffix}.docx'
+            filenames.add(filename)
+
+            key = input_key(template.digest, record)
+            entry = previous.get(identity)
+            if (incremental and entry is not None and entry['key'] == key and entry['file'] == filename
+                    and os.path.exists(os.path.join(output_dir, filename))):
+                outputs[identity] = entry
+                skipped += 1
+                continue
+            pending_keys[filename] = identity, key
+            yield filename, record
+
+    if workers <= 1:
+        _init_worker(template)
+        for chunk in _chunked(changed(), chunk_size):
+            account(*_render_chunk(chunk, output_dir))
+    else:
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(template, METRICS.enabled)) as pool:
+            pending = set()
+            for chunk in _chunked(changed(), chunk_size):
+                if len(pending) >= workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        account(*future.result())
+                pending.add(pool.submit(_render_chunk, chunk, output_dir))
+            for future in pending:
+                account(*future.result())
+
+    current_files = {entry['file'] for entry in outputs.values()}
+    for identity, entry in previous.items():
+        # The record is still there under a new file name (its name changed under an ID)
+        if identity in outputs and entry['file'] not in current_files:
+            path = os.path.join(output_dir, entry['file'])
+            if os.path.exists(path):
+                os.remove(path)
+
+    stale = []
+    removed = []
+    for identity in sorted(set(previous) - set(outputs), key=lambda identity: previous[identity]['file']):
+        filename = previous[identity]['file']
+        if filename in current_files:
+            # The file now belongs to another record and was rewritten for it
+            continue
+        if prune:
+            path = os.path.join(output_dir, filename)
+            if os.path.exists(path):
+                os.remove(path)
+            removed.append(filename)
+        else:
+            # Keep flagged entries so they are reported again until pruned
+            outputs[identity] = previous[identity]
+            stale.append(filename)
+    save_manifest(manifest_file, outputs)
+
+    return {
+        'count': sum(entry['count'] for entry in per_worker.values()),
+        'skipped': skipped,
+        'stale': stale,
+        'removed': removed,
+        'seconds': time.perf_counter() - started,
+        'workers': per_worker,
+    }
+
+
+def render_zip_stream(template_path, records, stream, name_field=DEFAULT_NAME_FIELD,
+                      workers=1, chunk_size=64, cache_dir=None):
+    """Render every record straight into one outer ZIP written to `stream`
+
+    Each DOCX is rendered in memory and appended (stored, it is already
+    deflated) before the next one starts, so a single process holds about
+    one document at a time; with workers, at most two chunks per worker
+    are in flight and results are written in record order. `stream` may be
+    unseekable (stdout, a pipe, an HTTP response body).
+    """
+    started = time.perf_counter()
+    template = get_template(template_path, cache_dir)
+    date_time = template.members[0][1] if template.members else (1980, 1, 1, 0, 0, 0)
+    per_worker = {}
+
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_STORED) as archive:
+        def append(pid, documents, seconds, stages):
+            METRICS.merge(stages)
+            for name, data in documents:
+                info = zipfile.ZipInfo(name, date_time)
+                info.external_attr = 0o644 << 16
+                with METRICS.stage('zip.append') as stage:
+                    archive.writestr(info, data)
+                    stage.add(len(data), len(data))
+            entry = per_worker.setdefault(pid, {'count': 0, 'seconds': 0.0})
+            entry['count'] += len(documents)
+            entry['seconds'] += seconds
+
+        if workers <= 1:
+            _init_worker(template)
+            for chunk in _chunked(enumerate(records, 1), 1):
+                append(*_render_chunk_bytes(chunk, name_field))
+        else:
+            from collections import deque
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(template, METRICS.enabled)) as pool:
+                pending = deque()
+                for chunk in _chunked(enumerate(records, 1), chunk_size):
+                    if len(pending) >= workers * 2:
+                        append(*pending.popleft().result())
+                    pending.append(pool.submit(_render_chunk_bytes, chunk, name_field))
+                while pending:
+                    append(*pending.popleft().result())
+
+    return {
+        'count': sum(entry['count'] for entry in per_worker.values()),
+        'seconds': time.perf_counter() - started,
+        'workers': per_worker,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='착공신고서 일괄 생성')
+    parser.add_argument('records', help='레코드 파일 (.csv, .json, .jsonl) 또는 DB (postgresql://…, sqlite:///…)')
+    parser.add_argument('-t', '--template', default=DEFAULT_TEMPLATE, help='템플릿 DOCX 경로')
+    parser.add_argument('-o', '--output-dir', default='output/착공신고서', help='출력 디렉토리')
+    parser.add_argument('--name-field', default=DEFAULT_NAME_FIELD, help='파일명에 사용할 필드')
+    parser.add_argument('--id-field', help='레코드 식별 필드 (매니페스트/파일명 기준, 기본: --name-field)')
+    parser.add_argument('--workers', type=int, default=1, help='병렬 프로세스 수 (0 = CPU 코어 수)')
+    parser.add_argument('--chunk-size', type=int, default=64, help='워커에 한 번에 전달할 레코드 수')
+    parser.add_argument('--cache-dir', help='컴파일된 템플릿 캐시 디렉토리')
+    parser.add_argument('--mapping', help='컬럼 → 플레이스홀더 매핑 파일 (record_source.py 참고)')
+    parser.add_argument('--fetch-size', type=int, default=500, help='DB에서 한 번에 가져올 행 수')
+    parser.add_argument('--validate', action='store_true', help='생성 전에 모든 레코드의 필드 누락 검사')
+    parser.add_argument('--zip-out', metavar='PATH', help='개별 파일 대신 ZIP 하나로 스트리밍 (- = stdout)')
+    parser.add_argument('--incremental', action='store_true', help='매니페스트 기준으로 변경된 레코드만 재생성')
+    parser.add_argument('--prune', action='store_true', help='사라진 레코드의 출력 파일 삭제')
+    parser.add_argument('--pdf', metavar='DIR', help='생성 후 LibreOffice로 PDF 변환할 폴더')
+    parser.add_argument('--pdf-workers', type=int, default=2, help='동시에 실행할 soffice 수')
+    parser.add_argument('--formulas', help='계산 필드 수식 파일 (기본: 착공신고서 수식)')
+    parser.add_argument('--no-formulas', action='store_true', help='계산 필드를 적용하지 않음')
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+    if args.zip_out and (args.incremental or args.prune or args.pdf):
+        parser.error('--incremental/--prune/--pdf 는 --zip-out 과 함께 사용할 수 없습니다')
+
+    with instrumented(args, 'render'):
+        return _run(args)
+
+
+def _run(args):
+    # With the archive on stdout, progress messages must go to stderr
+    to_stdout = args.zip_out == '-'
+    out = sys.stderr if to_stdout else sys.stdout
+
+    def log(message):
+        print(message, file=out)
+
+    if not os.path.exists(args.template):
+        log(f'❌ 템플릿 파일을 찾을 수 없습니다: {args.template}')
+        return 1
+
+    workers = args.workers or os.cpu_count() or 1
+
+    log(f'📖 템플릿 컴파일: {args.template}')
+    from record_source import open_records
+
+    records = open_records(args.records, args.mapping, args.fetch_size)
+    try:
+        template = get_template(args.template, args.cache_dir)
+    except ValueError as e:
+        # Unbalanced or overlapping {{#block}} tags
+        log(f'❌ {e}')
+        return 1
+    if not args.no_formulas:
+        from derived_fields import FormulaError, FormulaSet, default_formulas
+
+        try:
+            formulas = FormulaSet.load(args.formulas) if args.formulas else default_formulas()
+        except FormulaError as e:
+            log(f'❌ 수식 오류: {e}')
+            return 1
+        # Only what this template's placeholders need
+        records = formulas.for_placeholders(template.placeholders).iter_apply(records)
+    # open_records() is lazy: a missing database, table or mapped column
+    # only raises once rendering starts pulling records
+    try:
+        if args.validate:
+            from index_placeholders import validate_records
+
+            records = list(records)
+            errors = validate_records(records, template.placeholders)
+            if errors:
+                for error in errors:
+                    log(f'❌ {error}')
+                return 1
+            log(f'✅ 레코드 {len(records)}건 검증 통과')
+
+        if args.zip_out:
+            destination = 'stdout' if to_stdout else args.zip_out
+            if to_stdout:
+                stats = render_zip_stream(args.template, records, sys.stdout.buffer, args.name_field,
+                                          workers=workers, chunk_size=args.chunk_size, cache_dir=args.cache_dir)
+                sys.stdout.buffer.flush()
+            else:
+                with open(args.zip_out, 'wb') as stream:
+                    stats = render_zip_stream(args.template, records, stream, args.name_field,
+                                              workers=workers, chunk_size=args.chunk_size, cache_dir=args.cache_dir)
+        else:
+            destination = args.output_dir
+            stats = render_batch(args.template, records, args.output_dir,
+                                 args.name_field, workers=workers, chunk_size=args.chunk_size,
+                                 cache_dir=args.cache_dir, incremental=args.incremental, prune=args.prune,
+                                 id_field=args.id_field)
+    except (RuntimeError, ValueError, OSError, sqlite3.Error) as e:
+        log(f'❌ {e}')
+        return 1
+
+    count, elapsed = stats['count'], stats['seconds']
+    rate = count / elapsed if elapsed > 0 else 0.0
+    log(f'✅ {count}건 생성 완료: {destination}')
+    log(f'⏱️  {elapsed:.2f}초, {rate:.1f} docs/s')
+    if stats.get('skipped'):
+        log(f'⏭️  변경 없음 {stats["skipped"]}건 건너뜀')
+    for filename in stats.get('removed', ()):
+        log(f'🗑️  삭제: {filename}')
+    for filename in stats.get('stale', ()):
+        log(f'⚠️  레코드가 사라진 출력 (--prune 으로 삭제): {filename}')
+    if workers > 1:
+        for pid, entry in sorted(stats['workers'].items()):
+            worker_rate = entry['count'] / entry['seconds'] if entry['seconds'] > 0 else 0.0
+            log(f'   👷 pid {pid}: {entry["count"]}건, {worker_rate:.1f} docs/s')
+
+    if args.pdf:
+        from pdf_export import ConversionError, export_pdfs, pending_exports, print_report
+
+        docx_paths = sorted(os.path.join(args.output_dir, name) for name in os.listdir(args.output_dir)
+                            if name.endswith('.docx'))
+        sources = list(pending_exports(docx_paths, args.pdf))
+        log(f'📄 PDF 변환 대상 {len(sources)}건 (워커 {args.pdf_workers}개)')
+        try:
+            pdf_stats = export_pdfs(sources, args.pdf, args.pdf_workers)
+        except ConversionError as e:
+            log(f'❌ {e}')
+            return 1
+        print_report(pdf_stats, args.pdf)
+        if pdf_stats['failed']:
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
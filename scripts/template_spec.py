@@ -0,0 +1,200 @@
+"""
+착공신고서 템플릿 선언적 명세 및 XML 컴파일러
+Declarative template spec compiled straight to document.xml (no python-docx DOM)
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import List
+
+from docx_template import escape
+
+W_NAMESPACES = (
+    'xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+)
+XML_DECLARATION = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+
+# Twips (1/1440 inch)
+LABEL_WIDTH = 2160
+VALUE_WIDTH = 7200
+CLEAN_MARGIN = 1152
+LETTER_PAGE = (12240, 15840)
+
+
+@dataclass
+class Row:
+    """One label/value row of the key/value table; each value line is a line break"""
+    label: str
+    lines: List[str]
+
+
+@dataclass
+class TemplateSpec:
+    title: List[str]
+    rows: List[Row]
+    declaration: List[str]
+    date: str
+    signature: str
+    recipient: str
+    documents_title: str
+    documents: List[str] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        data['rows'] = [Row(**row) if isinstance(row, dict) else Row(row[0], list(row[1]))
+                        for row in data['rows']]
+        return cls(**data)
+
+
+def load_spec(path):
+    """Load a TemplateSpec from a JSON file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return TemplateSpec.from_dict(json.load(f))
+
+
+CONSTRUCTION_REPORT = TemplateSpec(
+    title=['사물인터넷(IoT) 측정기기 부착지원 사업', '착 공 신 고 서'],
+    rows=[
+        Row('사 업 장 명', ['{{사업장명}}']),
+        Row('사업장소재지', ['{{주소}}', '전화: {{회사연락처}}  팩스: {{팩스번호}}']),
+        Row('설 치 업 체 명', ['주식회사 블루온']),
+        Row('시공업체소재지', ['경상북도 고령군 대가야읍 낫질로 285', '전화: 1661-5543  팩스: 031-8077-2054']),
+        Row('사업자등록번호', ['사업장: {{사업자등록번호}}', '시공업체: 679-86-02827']),
+        Row('부 착 기 간', ['{{보조금 승인일}} 부터 {{보조금 승인일+3개월}} 까지 (3개월)']),
+        Row('총 소 요 금 액', ['{{환경부고시가}} 원']),
+        Row('보조금승인액', ['{{보조금 승인액}} 원']),
+        Row('자 체 부 담 액', ['{{자부담}} 원']),
+        Row('입 금 액', ['{{입금액}} 원 (부가세 포함)']),
+        Row('설 치 품 목', [
+            '게이트웨이: {{게이트웨이}}대, VPN: {{VPN}}, 배출CT: {{배출CT}}개, 방지CT: {{방지CT}}개, '
+            '차압계: {{차압계}}개, 온도계: {{온도계}}개, PH계: {{PH계}}개',
+            '{{^배출구}}방지시설: {{방지시설명}}{{/배출구}}',
+        ]),
+        # One table row per entry of the record's 배출구 list (none for flat records)
+        Row('{{#배출구}}배출구 {{배출구번호}}', [
+            '방지시설: {{방지시설명}}',
+            '배출CT: {{배출CT}}개, 방지CT: {{방지CT}}개, 차압계: {{차압계}}개, '
+            '온도계: {{온도계}}개, PH계: {{PH계}}개{{/배출구}}',
+        ]),
+    ],
+    declaration=['소규모 사업장 사물인터넷(IoT) 측정기기 부착지원 사업에', '대하여 착공신고서를 제출합니다.'],
+    date='{{year}} 년  {{month}} 월  {{day}} 일',
+    signature='신청인(대표자)  {{사업장명}}  {{대표자성명}}  (인)',
+    recipient='{{지자체장}}  귀하',
+    documents_title='구 비 서 류',
+    documents=[
+        '1. 대기배출시설 설치 허가(신고)증 사본 1부.',
+        '2. 계약서(사본) 1부.',
+        '3. 자부담금 입금 확인증 1부.',
+        '4. 계약이행보증보험 1부.',
+        '5. 개선계획서(최종, 보완사항 포함) 1부.',
+    ],
+)
+
+
+def _rpr(bold=False, size=None):
+    inner = ('<w:b/>' if bold else '') + (f'<w:sz w:val="{size}"/>' if size else '')
+    return f'<w:rPr>{inner}</w:rPr>' if inner else ''
+
+
+def _run(text, bold=False, size=None):
+    return f'<w:r>{_rpr(bold, size)}<w:t xml:space="preserve">{escape(text)}</w:t></w:r>'
+
+
+def _broken_run(lines, bold=False, size=None):
+    """One run with <w:br/> between lines (python-docx style "\\n" runs)"""
+    texts = '<w:br/>'.join(f'<w:t xml:space="preserve">{escape(line)}</w:t>' for line in lines)
+    return f'<w:r>{_rpr(bold, size)}{texts}</w:r>'
+
+
+def _paragraph(content='', center=False):
+    ppr = '<w:pPr><w:jc w:val="center"/></w:pPr>' if center else ''
+    return f'<w:p>{ppr}{content}</w:p>'
+
+
+def _spacer(variant):
+    return '<w:p><w:r><w:t> </w:t></w:r></w:p>' if variant == 'minimal' else '<w:p/>'
+
+
+def _borders(tag, edges):
+    inner = ''.join(f'<w:{edge} w:val="single" w:sz="4" w:space="0" w:color="000000"/>' for edge in edges)
+    return f'<w:{tag}>{inner}</w:{tag}>'
+
+
+def _table(rows_xml, edges, grid=None):
+    grid_xml = ''
+    if grid:
+        grid_xml = '<w:tblGrid>' + ''.join(f'<w:gridCol w:w="{w}"/>' for w in grid) + '</w:tblGrid>'
+    return (f'<w:tbl><w:tblPr><w:tblW w:w="9000" w:type="dxa"/>{_borders("tblBorders", edges)}</w:tblPr>'
+            f'{grid_xml}{rows_xml}</w:tbl>')
+
+
+def _cell(content, width=None):
+    tcpr = f'<w:tcPr><w:tcW w:w="{width}" w:type="dxa"/></w:tcPr>' if width else ''
+    return f'<w:tc>{tcpr}{content}</w:tc>'
+
+
+def compile_document_xml(spec, variant='minimal'):
+    """Build document.xml for `spec` by direct string building
+
+    'minimal' keeps every value line in its own paragraph and placeholder
+    in a single run (what create_minimal_template() writes); 'clean'
+    mirrors create_clean_template(): line breaks inside one run, font sizes
+    and 0.8 inch margins.
+    """
+    if variant not in ('minimal', 'clean'):
+        raise ValueError(f'Unknown template variant: {variant}')
+    clean = variant == 'clean'
+    body = []
+
+    if clean:
+        body.append(_paragraph(_broken_run(spec.title, bold=True, size=36), center=True))
+    else:
+        body.extend(_paragraph(_run(line, bold=True, size=36), center=True) for line in spec.title)
+    body.append(_spacer(variant))
+
+    rows = []
+    for row in spec.rows:
+        label = _paragraph(_run(row.label, bold=True), center=True)
+        if clean:
+            value = _paragraph(_broken_run(row.lines))
+        else:
+            value = ''.join(_paragraph(_run(line)) for line in row.lines)
+        rows.append(f'<w:tr>{_cell(label, LABEL_WIDTH)}{_cell(value, VALUE_WIDTH)}</w:tr>')
+    body.append(_table(''.join(rows), ('top', 'left', 'bottom', 'right', 'insideH', 'insideV'),
+                       grid=(LABEL_WIDTH, VALUE_WIDTH)))
+    body.append(_spacer(variant))
+
+    if clean:
+        body.append(_paragraph(_broken_run(spec.declaration, size=22), center=True))
+    else:
+        body.extend(_paragraph(_run(line), center=True) for line in spec.declaration)
+    body.append(_spacer(variant))
+    body.append(_paragraph(_run(spec.date, size=24 if clean else None), center=True))
+    body.append(_spacer(variant))
+    body.append(_paragraph(_run(spec.signature, size=22 if clean else None), center=True))
+    body.append(_spacer(variant))
+    body.append(_paragraph(_run(spec.recipient, bold=True, size=24 if clean else None), center=True))
+    body.append(_spacer(variant))
+
+    header = _paragraph(_run(spec.documents_title, bold=True), center=True)
+    if clean:
+        items = _paragraph(_broken_run(spec.documents))
+    else:
+        items = ''.join(_paragraph(_run(line)) for line in spec.documents)
+    body.append(_table(f'<w:tr>{_cell(header + items)}</w:tr>', ('top', 'left', 'bottom', 'right'),
+                       grid=(LABEL_WIDTH + VALUE_WIDTH,)))
+
+    # A body must not end with a table
+    body.append(_spacer(variant))
+    if clean:
+        width, height = LETTER_PAGE
+        body.append(
+            f'<w:sectPr><w:pgSz w:w="{width}" w:h="{height}"/>'
+            f'<w:pgMar w:top="{CLEAN_MARGIN}" w:right="{CLEAN_MARGIN}" w:bottom="{CLEAN_MARGIN}" '
+            f'w:left="{CLEAN_MARGIN}" w:header="720" w:footer="720" w:gutter="0"/></w:sectPr>'
+        )
+
+    return f'{XML_DECLARATION}<w:document {W_NAMESPACES}><w:body>{"".join(body)}</w:body></w:document>'
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+증분 재생성 검증 - 레코드 1건 삭제/삽입/변경 시 출력 1건만 바뀌는지 확인
+Rerun check for render_batch(incremental=True) against a throwaway template
+
+    python scripts/verify_incremental_render.py
+
+Exit status is 1 when any scenario re-renders or drops more than the one
+record it touched.
+"""
+
+import os
+import sys
+import tempfile
+
+from create_minimal_template import write_minimal_docx
+from template_renderer import render_batch
+from template_spec import CONSTRUCTION_REPORT, compile_document_xml
+
+RECORDS = 10
+
+
+def _records(count):
+    return [{'id': str(i), '사업장명': f'(주)테스트산업{i}', '주소': f'경상북도 고령군 {i}'}
+            for i in range(1, count + 1)]
+
+
+def _snapshot(output_dir):
+    """{filename: mtime_ns} of every output, after stamping them all with a fixed time"""
+    snapshot = {}
+    for name in os.listdir(output_dir):
+        path = os.path.join(output_dir, name)
+        os.utime(path, ns=(1, 1))
+        snapshot[name] = 1
+    return snapshot
+
+
+def _changed(before, output_dir):
+    """Files written, created or deleted since _snapshot()"""
+    after = {name: os.stat(os.path.join(output_dir, name)).st_mtime_ns for name in os.listdir(output_dir)}
+    return sorted(name for name in set(before) | set(after) if before.get(name) != after.get(name))
+
+
+def _check(label, stats, changed, rendered=0, stale=0, removed=0):
+    problems = []
+    if stats['count'] != rendered:
+        problems.append(f'생성 {stats["count"]}건 (기대 {rendered}건)')
+    if len(stats['stale']) != stale:
+        problems.append(f'사라진 출력 {len(stats["stale"])}건 (기대 {stale}건): {stats["stale"]}')
+    if len(stats['removed']) != removed:
+        problems.append(f'삭제 {len(stats["removed"])}건 (기대 {removed}건): {stats["removed"]}')
+    if len(changed) != rendered + removed:
+        problems.append(f'바뀐 파일 {len(changed)}개 (기대 {rendered + removed}개): {changed}')
+    if problems:
+        for problem in problems:
+            print(f'❌ {label}: {problem}')
+        return False
+    print(f'✅ {label}: 바뀐 파일 {", ".join(changed) or "없음"}')
+    return True
+
+
+def verify(workdir):
+    template_path = os.path.join(workdir, 'template.docx')
+    write_minimal_docx(template_path, compile_document_xml(CONSTRUCTION_REPORT))
+    ok = True
+
+    for id_field in (None, 'id'):
+        label = f'--id-field {id_field}' if id_field else '이름 기준'
+        output_dir = os.path.join(workdir, f'out_{id_field or "name"}')
+        records = _records(RECORDS)
+
+        def run(records, prune=False):
+            before = _snapshot(output_dir) if os.path.isdir(output_dir) else {}
+            stats = render_batch(template_path, records, output_dir, incremental=True,
+                                 prune=prune, id_field=id_field)
+            return stats, _changed(before, output_dir)
+
+        stats, changed = run(records)
+        if not _check(f'{label} / 첫 생성', stats, changed, rendered=RECORDS):
+            return False
+
+        stats, changed = run(records[1:])
+        ok &= _check(f'{label} / 첫 레코드 삭제', stats, changed, stale=1)
+        stats, changed = run(records[1:], prune=True)
+        ok &= _check(f'{label} / --prune', stats, changed, removed=1)
+
+        inserted = records[1:5] + [{'id': '99', '사업장명': '(주)신규산업', '주소': '대구광역시'}] + records[5:]
+        stats, changed = run(inserted)
+        ok &= _check(f'{label} / 중간에 1건 삽입', stats, changed, rendered=1)
+
+        edited = [dict(record) for record in inserted]
+        edited[2]['주소'] = '경상북도 고령군 변경'
+        stats, changed = run(edited)
+        ok &= _check(f'{label} / 1건 수정', stats, changed, rendered=1)
+    return ok
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix='verify_incremental_') as workdir:
+        ok = verify(workdir)
+    print('\n✅ 증분 재생성 검증 통과' if ok else '\n❌ 증분 재생성 검증 실패')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+XLSX 템플릿 검증 - 품목 행 반복 시 공유 수식/병합/이름 정의가 맞게 늘어나는지 확인
+Rerun check for render_workbook() against a throwaway workbook
+
+    python scripts/verify_xlsx_template.py
+
+Exit status is 1 when any shared formula, merged cell, defined name or
+cell value in the rendered workbook is not where it should be.
+"""
+
+import os
+import re
+import sys
+import tempfile
+import zipfile
+
+from xlsx_template import compile_workbook, render_workbook
+
+MAIN = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+RELS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+PACKAGE_RELS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+ITEMS = [{'이름': '송풍기', '수량': 1}, {'이름': '펌프', '수량': 2}, {'이름': '필터', '수량': float('nan')}]
+
+
+def _cell(ref, text):
+    return f'<c r="{ref}" t="inlineStr"><is><t>{text}</t></is></c>'
+
+
+def write_workbook(path):
+    """발주서 시트: 1행 사업장명(A1:C1 병합), 3행 품목(C3에 C3:C4 공유 수식), 6행 합계(A6:C6 병합)"""
+    rows = [
+        f'<row r="1">{_cell("A1", "{{사업장명}}")}</row>',
+        f'<row r="2">{_cell("A2", "품목")}</row>',
+        f'<row r="3">{_cell("A3", "{{품목.이름}}")}{_cell("B3", "{{품목.수량}}")}'
+        '<c r="C3"><f t="shared" ref="C3:C4" si="0">B3*2</f><v>0</v></c></row>',
+        '<row r="4"><c r="C4"><f t="shared" si="0"/><v>0</v></c></row>',
+        '<row r="5"/>',
+        f'<row r="6">{_cell("A6", "합계")}<c r="D6"><f>SUM(B3:B3)</f></c></row>',
+    ]
+    sheet = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+             f'<worksheet xmlns="{MAIN}" xmlns:r="{RELS}"><sheetData>{"".join(rows)}</sheetData>'
+             '<mergeCells count="2"><mergeCell ref="A1:C1"/><mergeCell ref="A6:C6"/></mergeCells></worksheet>')
+    workbook = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                f'<workbook xmlns="{MAIN}" xmlns:r="{RELS}">'
+                '<sheets><sheet name="발주서" sheetId="1" r:id="rId1"/></sheets>'
+                '<definedNames><definedName name="_xlnm.Print_Area" localSheetId="0">'
+                "'발주서'!$A$1:$C$6</definedName></definedNames></workbook>")
+    content_types = (
+        '<?xml version="1.0" encoding="UTF-8"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/></Types>')
+    with zipfile.ZipFile(path, 'w') as z:
+        z.writestr('[Content_Types].xml', content_types)
+        z.writestr('_rels/.rels', f'<?xml version="1.0" encoding="UTF-8"?><Relationships xmlns="{PACKAGE_RELS}">'
+                                  f'<Relationship Id="rId1" Type="{RELS}/officeDocument" Target="xl/workbook.xml"/>'
+                                  '</Relationships>')
+        z.writestr('xl/workbook.xml', workbook)
+        z.writestr('xl/_rels/workbook.xml.rels', f'<?xml version="1.0" encoding="UTF-8"?>'
+                                                 f'<Relationships xmlns="{PACKAGE_RELS}"><Relationship Id="rId1" '
+                                                 f'Type="{RELS}/worksheet" Target="worksheets/sheet1.xml"/>'
+                                                 '</Relationships>')
+        z.writestr('xl/worksheets/sheet1.xml', sheet)
+
+
+def _check(label, actual, expected):
+    if actual != expected:
+        print(f'❌ {label}: {actual} (기대 {expected})')
+        return False
+    print(f'✅ {label}: {actual}')
+    return True
+
+
+def verify(workdir):
+    template_path = os.path.join(workdir, 'template.xlsx')
+    output_path = os.path.join(workdir, 'output.xlsx')
+    write_workbook(template_path)
+    render_workbook(compile_workbook(template_path), {'사업장명': '(주)테스트산업', '품목': ITEMS}, output_path)
+    with zipfile.ZipFile(output_path) as z:
+        sheet = z.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        workbook = z.read('xl/workbook.xml').decode('utf-8')
+
+    last = 3 + len(ITEMS) - 1
+    cells = {ref: body for ref, body in re.findall(r'<c r="([A-Z]+\d+)"[^>]*>(.*?)</c>', sheet)}
+    formulas = {ref: re.search(r'<f\b[^>]*(?:/>|>.*?</f>)', body).group(0)
+                for ref, body in cells.items() if '<f' in body}
+    ok = True
+    ok &= _check('행 번호', re.findall(r'<row r="(\d+)"', sheet), [str(n) for n in range(1, last + 4)])
+    ok &= _check('공유 수식', formulas, {
+        'C3': f'<f t="shared" ref="C3:C{last + 1}" si="0">B3*2</f>',
+        **{f'C{n}': '<f t="shared" si="0"/>' for n in range(4, last + 2)},
+        f'D{last + 3}': f'<f>SUM(B3:B{last})</f>',
+    })
+    ok &= _check('병합', re.findall(r'<mergeCell ref="([^"]+)"/>', sheet), ['A1:C1', f'A{last + 3}:C{last + 3}'])
+    ok &= _check('이름 정의', re.findall(r'<definedName\b[^>]*>(.*?)</definedName>', workbook),
+                 [f"'발주서'!$A$1:$C${last + 3}"])
+    ok &= _check('숫자 값', [cells.get(f'B{n}', '') for n in range(3, last + 1)],
+                 ['<v>1</v>', '<v>2</v>', '<is><t xml:space="preserve"></t></is>'])
+    return ok
+
+
+def main():
+    with tempfile.TemporaryDirectory(prefix='verify_xlsx_') as workdir:
+        ok = verify(workdir)
+    print('\n✅ XLSX 템플릿 검증 통과' if ok else '\n❌ XLSX 템플릿 검증 실패')
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
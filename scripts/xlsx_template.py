@@ -0,0 +1,715 @@
+#!/usr/bin/env python3
+"""
+발주서 XLSX 템플릿 컴파일 및 행 스트리밍 생성
+Compile {{placeholder}} XLSX templates once and stream worksheet rows per record
+
+Placeholders may sit in shared strings (where Excel keeps typed cell text)
+or in inline string cells. Each cell that shows one is compiled into a slot
+and written as an inline string, or as a number when the cell text is a
+single placeholder and the value is an int/float. The cell keeps its `s`
+attribute, so generated cells point at the template's existing cell
+formats; styles.xml is copied untouched, and the shared strings that held
+placeholders are emptied (keeping every index) so no template text is
+left in the output.
+
+One row may hold `{{목록.필드}}` placeholders. That row is the line-item
+row: it is written once per entry of the record's `목록` list (once with
+blanks for an empty list). Rows, formulas, merged cells, drawings, page
+breaks and defined names below it move down, and ranges ending on it grow
+with the list, e.g. SUM(AO21:AO21) becomes SUM(AO21:AO2020).
+
+Worksheets with slots are written through ZipFile.open(..., 'w') in
+batches of rows, so thousands of lines or orders run in constant memory.
+Every other member is deflated once at compile time and spliced in.
+
+    python scripts/xlsx_template.py orders.json -o output/발주서
+    python scripts/xlsx_template.py orders.jsonl -t 양식/발주서.xlsx --name-field 사업장명
+"""
+
+import argparse
+import itertools
+import math
+import os
+import posixpath
+import re
+import sys
+import time
+import zipfile
+import zlib
+
+from docx_template import PLACEHOLDER_PATTERN, StaticMember, escape
+from docx_zip import write_raw_member
+from stage_metrics import METRICS, add_arguments, instrumented
+
+DEFAULT_TEMPLATE = '양식/@_발주서(에코센스_KT무선)_250701.xlsx'
+DEFAULT_NAME_FIELD = '사업장명'
+# Rendered rows joined per write() on the worksheet stream
+ROW_BATCH = 256
+
+_RELATIONSHIP = re.compile(r'<Relationship\b[^>]*?\bId="([^"]+)"[^>]*?\bTarget="([^"]+)"[^>]*/>')
+_RELATIONSHIP_TYPE = re.compile(r'\bType="[^"]*/([^"/]+)"')
+_SHEET = re.compile(r'<sheet\b[^>]*?\bname="([^"]*)"[^>]*?\br:id="([^"]+)"')
+_SHARED_STRING = re.compile(r'<si>(.*?)</si>|<si/>', re.S)
+_PHONETIC = re.compile(r'<rPh\b.*?</rPh>', re.S)
+_TEXT = re.compile(r'<t\b[^>]*>(.*?)</t>', re.S)
+_ROW = re.compile(r'<row\b[^>]*?(?:/>|>.*?</row>)', re.S)
+_ROW_NUMBER = re.compile(r'<row\b[^>]*?\br="(\d+)"')
+_CELL = re.compile(r'<c\b([^>]*?)(?:/>|>(.*?)</c>)', re.S)
+_CELL_TYPE = re.compile(r'\s+t="[^"]*"')
+_CELL_VALUE = re.compile(r'<v>(\d+)</v>')
+_SHARED_INDEX = re.compile(rb'<v>(\d+)</v>')
+_MERGE_CELLS = re.compile(r'<mergeCells\b[^>]*>(.*?)</mergeCells>', re.S)
+_MERGE_CELL = re.compile(r'<mergeCell\b[^>]*?\bref="([^"]+)"[^>]*/>')
+_DEFINED_NAME = re.compile(r'(<definedName\b[^>]*>)(.*?)(</definedName>)', re.S)
+_CALC_PR = re.compile(r'<calcPr\b([^>]*?)(/?)>')
+_DRAWING_ROW = re.compile(r'(<xdr:row>)(\d+)(</xdr:row>)')
+# A shared formula master (t="shared" with a ref); its children are <f t="shared" si="N"/>
+_SHARED_FORMULA = re.compile(r'<f\b(?=[^>]*\bt="shared")(?=[^>]*\bref="([^"]*)")([^>]*?)(?:/>|>[^<]*</f>)')
+_SHARED_INDEX_ATTRIBUTE = re.compile(r'\bsi="(\d+)"')
+
+# Where cell references live in worksheet XML: reference attributes,
+# formula/sqref element text and the row numbers of rows and page breaks
+_REFERENCE_ATTRIBUTE = re.compile(r'(\s(?:r|ref|sqref)=")([^"]*)(")')
+_FORMULA_ELEMENT = re.compile(r'(<((?:\w+:)?(?:f|sqref))\b[^>]*>)([^<]*)(</\2>)')
+_ROW_ATTRIBUTE = re.compile(r'(<row\b[^>]*?\br=")(\d+)(")')
+_ROW_BREAKS = re.compile(r'<rowBreaks\b.*?</rowBreaks>', re.S)
+_BREAK = re.compile(r'(<brk\b[^>]*?\bid=")(\d+)(")')
+_QUOTED = re.compile(r'("[^"]*")')
+_REFERENCE = re.compile(r"(?<![A-Za-z0-9_.$])(\$?[A-Z]{1,3}\$?)(\d+)(?::(\$?[A-Z]{1,3}\$?)(\d+))?(?![A-Za-z0-9_(])")
+
+# Row number slot of the line-item row; cells are marked by index before the split
+ROW = None
+_MARKER_ROW = '\x00row\x00'
+_SLOT_MARKER = re.compile('\x00(\\d+|row)\x00')
+
+
+def _sub_references(text, reference):
+    """Apply `reference(match)` to every cell reference in formula-like `text`"""
+    # Leave string constants inside formulas alone
+    pieces = _QUOTED.split(text)
+    pieces[0::2] = [_REFERENCE.sub(reference, piece) for piece in pieces[0::2]]
+    return ''.join(pieces)
+
+
+def _rewrite_references(xml, reference, row_number):
+    """Apply `reference(match)` to every cell reference and `row_number(int)` to row ids"""
+    def references(text):
+        return _sub_references(text, reference)
+
+    xml = _REFERENCE_ATTRIBUTE.sub(lambda m: m.group(1) + references(m.group(2)) + m.group(3), xml)
+    xml = _FORMULA_ELEMENT.sub(lambda m: m.group(1) + references(m.group(3)) + m.group(4), xml)
+    return _ROW_ATTRIBUTE.sub(lambda m: m.group(1) + row_number(int(m.group(2))) + m.group(3), xml)
+
+
+def _shifted_reference(row, offset):
+    """The reference rewrite of shift_rows() for one line-item row and offset"""
+    def reference(match):
+        column, first, end_column, last = match.groups()
+        first = int(first)
+        moved = first + offset if first > row else first
+        if end_column is None:
+            return f'{column}{moved}'
+        last = int(last)
+        if last > row or (last == row and first <= row):
+            last += offset
+        return f'{column}{moved}:{end_column}{last}'
+
+    return reference
+
+
+def shift_references(text, row, offset):
+    """shift_rows() for bare reference text: a mergeCell ref, a definedName, a formula"""
+    if not offset:
+        return text
+    return _sub_references(text, _shifted_reference(row, offset))
+
+
+def shift_rows(xml, row, offset):
+    """Move references below `row` down by `offset`; ranges ending on `row` grow"""
+    if not offset:
+        return xml
+
+    def row_number(number):
+        return str(number + offset if number > row else number)
+
+    xml = _rewrite_references(xml, _shifted_reference(row, offset), row_number)
+    # Page breaks after the moved rows (column breaks share <brk>, so only rowBreaks)
+    return _ROW_BREAKS.sub(lambda m: _BREAK.sub(lambda b: b.group(1) + row_number(int(b.group(2))) + b.group(3),
+                                                 m.group(0)), xml)
+
+
+def _mark_row(xml, row, marker):
+    """Replace the row number of references to `row` with `marker`"""
+    def number(value):
+        return marker if int(value) == row else value
+
+    def reference(match):
+        column, first, end_column, last = match.groups()
+        if end_column is None:
+            return f'{column}{number(first)}'
+        return f'{column}{number(first)}:{end_column}{number(last)}'
+
+    return _rewrite_references(xml, reference, lambda value: marker if value == row else str(value))
+
+
+def _shared_string_text(si):
+    """Escaped text of a <si> entry (rich text runs concatenated, phonetic runs dropped)"""
+    return ''.join(_TEXT.findall(_PHONETIC.sub('', si)))
+
+
+def _unescape(text):
+    return text.replace('&lt;', '<').replace('&gt;', '>').replace('&quot;', '"').replace('&amp;', '&')
+
+
+class CellSlot:
+    """The value part of one placeholder cell, written after its attributes
+
+    `literals` are escaped text pieces around the placeholder `fields`;
+    each field is (name, from_item). `single` cells (exactly one
+    placeholder, no other text) become numeric cells for int/float values.
+    """
+
+    __slots__ = ('literals', 'fields', 'single')
+
+    def __init__(self, literals, fields):
+        self.literals = literals
+        self.fields = fields
+        self.single = len(fields) == 1 and literals == ['', '']
+
+    def render(self, values, item):
+        if self.single:
+            name, from_item = self.fields[0]
+            value = (item if from_item else values).get(name)
+            if type(value) is int or (type(value) is float and math.isfinite(value)):
+                return f'><v>{value!r}</v></c>'
+            # nan/inf have no SpreadsheetML form; the cell is left blank
+            text = '' if value is None or type(value) is float else escape(str(value))
+        else:
+            literals = self.literals
+            out = [literals[0]]
+            for i, (name, from_item) in enumerate(self.fields, 1):
+                value = (item if from_item else values).get(name)
+                out.append('' if value is None else escape(str(value)))
+                out.append(literals[i])
+            text = ''.join(out)
+        return f' t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+class CompiledRow:
+    """A <row> split into literals and slots (ROW for the row number, or a CellSlot)"""
+
+    __slots__ = ('literals', 'slots')
+
+    def __init__(self, literals, slots):
+        self.literals = literals
+        self.slots = slots
+
+    def render(self, number, values, item=None):
+        literals = self.literals
+        out = [literals[0]]
+        for i, slot in enumerate(self.slots, 1):
+            out.append(number if slot is ROW else slot.render(values, item))
+            out.append(literals[i])
+        return ''.join(out)
+
+
+class CompiledSheet:
+    """A worksheet with placeholder cells, kept as segments to stream per record
+
+    `before` and `after` hold the rows around the line-item row (`repeat`,
+    at `repeat_row`), each a bytes/str literal or a CompiledRow. Without
+    a line-item row every row is in `before`.
+
+    When the line-item row holds shared formula masters, the first
+    generated row is `repeat_first`: it keeps the masters, whose refs
+    (`shared_refs`, marked in the row) grow to span every generated row,
+    and `repeat` writes the other rows with child formulas.
+    """
+
+    __slots__ = ('name', 'head', 'before', 'repeat', 'repeat_first', 'shared_refs', 'repeat_row', 'after',
+                 'tail', 'merges', 'repeat_merges', 'merges_tail')
+
+    def __init__(self, name, head, before, repeat, repeat_row, after, tail, merges, repeat_merges, merges_tail,
+                 repeat_first=None, shared_refs=()):
+        self.name = name
+        self.head = head
+        self.before = before
+        self.repeat = repeat
+        self.repeat_first = repeat_first
+        self.shared_refs = shared_refs
+        self.repeat_row = repeat_row
+        self.after = after
+        self.tail = tail
+        self.merges = merges
+        self.repeat_merges = repeat_merges
+        self.merges_tail = merges_tail
+
+    def write(self, stream, values, items):
+        """Stream the worksheet for one record; returns the number of bytes written"""
+        written = 0
+        batch = []
+
+        def flush():
+            nonlocal written
+            data = ''.join(batch).encode('utf-8')
+            stream.write(data)
+            written += len(data)
+            batch.clear()
+
+        row, offset = self.repeat_row, max(len(items), 1) - 1 if self.repeat else 0
+        batch.append(shift_rows(self.head, row, offset))
+        for segment in self.before:
+            if isinstance(segment, CompiledRow):
+                batch.append(shift_rows(segment.render('', values), row, offset))
+            elif isinstance(segment, bytes):
+                flush()
+                stream.write(segment)
+                written += len(segment)
+            else:
+                batch.append(shift_rows(segment, row, offset))
+
+        if self.repeat is not None:
+            render = self.repeat.render
+            for index, item in enumerate(items or ({},)):
+                if index == 0 and self.repeat_first is not None:
+                    text = self.repeat_first.render(str(row), values, item)
+                    for marker, ref in self.shared_refs:
+                        text = text.replace(marker, shift_references(ref, row, offset))
+                    batch.append(text)
+                    continue
+                batch.append(render(str(row + index), values, item))
+                if len(batch) >= ROW_BATCH:
+                    flush()
+            for segment in self.after:
+                text = segment.render('', values) if isinstance(segment, CompiledRow) else segment
+                batch.append(shift_rows(text, row, offset))
+
+        batch.append(shift_rows(self.tail, row, offset))
+        if self.merges or self.repeat_merges:
+            batch.append(f'<mergeCells count="{len(self.merges) + len(self.repeat_merges) * (offset + 1)}">')
+            batch.extend(f'<mergeCell ref="{shift_references(ref, row, offset)}"/>' for ref in self.merges)
+            for index in range(offset + 1):
+                for ref in self.repeat_merges:
+                    batch.append(f'<mergeCell ref="{ref.replace(_MARKER_ROW, str(row + index))}"/>')
+                if len(batch) >= ROW_BATCH:
+                    flush()
+            batch.append('</mergeCells>')
+        batch.append(shift_rows(self.merges_tail, row, offset))
+        flush()
+        return written
+
+
+class ShiftedPart:
+    """A small XML part whose row references follow the line-item count"""
+
+    __slots__ = ('text', 'row', 'sheet', 'drawing')
+
+    def __init__(self, text, row, sheet=None, drawing=False):
+        self.text = text
+        self.row = row
+        self.sheet = sheet
+        self.drawing = drawing
+
+    def render(self, offset):
+        if not offset:
+            return self.text
+        if self.drawing:
+            # Anchor rows are zero-based
+            return _DRAWING_ROW.sub(
+                lambda m: m.group(1) + str(int(m.group(2)) + (offset if int(m.group(2)) >= self.row else 0)) + m.group(3),
+                self.text)
+
+        def defined_name(match):
+            # Only names on the line-item sheet ('Sheet'!$A$1:$K$40) move
+            if f"{self.sheet}'!" not in match.group(2) and f'{self.sheet}!' not in match.group(2):
+                return match.group(0)
+            return match.group(1) + shift_references(match.group(2), self.row, offset) + match.group(3)
+
+        return _DEFINED_NAME.sub(defined_name, self.text)
+
+
+class CompiledWorkbook:
+    """An XLSX template read once; `members` as in CompiledTemplate
+
+    Payloads are StaticMember, CompiledSheet (streamed) or ShiftedPart.
+    `items_field` names the record list that feeds the line-item row.
+    """
+
+    def __init__(self, path, members, placeholders, items_field=None):
+        self.path = path
+        self.members = members
+        self.placeholders = placeholders
+        self.items_field = items_field
+
+
+
+def _compile_cell(attributes, body, strings):
+    """Return (attributes without t=, CellSlot) for a placeholder cell, else None"""
+    types = re.search(r'\bt="([^"]*)"', attributes)
+    kind = types.group(1) if types else 'n'
+    if kind == 's' and body:
+        value = _CELL_VALUE.search(body)
+        text = strings.get(int(value.group(1))) if value else None
+    elif kind == 'inlineStr' and body and '{{' in body:
+        text = ''.join(_TEXT.findall(body))
+    else:
+        text = None
+    if text is None:
+        return None
+
+    pieces = PLACEHOLDER_PATTERN.split(text)
+    names = [_unescape(name.strip()) for name in pieces[1::2]]
+    if not names:
+        return None
+    return _CELL_TYPE.sub('', attributes), pieces[0::2], names
+
+
+def _compile_row(xml, strings, marker_row=None):
+    """Split one <row> into a CompiledRow, or return it unchanged without placeholders
+
+    With `marker_row`, references to that row become ROW slots and dotted
+    placeholders are looked up in the line item. Returns (row, fields).
+    """
+    slots = []
+    fields = []
+
+    def cell(match):
+        compiled = _compile_cell(match.group(1), match.group(2), strings)
+        if compiled is None:
+            return match.group(0)
+        attributes, literals, names = compiled
+        cell_fields = [(name.split('.', 1)[1], True) if marker_row and '.' in name else (name, False)
+                       for name in names]
+        fields.extend(names)
+        slots.append(CellSlot(literals, cell_fields))
+        return f'<c{attributes}\x00{len(slots) - 1}\x00'
+
+    xml = _CELL.sub(cell, xml)
+    if marker_row is not None:
+        xml = _mark_row(xml, marker_row, _MARKER_ROW)
+    if not slots and marker_row is None:
+        return xml, fields
+
+    pieces = _SLOT_MARKER.split(xml)
+    return CompiledRow(pieces[0::2], [ROW if key == 'row' else slots[int(key)] for key in pieces[1::2]]), fields
+
+
+def _split_shared_formulas(row_xml):
+    """(first row, other rows, [(marker, ref)]) for the shared formula masters of the line-item row
+
+    A master may appear once per sheet: the first generated row keeps it,
+    with its ref replaced by a marker that write() fills with the ref
+    grown over every generated row; the other rows get a child formula
+    pointing at the same si.
+    """
+    shared_refs = []
+
+    def first(match):
+        marker = f'\x00ref{len(shared_refs)}\x00'
+        shared_refs.append((marker, match.group(1)))
+        return match.group(0).replace(f'ref="{match.group(1)}"', f'ref="{marker}"', 1)
+
+    def child(match):
+        index = _SHARED_INDEX_ATTRIBUTE.search(match.group(2))
+        return f'<f t="shared" si="{index.group(1)}"/>' if index else match.group(0)
+
+    first_xml = _SHARED_FORMULA.sub(first, row_xml)
+    if not shared_refs:
+        return row_xml, row_xml, []
+    return first_xml, _SHARED_FORMULA.sub(child, row_xml), shared_refs
+
+
+def _compile_sheet(name, xml, strings):
+    """Compile one worksheet; returns (CompiledSheet, placeholders, items field, line-item row)"""
+    start = xml.find('<sheetData')
+    data_start = xml.find('>', start) + 1
+    if xml[data_start - 2] == '/':
+        head, body, tail = xml[:start] + '<sheetData>', '', '</sheetData>' + xml[data_start:]
+    else:
+        end = xml.index('</sheetData>', data_start)
+        head, body, tail = xml[:data_start], xml[data_start:end], xml[end:]
+
+    rows = _ROW.findall(body)
+    placeholders = []
+    items_field = repeat_row = None
+    for row_xml in rows:
+        for match in _CELL.finditer(row_xml):
+            compiled = _compile_cell(match.group(1), match.group(2), strings)
+            dotted = [field for field in (compiled[2] if compiled else ()) if '.' in field]
+            if not dotted:
+                continue
+            number = int(_ROW_NUMBER.search(row_xml).group(1))
+            for field in dotted:
+                prefix = field.split('.', 1)[0]
+                if items_field not in (None, prefix) or repeat_row not in (None, number):
+                    raise ValueError(f'{name}: 반복 행은 목록 하나, 행 하나만 둘 수 있습니다 ({field})')
+                items_field, repeat_row = prefix, number
+
+    before, repeat, after = [], None, []
+    repeat_first, shared_refs = None, []
+    for row_xml in rows:
+        number = int(_ROW_NUMBER.search(row_xml).group(1))
+        if number == repeat_row:
+            first_xml, row_xml, shared_refs = _split_shared_formulas(row_xml)
+            if shared_refs:
+                repeat_first, _ = _compile_row(first_xml, strings, repeat_row)
+            repeat, fields = _compile_row(row_xml, strings, repeat_row)
+        else:
+            segment, fields = _compile_row(row_xml, strings)
+            (after if repeat_row is not None and number > repeat_row else before).append(segment)
+        placeholders.extend(fields)
+
+    merges, repeat_merges, merges_tail = [], [], ''
+    match = _MERGE_CELLS.search(tail)
+    if match:
+        for ref in _MERGE_CELL.findall(match.group(1)):
+            rows_of = [int(n) for n in re.findall(r'\d+', ref)]
+            if repeat_row is not None and rows_of and all(n == repeat_row for n in rows_of):
+                repeat_merges.append(_mark_row(f' ref="{ref}"', repeat_row, _MARKER_ROW)[6:-1])
+            else:
+                merges.append(ref)
+        tail, merges_tail = tail[:match.start()], tail[match.end():]
+
+    if repeat_row is not None:
+        # Rows before the line-item row move only if their formulas point below it
+        before = [segment if isinstance(segment, CompiledRow) or shift_rows(segment, repeat_row, 1) != segment
+                  else segment.encode('utf-8') for segment in before]
+    else:
+        before = [segment.encode('utf-8') if isinstance(segment, str) else segment for segment in before]
+    before = _merge_literals(before)
+
+    sheet = CompiledSheet(name, head, before, repeat, repeat_row, after, tail, merges, repeat_merges, merges_tail,
+                          repeat_first, shared_refs)
+    return sheet, placeholders, items_field, repeat_row
+
+
+def _merge_literals(segments):
+    """Join runs of adjacent bytes literals so each is one write()"""
+    merged = []
+    for segment in segments:
+        if isinstance(segment, bytes) and merged and isinstance(merged[-1], bytes):
+            merged[-1] += segment
+        else:
+            merged.append(segment)
+    return merged
+
+
+def _relationships(zip_ref, part):
+    """{id: (type, target member name)} of a part's .rels"""
+    directory, filename = posixpath.split(part)
+    rels_name = posixpath.join(directory, '_rels', filename + '.rels')
+    try:
+        xml = zip_ref.read(rels_name).decode('utf-8')
+    except KeyError:
+        return {}
+    result = {}
+    for match in re.finditer(r'<Relationship\b[^>]*/>', xml):
+        element = match.group(0)
+        rel = _RELATIONSHIP.search(element)
+        rel_type = _RELATIONSHIP_TYPE.search(element)
+        if not rel:
+            continue
+        target = rel.group(2)
+        target = target.lstrip('/') if target.startswith('/') else posixpath.normpath(posixpath.join(directory, target))
+        result[rel.group(1)] = (rel_type.group(1) if rel_type else '', target)
+    return result
+
+
+def compile_workbook(template_path):
+    """Read an XLSX template once and compile every worksheet that shows placeholders"""
+    with zipfile.ZipFile(template_path, 'r') as zip_ref:
+        names = set(zip_ref.namelist())
+        root = _relationships(zip_ref, '')
+        workbook_part = next((target for kind, target in root.values() if kind == 'officeDocument'), 'xl/workbook.xml')
+        workbook_rels = _relationships(zip_ref, workbook_part)
+        workbook_xml = zip_ref.read(workbook_part).decode('utf-8')
+
+        strings = {}
+        strings_part = next((target for kind, target in workbook_rels.values() if kind == 'sharedStrings'), None)
+        if strings_part in names:
+            with METRICS.stage('xlsx.compile.strings'):
+                shared = zip_ref.read(strings_part).decode('utf-8')
+                for index, match in enumerate(_SHARED_STRING.finditer(shared)):
+                    text = _shared_string_text(match.group(1) or '')
+                    if '{{' in text and PLACEHOLDER_PATTERN.search(text):
+                        strings[index] = text
+
+        sheet_names = {workbook_rels[rel_id][1]: _unescape(name)
+                       for name, rel_id in _SHEET.findall(workbook_xml) if rel_id in workbook_rels}
+        compiled = {}
+        placeholders = []
+        items_field = repeat_sheet = None
+        repeat_row = 0
+        for part, sheet_name in sheet_names.items():
+            data = zip_ref.read(part)
+            # Cheap check before the regex pass: a {{ in the sheet or a <v> naming a placeholder string
+            if b'{{' not in data and not strings.keys() & {int(v) for v in _SHARED_INDEX.findall(data)}:
+                continue
+            with METRICS.stage('xlsx.compile.sheet') as stage:
+                sheet, fields, sheet_items, sheet_repeat = _compile_sheet(sheet_name, data.decode('utf-8'), strings)
+                stage.add(len(data))
+            if not fields:
+                continue
+            if sheet_items is not None:
+                if items_field is not None:
+                    raise ValueError(f'{sheet_name}: 반복 행은 통합 문서에 하나만 둘 수 있습니다')
+                items_field, repeat_sheet, repeat_row = sheet_items, part, sheet_repeat
+            compiled[part] = sheet
+            placeholders.extend(fields)
+
+        # Parts rewritten for the compiled workbook
+        texts = {}
+        dropped = set()
+        if compiled:
+            # Cached formula results no longer match the generated values
+            def full_calc(match):
+                attributes = re.sub(r'\s+fullCalcOnLoad="[^"]*"', '', match.group(1))
+                return f'<calcPr{attributes} fullCalcOnLoad="1"{match.group(2)}>'
+            if _CALC_PR.search(workbook_xml):
+                workbook_xml = _CALC_PR.sub(full_calc, workbook_xml, count=1)
+            else:
+                workbook_xml = workbook_xml.replace('</workbook>', '<calcPr fullCalcOnLoad="1"/></workbook>')
+            texts[workbook_part] = workbook_xml
+            if strings:
+                # Compiled cells are inline strings now; blank the placeholder entries in place
+                def blank(match):
+                    return '<si><t/></si>' if next(positions) in strings else match.group(0)
+                positions = itertools.count()
+                texts[strings_part] = _SHARED_STRING.sub(blank, shared)
+        if repeat_sheet is not None:
+            texts[workbook_part] = ShiftedPart(workbook_xml, repeat_row, escape(sheet_names[repeat_sheet]))
+            for kind, target in _relationships(zip_ref, repeat_sheet).values():
+                if kind == 'drawing' and target in names:
+                    texts[target] = ShiftedPart(zip_ref.read(target).decode('utf-8'), repeat_row, drawing=True)
+            # calcChain lists formula cells by address; Excel rebuilds it
+            for rel_id, (kind, target) in workbook_rels.items():
+                if kind == 'calcChain':
+                    dropped.add(target)
+                    rels_name = posixpath.join(posixpath.dirname(workbook_part), '_rels',
+                                               posixpath.basename(workbook_part) + '.rels')
+                    rels = zip_ref.read(rels_name).decode('utf-8')
+                    texts[rels_name] = re.sub(rf'<Relationship\b[^>]*?\bId="{re.escape(rel_id)}"[^>]*/>', '', rels)
+                    types = texts.get('[Content_Types].xml') or zip_ref.read('[Content_Types].xml').decode('utf-8')
+                    texts['[Content_Types].xml'] = re.sub(
+                        rf'<Override\b[^>]*?\bPartName="/{re.escape(target)}"[^>]*/>', '', types)
+
+        members = []
+        for info in zip_ref.infolist():
+            if info.filename in dropped:
+                continue
+            payload = compiled.get(info.filename) or texts.get(info.filename)
+            if isinstance(payload, str):
+                data = payload.encode('utf-8')
+                rewritten = zipfile.ZipInfo(info.filename, info.date_time)
+                rewritten.external_attr = info.external_attr
+                rewritten.CRC = zlib.crc32(data)
+                rewritten.file_size = len(data)
+                payload = StaticMember.from_member(None, rewritten, data)
+            elif payload is None:
+                with METRICS.stage('xlsx.compile.precompress') as stage:
+                    data = zip_ref.read(info)
+                    payload = StaticMember.from_member(zip_ref, info, data)
+                    stage.add(len(data), len(payload.raw))
+            members.append((info.filename, info.date_time, info.external_attr, payload))
+
+    return CompiledWorkbook(template_path, members, list(dict.fromkeys(placeholders)), items_field)
+
+
+def render_workbook(template, record, output):
+    """Render one record into `output` (a path or writable binary file object)
+
+    Compiled worksheets are streamed row by row into the archive; the
+    line-item rows come from `record[template.items_field]`, a list of
+    dicts (or any iterable with len()).
+    """
+    values = {str(key).strip(): value for key, value in record.items()}
+    items = []
+    if template.items_field is not None:
+        items = values.get(template.items_field) or []
+        if not hasattr(items, '__len__'):
+            items = list(items)
+    offset = max(len(items), 1) - 1
+
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as xlsx:
+        for filename, date_time, external_attr, payload in template.members:
+            if isinstance(payload, StaticMember):
+                with METRICS.stage('render.splice') as stage:
+                    write_raw_member(xlsx, payload.info, payload.raw)
+                    stage.add(len(payload.raw), len(payload.raw))
+                continue
+            info = zipfile.ZipInfo(filename, date_time)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = external_attr
+            if isinstance(payload, ShiftedPart):
+                with METRICS.stage('xlsx.shift') as stage:
+                    xml = payload.render(offset).encode('utf-8')
+                    xlsx.writestr(info, xml)
+                    stage.add(len(xml), info.compress_size)
+                continue
+            with METRICS.stage('xlsx.rows') as stage:
+                with xlsx.open(info, 'w') as stream:
+                    written = payload.write(stream, values, items)
+                stage.add(written, info.compress_size)
+
+
+def render_batch(template_path, records, output_dir, name_field=DEFAULT_NAME_FIELD):
+    """Render every record into `output_dir`, one workbook at a time"""
+    from template_renderer import output_filename
+
+    os.makedirs(output_dir, exist_ok=True)
+    started = time.perf_counter()
+    template = compile_workbook(template_path)
+    count = 0
+    lines = 0
+    for index, record in enumerate(records, 1):
+        filename = output_filename(index, record, name_field, extension='.xlsx')
+        render_workbook(template, record, os.path.join(output_dir, filename))
+        count += 1
+        if template.items_field is not None:
+            lines += len(record.get(template.items_field) or ())
+    return {'count': count, 'lines': lines, 'seconds': time.perf_counter() - started, 'template': template}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='발주서 XLSX 일괄 생성')
+    parser.add_argument('records', help='레코드 파일 (.json, .jsonl; 품목 목록은 JSON 배열) 또는 DB')
+    parser.add_argument('-t', '--template', default=DEFAULT_TEMPLATE, help='템플릿 XLSX 경로')
+    parser.add_argument('-o', '--output-dir', default='output/발주서', help='출력 디렉토리')
+    parser.add_argument('--name-field', default=DEFAULT_NAME_FIELD, help='파일명에 사용할 필드')
+    parser.add_argument('--mapping', help='컬럼 → 플레이스홀더 매핑 파일 (record_source.py 참고)')
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with instrumented(args, 'xlsx'):
+        return _run(args)
+
+
+def _run(args):
+    if not os.path.exists(args.template):
+        print(f'❌ 템플릿 파일을 찾을 수 없습니다: {args.template}')
+        return 1
+
+    from record_source import open_records
+
+    print(f'📖 템플릿 컴파일: {args.template}')
+    try:
+        stats = render_batch(args.template, open_records(args.records, args.mapping), args.output_dir,
+                             args.name_field)
+    except (ValueError, RuntimeError) as e:
+        print(f'❌ {e}')
+        return 1
+
+    template = stats['template']
+    if not template.placeholders:
+        print('⚠️  템플릿에 플레이스홀더가 없습니다 (원본 그대로 복사됨)')
+    elif template.items_field:
+        print(f'📋 반복 행: {{{{{template.items_field}.*}}}}')
+    count, elapsed = stats['count'], stats['seconds']
+    rate = count / elapsed if elapsed > 0 else 0.0
+    print(f'✅ {count}건 생성 완료 (품목 {stats["lines"]}행): {args.output_dir}')
+    print(f'⏱️  {elapsed:.2f}초, {rate:.1f} docs/s')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())